@@ -1 +1,2 @@
 from abaqus_interface.abaqus_interface import ABQInterface
+from abaqus_interface.async_interface import AsyncABQInterface
@@ -1,189 +1,945 @@
 from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
+import heapq
 import os
 import pickle
 import pathlib
+import queue
 import subprocess
+import tempfile
+import threading
+import time
 
 import numpy as np
-from abaqus_interface.common import TemporaryDirectory
+from abaqus_interface.common import AbaqusError, AbaqusLicenseError
+from abaqus_interface.instrumentation import client_phase, current_stats, instrumented, use_stats
+from abaqus_interface.label_index import LabelIndex
+from abaqus_interface.mesh import Mesh
+from abaqus_interface.odb_catalog import OdbCatalog
+from abaqus_interface.odb_store import OdbStore
+from abaqus_interface.result_cache import ResultCache
+from abaqus_interface.scratch import array_directory, exchange_directory, ScratchManager
+from abaqus_interface.script_calls import (abaqus_python_directory, check_return_code, frames_output, label_list,
+                                           path_output, path_values, python_command, read_output, read_parameters,
+                                           save_path_parameters, save_write_parameters)
+from abaqus_interface.transport import load_array, load_data, save_data
+from abaqus_interface.worker import AbaqusWorker, idempotent_scripts
 
 
-abaqus_python_directory = pathlib.Path(__file__).parents[1].absolute() / "abaqus_python_scripts"
 print(abaqus_python_directory)
 
 CoordinateSystem = namedtuple('CoordinateSystem', ['name', 'origin', 'point1', 'point2', 'system_type'])
 cylindrical_system_z = CoordinateSystem(name='cylindrical', origin=(0., 0., 0.), point1=(1., 0., 0.),
                                         point2=(0., 1., 0.), system_type='CYLINDRICAL')
 
+ReadRequest = namedtuple('ReadRequest', ['field_id', 'step_name', 'frame_number', 'set_name', 'instance_name',
+                                         'position', 'coordinate_system', 'labels'],
+                         defaults=(None, -1, '', '', 'INTEGRATION_POINT', None, None))
+
+ReductionRequest = namedtuple('ReductionRequest', ['field_id', 'reductions', 'invariant', 'component', 'step_name',
+                                                   'frame_number', 'set_name', 'instance_name', 'position',
+                                                   'weight_field_id', 'percentiles', 'bins', 'top_k'],
+                              defaults=(('max', ), None, None, None, -1, '', '', 'INTEGRATION_POINT', 'IVOL', (50., ),
+                                        10, 10))
+
+WriteRequest = namedtuple('WriteRequest', ['field_data', 'field_id', 'step_name', 'instance_name', 'set_name',
+                                           'step_description', 'frame_number', 'frame_value', 'field_description',
+                                           'position', 'invariants'],
+                          defaults=('', '', '', None, None, '', 'INTEGRATION_POINT', ()))
+
+WriteStatistics = namedtuple('WriteStatistics', ['number_of_values', 'time', 'values_per_second'])
+
+MapResult = namedtuple('MapResult', ['odb_file_name', 'result', 'error'])
+
+StoreUpdate = namedtuple('StoreUpdate', ['store', 'frames'])
+
+FieldChunk = namedtuple('FieldChunk', ['data', 'node_labels', 'element_labels'])
+
+FieldHistory = namedtuple('FieldHistory', ['data', 'frame_values', 'step_names', 'frame_numbers', 'node_labels',
+                                           'element_labels'])
+
 
 class OdbInstance:
-    def __init__(self, name, input_file_data):
-        self.data = {
-            'instance_name': name,
-            'elements': {},
-            'node_sets': input_file_data.set_data['nset'],
-            'element_sets': input_file_data.set_data['elset']
-        }
-        nodes = []
-        for n in input_file_data.nodal_data:
-            node_data_list = [int(n[0])]
-            node_data_list.extend([float(coord) for coord in n[1:]])
-            nodes.append(node_data_list)
-        self.data['nodes'] = nodes
-        for element_type, element_data in input_file_data.elements.items():
-            pass
-            self.data['elements'][element_type] = element_data.tolist()
+    def __init__(self, name, input_file_data=None):
+        """
+        The nodes, elements and sets of an instance for create_empty_odb_from_nodes_and_elements stored as numpy
+        arrays. Use OdbInstance.from_arrays to create an instance without input file data
+
+        :param name:                The name of the instance
+        :param input_file_data:     Input file data with nodal_data, an array with node labels and coordinates,
+                                    elements, a dict with element types as keys and arrays with element labels and
+                                    connectivity as values, and set_data with the node sets under 'nset' and element
+                                    sets under 'elset'
+        """
+        self.data = {'instance_name': name, 'node_labels': np.zeros(0, dtype=np.int32),
+                     'node_coordinates': np.zeros((0, 3)), 'elements': {}, 'node_sets': {}, 'element_sets': {}}
+        if input_file_data is not None:
+            nodal_data = np.asarray(input_file_data.nodal_data, dtype=float)
+            elements = {}
+            for element_type, element_data in input_file_data.elements.items():
+                element_data = np.asarray(element_data)
+                elements[element_type] = (element_data[:, 0], element_data[:, 1:])
+            self._set_arrays(nodal_data[:, 0], nodal_data[:, 1:], elements, input_file_data.set_data['nset'],
+                             input_file_data.set_data['elset'])
+
+    @classmethod
+    def from_arrays(cls, name, node_labels, node_coordinates, elements, node_sets=None, element_sets=None):
+        """
+        :param name:                The name of the instance
+        :param node_labels:         Array with the node labels
+        :param node_coordinates:    Array with the coordinates of the nodes, one row per node
+        :param elements:            A dict with element types like 'C3D8' as keys and tuples with an array of element
+                                    labels and an array with the connectivity, one row per element, as values
+        :param node_sets:           A dict with set names as keys and arrays with node labels as values
+        :param element_sets:        A dict with set names as keys and arrays with element labels as values
+        """
+        instance = cls(name)
+        instance._set_arrays(node_labels, node_coordinates, elements, node_sets, element_sets)
+        return instance
+
+    def _set_arrays(self, node_labels, node_coordinates, elements, node_sets, element_sets):
+        # Abaqus labels are 32 bit integers
+        self.data['node_labels'] = np.asarray(node_labels, dtype=np.int32)
+        self.data['node_coordinates'] = np.asarray(node_coordinates, dtype=float)
+        self.data['elements'] = {str(element_type): {'labels': np.asarray(labels, dtype=np.int32),
+                                                     'connectivity': np.asarray(connectivity, dtype=np.int32)}
+                                 for element_type, (labels, connectivity) in elements.items()}
+        self.data['node_sets'] = {str(set_name): np.asarray(labels, dtype=np.int32)
+                                  for set_name, labels in (node_sets or {}).items()}
+        self.data['element_sets'] = {str(set_name): np.asarray(labels, dtype=np.int32)
+                                     for set_name, labels in (element_sets or {}).items()}
 
 
 class ABQInterface:
-    def __init__(self, abq_command, shell=None, output=False):
+    def __init__(self, abq_command, shell=None, output=False, persistent=False, odb_cache_size=4, result_cache=None,
+                 instrumentation=None, scratch=None):
+        """
+        :param abq_command:     The command used for starting abaqus
+        :param shell:           The shell used for running abaqus. Default is None which gives /bin/bash
+        :param output:          Flag if the output from abaqus should be shown. Default is False
+        :param persistent:      If True, the abaqus python scripts are run by a single long lived abaqus python
+                                process which is started at the first call and keeps the odbs open between the
+                                calls. The process is stopped by close() or when leaving a with block.
+                                Default is False which starts abaqus for every call
+        :param odb_cache_size:  Number of odbs kept open for reading by the persistent worker
+        :param result_cache:    A ResultCache or a directory for one. The results of get_steps, get_frames and
+                                read_data_from_odb are then stored on disk and reused until the odb is modified.
+                                Default is None which reads everything from the odb
+        :param instrumentation: An Instrumentation which records the timings of the phases of each call, both in the
+                                client and in abaqus. Default is None
+        :param scratch:         A ScratchManager or a root for one, for example 'local' or 'shm', for the files
+                                exchanged with abaqus. The exchange directories are then reused between the calls.
+                                Default is None which creates a temporary directory next to the odb for every call
+        """
         self.abq = abq_command
         if shell is None:
             shell = '/bin/bash'
         # ToDo: Update shell command for windows systems
         self.shell_command = shell
         self.output = output
+        self.odb_cache_size = odb_cache_size
+        self.instrumentation = instrumentation
+        self.label_indices = {}
+        self.worker = None
+        if persistent:
+            self.worker = AbaqusWorker(self.abq, self.shell_command, abaqus_python_directory, output=output,
+                                       odb_cache_size=odb_cache_size)
+        if result_cache is not None and not isinstance(result_cache, ResultCache):
+            result_cache = ResultCache(result_cache)
+        self.result_cache = result_cache
+        if scratch is not None and not isinstance(scratch, ScratchManager):
+            scratch = ScratchManager(scratch)
+        self.scratch = scratch
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        if self.worker is not None:
+            self.worker.close()
+
+    def clone(self):
+        """
+        Creates a new interface with the same settings, result cache and scratch manager but with its own abaqus worker
+        """
+        return ABQInterface(self.abq, self.shell_command, output=self.output, persistent=self.worker is not None,
+                            odb_cache_size=self.odb_cache_size, result_cache=self.result_cache,
+                            instrumentation=self.instrumentation, scratch=self.scratch)
+
+    def map(self, function, odb_file_names, max_processes=4, max_retries=5, retry_delay=30.):
+        """
+        Calls function(abq, odb_file_name) for many odbs in parallel where abq is an interface cloned from this one.
+        At most max_processes abaqus processes run at the same time which should match the number of available
+        licenses. Calls that fail with AbaqusLicenseError are retried with an exponentially increasing delay. A
+        waiting odb does not hold a process, the other odbs are processed while it waits
+
+        :param function:        Function taking an ABQInterface and an odb filename, for example
+                                    lambda abq, odb: abq.read_data_from_odb('S', odb)
+        :param odb_file_names:  The odbs to process
+        :param max_processes:   Maximum number of concurrent abaqus processes. Default is 4
+        :param max_retries:     Number of times a call is retried if no license could be checked out. Default is 5
+        :param retry_delay:     Delay in seconds before the first retry, doubled for every further retry
+        :return:                A generator giving a MapResult(odb_file_name, result, error) for each odb in the order
+                                the calls finish. error is the raised exception and result None if the call failed
+        """
+        odb_file_names = list(odb_file_names)
+        if not odb_file_names:
+            return
+        interfaces = queue.Queue()
+        clones = [self.clone() for _ in range(min(max_processes, len(odb_file_names)))]
+        for interface in clones:
+            interfaces.put(interface)
+
+        def run(odb_file_name):
+            interface = interfaces.get()
+            try:
+                return function(interface, odb_file_name)
+            finally:
+                interfaces.put(interface)
+
+        # The odbs waiting to be processed as (not before time, order, odb, attempt), failed calls are put back with
+        # the time of the retry so that the processes are used for the other odbs in the meantime
+        waiting = [(0., i, odb_file_name, 0) for i, odb_file_name in enumerate(odb_file_names)]
+        order = len(waiting)
+        running = {}
+        executor = ThreadPoolExecutor(max_workers=len(clones))
+        try:
+            while waiting or running:
+                now = time.monotonic()
+                while waiting and len(running) < len(clones) and waiting[0][0] <= now:
+                    _, _, odb_file_name, attempt = heapq.heappop(waiting)
+                    running[executor.submit(run, odb_file_name)] = (odb_file_name, attempt)
+                timeout = None
+                if waiting and len(running) < len(clones):
+                    timeout = max(waiting[0][0] - now, 0.)
+                if not running:
+                    time.sleep(timeout)
+                    continue
+                done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    odb_file_name, attempt = running.pop(future)
+                    try:
+                        yield MapResult(odb_file_name, future.result(), None)
+                    except AbaqusLicenseError as e:
+                        if attempt == max_retries:
+                            yield MapResult(odb_file_name, None, e)
+                        else:
+                            heapq.heappush(waiting, (time.monotonic() + retry_delay*2**attempt, order, odb_file_name,
+                                                     attempt + 1))
+                            order += 1
+                    except Exception as e:
+                        yield MapResult(odb_file_name, None, e)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            for interface in clones:
+                interface.close()
+
+    def map_read(self, odb_file_names, read_requests, dtype=None, mmap_mode=None, max_processes=4, max_retries=5,
+                 retry_delay=30.):
+        """
+        Reads the same fields from many odbs in parallel, see map and read_data_batch_from_odb
+
+        :return:    A generator giving a MapResult for each odb in the order the reads finish where result is the dict
+                    returned by read_data_batch_from_odb
+        """
+        read_requests = list(read_requests)
+        return self.map(lambda abq, odb_file_name: abq.read_data_batch_from_odb(odb_file_name, read_requests,
+                                                                                dtype=dtype, mmap_mode=mmap_mode),
+                        odb_file_names, max_processes=max_processes, max_retries=max_retries,
+                        retry_delay=retry_delay)
+
+    def run_python_script(self, script_name, *arguments):
+        stats = current_stats()
+        if stats is None:
+            self._run_python_script(script_name, arguments)
+            return
+        # The script is run by timed_script.py which writes the timings of the phases in abaqus to a file
+        timing_directory = tempfile.TemporaryDirectory() if self.scratch is None else self.scratch.work_directory()
+        with timing_directory as timing_directory_name:
+            timing_file_name = pathlib.Path(timing_directory_name) / 'timing.pkl'
+            start = time.time()
+            try:
+                self._run_python_script('timed_script.py', (timing_file_name, int(self.instrumentation.profile),
+                                                            script_name) + arguments, script_name)
+            finally:
+                end = time.time()
+                if timing_file_name.exists():
+                    with open(timing_file_name, 'rb') as timing_file:
+                        stats.add_abaqus_call(start, end, pickle.load(timing_file, encoding='latin1'))
+
+    def _run_python_script(self, script_name, arguments, timed_script_name=None):
+        if self.worker is not None:
+            with client_phase('abaqus'):
+                self.worker.run_script(script_name, arguments,
+                                       idempotent=(timed_script_name or script_name) in idempotent_scripts)
+        else:
+            return_code, output = self.run_command(python_command(self.abq, script_name, arguments),
+                                                   directory=abaqus_python_directory)
+            check_return_code(timed_script_name or script_name, return_code, output)
 
     def run_command(self, command_string, directory=None):
-        current_directory = os.getcwd()
-        if directory is not None:
-            os.chdir(directory)
+        """
+        Runs a command in the shell in the directory
+
+        :return:    The return code and the output of the command. The output is None if the interface is created
+                    with output=True as the output then is shown instead
+        """
+        if directory is None:
+            directory = os.getcwd()
+        with client_phase('abaqus'):
+            return self._run_command(command_string, directory)
+
+    def _run_command(self, command_string, directory):
         if self.output is True:
-            job = subprocess.Popen([self.shell_command, '-i', '-c', 'cd ' + str(directory) + ' &&' + command_string])
-        else:
-            f_null = open(os.devnull, 'w')
-            job = subprocess.Popen([self.shell_command, '-i', '-c', 'cd ' + str(directory) + ' &&' + command_string],
-                                   stdout=f_null, stderr=subprocess.STDOUT)
-        job.wait()
-        os.chdir(current_directory)
+            job = subprocess.run([self.shell_command, '-i', '-c', 'cd ' + str(directory) + ' &&' + command_string],
+                                 cwd=directory, stdin=subprocess.DEVNULL)
+            return job.returncode, None
+        job = subprocess.run([self.shell_command, '-i', '-c', 'cd ' + str(directory) + ' &&' + command_string],
+                             cwd=directory, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        return job.returncode, job.stdout.decode(errors='replace')
 
+    def _cached(self, odb_file_name, method, parameters, compute, *args, mmap_mode=None):
+        if self.result_cache is None:
+            return compute(*args)
+        return self.result_cache.get_or_compute(odb_file_name, method, parameters, lambda: compute(*args),
+                                                mmap_mode=mmap_mode)
+
+    @instrumented
     def get_steps(self, odb_file_name):
-        with TemporaryDirectory(odb_file_name) as work_directory:
+        return self._cached(odb_file_name, 'get_steps', {}, self._get_steps, odb_file_name)
+
+    def _get_steps(self, odb_file_name):
+        with exchange_directory(self.scratch, odb_file_name) as work_directory:
             results_pickle_name = work_directory / 'results.pkl'
-            self.run_command(self.abq + ' python get_steps.py ' + str(odb_file_name) + ' ' + str(results_pickle_name),
-                             directory=abaqus_python_directory)
-            with open(results_pickle_name, 'rb') as results_pickle:
-                steps = pickle.load(results_pickle, encoding='latin1')
+            self.run_python_script('get_steps.py', odb_file_name, results_pickle_name)
+            steps = load_data(results_pickle_name)
         return steps
 
+    @instrumented
     def get_frames(self, odb_file_name, step_name=-1):
-        step_names = self.get_steps(odb_file_name)
         if step_name == -1:
-            step_name = step_names[-1]
-        elif step_name not in step_names:
-            raise ValueError(f"The step name {step_name} is not present in the odb {odb_file_name}")
-        with TemporaryDirectory(odb_file_name) as work_directory:
+            step_name = ''
+        frames = self._cached(odb_file_name, 'get_frames', {'step_name': step_name}, self._get_frames, odb_file_name,
+                              step_name)
+        return frames_output(frames, odb_file_name, step_name)
+
+    def _get_frames(self, odb_file_name, step_name):
+        with exchange_directory(self.scratch, odb_file_name) as work_directory:
             results_pickle_name = work_directory / 'results.pkl'
-            self.run_command(self.abq + ' python get_frames.py ' + str(odb_file_name) + ' ' + step_name + ' '
-                             + str(results_pickle_name), directory=abaqus_python_directory)
-            with open(results_pickle_name, 'rb') as results_pickle:
-                frames = pickle.load(results_pickle, encoding='latin1')
+            self.run_python_script('get_frames.py', odb_file_name, step_name, results_pickle_name)
+            frames = load_data(results_pickle_name)
         return frames
 
-    def create_empty_odb_from_odb(self, new_odb_filename, odb_to_copy):
-        self.run_command(self.abq + ' python create_empty_odb_from_odb.py ' + str(new_odb_filename) + ' '
-                         + str(odb_to_copy), directory=abaqus_python_directory)
+    @instrumented
+    def get_odb_catalog(self, odb_file_name):
+        """
+        Reads the steps, frames with frame values and increment numbers, fields with output positions and components,
+        instances and sets with their sizes from an odb in a single pass. The catalog is stored in the result cache
+        if the interface has one
+
+        :param odb_file_name:   Filename of the odb
+        :return:                An OdbCatalog
+        """
+        return OdbCatalog(self._cached(odb_file_name, 'get_odb_catalog', {}, self._get_odb_catalog, odb_file_name))
+
+    def _get_odb_catalog(self, odb_file_name):
+        with exchange_directory(self.scratch, odb_file_name) as work_directory:
+            results_pickle_name = work_directory / 'results.pkl'
+            self.run_python_script('get_odb_catalog.py', odb_file_name, results_pickle_name)
+            return load_data(results_pickle_name)
+
+    @instrumented
+    def get_mesh(self, odb_file_name, instance_name=''):
+        """
+        Reads the nodes and elements of an instance, the mesh is stored in the result cache if the interface has one
+
+        :param odb_file_name:   Filename of the odb
+        :param instance_name:   Name of the instance. Default is '' which only works if the odb has a single instance
+        :return:                An OdbInstance with the nodes and elements, for example used with
+                                PathProbe.from_instance to interpolate data without abaqus
+        """
+        data = self._cached(odb_file_name, 'get_mesh', {'instance_name': instance_name}, self._get_mesh, odb_file_name,
+                            instance_name, False)
+        elements = {element_type: (element_data['labels'], element_data['connectivity'])
+                    for element_type, element_data in data['elements'].items()}
+        return OdbInstance.from_arrays(data['instance_name'], data['node_labels'], data['node_coordinates'], elements)
+
+    def _get_mesh(self, odb_file_name, instance_name, include_sets):
+        with exchange_directory(self.scratch, odb_file_name) as work_directory:
+            results_pickle_name = work_directory / 'results.pkl'
+            self.run_python_script('get_mesh.py', odb_file_name, instance_name, int(include_sets),
+                                   results_pickle_name)
+            return load_data(results_pickle_name)
+
+    @instrumented
+    def export_mesh(self, odb_file_name, mesh_file_name, instance_name='', mmap_mode='r'):
+        """
+        Reads the nodes, elements, node sets and element sets of an instance once and writes them to a mesh file that
+        is loaded with Mesh.load without abaqus
+
+        :param odb_file_name:   Filename of the odb
+        :param mesh_file_name:  Filename of the mesh, an uncompressed .npz file
+        :param instance_name:   Name of the instance. Default is '' which only works if the odb has a single instance
+        :param mmap_mode:       Memory mapping of the returned mesh, see Mesh.load. Default is 'r'
+        :return:                The Mesh loaded from the file
+        """
+        Mesh.from_instance(self._get_mesh(odb_file_name, instance_name, True)).save(mesh_file_name)
+        return Mesh.load(mesh_file_name, mmap_mode=mmap_mode)
+
+    @instrumented
+    def export_odb(self, odb_file_name, store_directory, field_ids=None, step_names=None, frames=None, set_name='',
+                   instance_name='', positions=None, chunk_size=100000, compress=True, dtype=None, incremental=False):
+        """
+        Exports fields in frames of an odb to a store on disk in a single abaqus call, the store is then read with
+        OdbStore without abaqus. The data of each field and frame is stored in chunks of rows, compressed by default,
+        and the labels are stored once per field. The store records the exported frames and an incremental export
+        only reads the frames that are not in the store, see also watch_odb
+
+        :param odb_file_name:       Filename of the odb
+        :param store_directory:     Directory of the store, an existing store in the directory is replaced when the
+                                    new store is complete
+        :param field_ids:           The fields to export, for example ['S', 'U']. Default is None which exports all
+                                    fields with output at INTEGRATION_POINT, NODAL or ELEMENT_NODAL for the set,
+                                    other fields like EVOL are skipped
+        :param step_names:          The steps to export. Default is None which exports all steps
+        :param frames:              The frames to export in each step as a slice or a list of frame numbers, see
+                                    read_history_from_odb. Default is None which exports all frames
+        :param set_name:            Name of the set to export. Default is '' which exports the whole instance
+        :param instance_name:       Name of the instance. Default is '' which only works if the odb has a single instance
+        :param positions:           A dict with field ids as keys and output positions, for example 'NODAL', as values
+                                    for fields that should not be exported at their default position. The default is
+                                    INTEGRATION_POINT for fields with output there and NODAL otherwise
+        :param chunk_size:          Number of rows in each chunk. Default is 100000
+        :param compress:            Flag if the chunks should be compressed. Uncompressed chunks are larger but are
+                                    memory mapped when read. Default is True
+        :param dtype:               Floating point type of the stored data, for example 'float32'. Default is None
+                                    which stores the data in double precision
+        :param incremental:         If True, the frames of an existing store are kept and only new frames are exported.
+                                    The other arguments must be the same as for the export that created the store.
+                                    Default is False which replaces an existing store
+        :return:                    An OdbStore for the store
+        """
+        if isinstance(step_names, str):
+            step_names = [step_names]
+        if isinstance(frames, slice):
+            frames = (frames.start, frames.stop, frames.step)
+        elif frames is not None:
+            frames = [int(frame_number) for frame_number in frames]
+        parameter_data = {'odb_file_name': str(pathlib.Path(odb_file_name).absolute()),
+                          'store_directory': str(pathlib.Path(store_directory).absolute()),
+                          'field_ids': None if field_ids is None else [str(field_id) for field_id in field_ids],
+                          'step_names': None if step_names is None else list(step_names), 'frames': frames,
+                          'set_name': set_name, 'instance_name': instance_name,
+                          'positions': None if positions is None else dict(positions), 'chunk_size': int(chunk_size),
+                          'compress': bool(compress), 'dtype': dtype, 'incremental': bool(incremental)}
+        with exchange_directory(self.scratch, odb_file_name) as work_directory:
+            parameter_pickle_name = work_directory / 'parameter_pickle.pkl'
+            with open(parameter_pickle_name, 'wb') as pickle_file:
+                pickle.dump(parameter_data, pickle_file, protocol=2)
+            self.run_python_script('export_odb.py', parameter_pickle_name)
+        return OdbStore(store_directory)
+
+    def watch_odb(self, odb_file_name, store_directory, min_interval=1., max_interval=60., backoff=2.,
+                  stop_when_finished=True, idle_timeout=None, **export_arguments):
+        """
+        Follows the odb of a running job and exports the new frames to a store as they are written. Abaqus is only
+        started when the size or the modification time of the odb has changed, and then only reads the new frames. The
+        time between the checks starts at min_interval, is multiplied by backoff for every check without new frames up
+        to max_interval and is reset when new frames are found. The newest frame is exported when the job has written
+        the next frame or has finished, as the solver can still be writing it. Watching can start before the job has
+        written the odb, the odb is then waited for while the lock file exists
+
+        :param odb_file_name:       Filename of the odb
+        :param store_directory:     Directory of the store, an existing store from an earlier export with the same
+                                    arguments is continued
+        :param min_interval:        Shortest time in seconds between the checks of the odb. Default is 1
+        :param max_interval:        Longest time in seconds between the checks of the odb. Default is 60
+        :param backoff:             Factor the time between the checks is increased with. Default is 2
+        :param stop_when_finished:  If True, watching stops after the odb has been exported when the lock file of the
+                                    job, the odb filename with the extension .lck, does not exist. Default is True
+        :param idle_timeout:        Time in seconds without new frames after which watching stops. Default is None
+                                    which watches until the job is finished
+        :param export_arguments:    Arguments for export_odb, for example field_ids=['S']
+        :return:                    A generator giving a StoreUpdate(store, frames) for every export that finds new
+                                    frames where frames is a list with the step name and the frame number of the new
+                                    frames
+        """
+        odb_file_name = pathlib.Path(odb_file_name)
+        lock_file_name = odb_file_name.with_suffix('.lck')
+        exported_state = None
+        interval = min_interval
+        last_update = time.monotonic()
+        while True:
+            job_running = lock_file_name.exists()
+            finished = stop_when_finished and not job_running
+            try:
+                stat = odb_file_name.stat()
+            except FileNotFoundError:
+                if not job_running:
+                    raise
+                # A job that was just submitted has not yet written the odb, this is handled as a check without change
+                stat = None
+            # The newest frame is not exported while the job is running and is exported when the lock file is removed
+            state = None if stat is None else (stat.st_mtime_ns, stat.st_size, job_running)
+            new_frames = []
+            if state is not None and state != exported_state:
+                old_frames = set()
+                if (pathlib.Path(store_directory) / 'manifest.json').exists():
+                    old_frames = {tuple(frame) for frame in
+                                  OdbStore(store_directory).manifest.get('exported_frames', [])}
+                store = self.export_odb(odb_file_name, store_directory, incremental=bool(old_frames),
+                                        **export_arguments)
+                exported_state = state
+                new_frames = [tuple(frame) for frame in store.manifest['exported_frames']
+                              if tuple(frame) not in old_frames]
+            if new_frames:
+                interval = min_interval
+                last_update = time.monotonic()
+                yield StoreUpdate(store, new_frames)
+            if finished:
+                return
+            if idle_timeout is not None and time.monotonic() - last_update > idle_timeout:
+                return
+            time.sleep(interval)
+            if not new_frames:
+                interval = min(interval*backoff, max_interval)
+
+    @instrumented
+    def create_empty_odb_from_odb(self, new_odb_filename, odb_to_copy, step_names=None, frame_numbers=None,
+                                  field_ids=None):
+        """
+        Creates an odb with the parts, instances and sets of another odb. Results can be copied in the same pass to
+        create a smaller odb with the results of interest
+
+        :param new_odb_filename:    Filename of the new odb
+        :param odb_to_copy:         Filename of the odb to copy
+        :param step_names:          Names of the steps to copy results from. Default is None which copies no results
+        :param frame_numbers:       The frames to copy in each step, for example [-1] for the last frame. Default is
+                                    None which copies all frames
+        :param field_ids:           The fields to copy, for example ['S', 'U']. Default is None which copies all fields
+        """
+        with exchange_directory(self.scratch, new_odb_filename) as work_directory:
+            parameter_pickle_name = work_directory / 'parameter_pickle.pkl'
+            save_data(parameter_pickle_name, {'new_odb_file_name': str(new_odb_filename),
+                                              'old_odb_file_name': str(odb_to_copy),
+                                              'step_names': None if step_names is None else list(step_names),
+                                              'frame_numbers': None if frame_numbers is None else list(frame_numbers),
+                                              'field_ids': None if field_ids is None else list(field_ids)})
+            self.run_python_script('create_empty_odb_from_odb.py', parameter_pickle_name)
 
+    @instrumented
     def create_empty_odb_from_nodes_and_elements(self, odb_file_name, instances):
+        """
+        Creates an odb with the parts, instances and sets of a list of OdbInstance. The arrays are transferred as .npy
+        files and the odb is saved once
+
+        :param odb_file_name:   Filename of the new odb
+        :param instances:       A list of OdbInstance or Mesh
+        """
         instances = [instance.data for instance in instances]
         data_for_creating_odb = {
             'odb_file_name': str(odb_file_name),
             'instance_data': instances
         }
-        with TemporaryDirectory(odb_file_name) as work_directory:
+        with exchange_directory(self.scratch, odb_file_name) as work_directory:
             parameter_pickle_name = work_directory / 'parameter_pickle.pkl'
-            with open(parameter_pickle_name, 'wb') as pickle_file:
-                pickle.dump(data_for_creating_odb, pickle_file, protocol=2)
-            self.run_command(self.abq + ' python create_empty_odb_from_data.py ' + str(parameter_pickle_name),
-                             directory=abaqus_python_directory)
+            save_data(parameter_pickle_name, data_for_creating_odb)
+            self.run_python_script('create_empty_odb_from_data.py', parameter_pickle_name)
 
+    @instrumented
     def read_data_from_odb(self, field_id, odb_file_name, step_name=None, frame_number=-1, set_name='',
                            instance_name='', get_position_numbers=False, get_frame_value=False,
-                           position='INTEGRATION_POINT', coordinate_system=None):
-        with TemporaryDirectory(odb_file_name) as work_directory:
+                           position='INTEGRATION_POINT', coordinate_system=None, dtype=None, mmap_mode=None,
+                           out=None, get_label_index=False, labels=None):
+        """
+        Reads a field from an odb, see read_field_from_odb in abaqus_python_scripts/odb_io_functions.py for the
+        arguments. The data is transferred from abaqus as raw .npy files. The odb is opened read only and is not
+        changed, so any number of reads of the same odb can run at the same time
+
+        :param dtype:           Floating point type of the transferred data, for example 'float32' which halves the
+                                size. Default is None which transfers the data in double precision
+        :param mmap_mode:       If given, for example 'r', the arrays are memory mapped from the transferred files
+                                instead of being read into memory. The files are moved out of the exchange directory
+                                and removed when the arrays are garbage collected. Default is None
+        :param out:             A caller provided array with the shape of the data that the data is copied into and
+                                which then is returned as the data. Default is None
+        :param get_label_index: Flag if a LabelIndex of the rows of the data should be returned last, after the other
+                                outputs. The index is kept by the interface and reused for later reads of the same
+                                instance, set and position. Default is False
+        :param labels:          An array with the node labels, for NODAL and ELEMENT_NODAL, or the element labels of the
+                                values to read from the set or the instance, without creating a set in the odb. The
+                                values are given in the order of the odb. Default is None which reads all values
+        """
+        parameter_data = read_parameters(field_id, odb_file_name, step_name, frame_number, set_name, instance_name,
+                                         get_position_numbers or get_label_index, get_frame_value, position,
+                                         coordinate_system, dtype, labels)
+        if out is not None:
+            mmap_mode = 'r'
+        data = self._cached(odb_file_name, 'read_data_from_odb', parameter_data, self._read_data_from_odb,
+                            parameter_data, mmap_mode, mmap_mode=mmap_mode)
+        output = read_output(data, get_position_numbers, get_frame_value, out)
+        if not get_label_index:
+            return output
+        if not isinstance(output, tuple):
+            output = (output, )
+        return output + (self._label_index(odb_file_name, instance_name, set_name, position, data),)
+
+    def _label_index(self, odb_file_name, instance_name, set_name, position, data):
+        key = (str(pathlib.Path(odb_file_name).absolute()), instance_name, set_name, position)
+        labels = data['element_labels'] if len(data['element_labels']) > 0 else data['node_labels']
+        label_index = self.label_indices.get(key, None)
+        if label_index is None or not np.array_equal(label_index.labels, labels):
+            label_index = LabelIndex.from_labels(data['node_labels'], data['element_labels'])
+            self.label_indices[key] = label_index
+        return label_index
+
+    def _read_data_from_odb(self, parameter_data, mmap_mode):
+        with exchange_directory(self.scratch, parameter_data['odb_file_name']) as work_directory:
             parameter_pickle_name = work_directory / 'parameter_pickle.pkl'
             results_pickle_name = work_directory / 'results.pkl'
-            if step_name is None:
-                step_name = ''
-            parameter_data = {'field_id': field_id, 'odb_file_name': str(odb_file_name), 'step_name': step_name,
-                              'frame_number': frame_number, 'set_name': set_name, 'instance_name': instance_name,
-                              'get_position_numbers': get_position_numbers, 'get_frame_value': get_frame_value,
-                              'position': position}
-            if coordinate_system:
-                parameter_data['coordinate_system'] = coordinate_system._asdict()
             with open(parameter_pickle_name, 'wb') as pickle_file:
                 pickle.dump(parameter_data, pickle_file, protocol=2)
-            self.run_command(self.abq + ' python read_data_from_odb.py ' + str(parameter_pickle_name) + ' '
-                             + str(results_pickle_name), directory=abaqus_python_directory)
-            with open(results_pickle_name, 'rb') as results_pickle:
-                data = pickle.load(results_pickle, encoding='latin1')
-
-        if not get_position_numbers and not get_frame_value:
-            return data['data']
-        elif not get_position_numbers:
-            return data['data'], data['frame_value']
-        elif not get_frame_value:
-            return data['data'], data['node_labels'], data['element_labels']
-        else:
-            return data['data'], data['frame_value'], data['node_labels'], data['element_labels']
+            self.run_python_script('read_data_from_odb.py', parameter_pickle_name, results_pickle_name)
+            return load_data(results_pickle_name, mmap_mode=mmap_mode, array_directory=array_directory(self.scratch))
+
+    @instrumented
+    def read_data_batch_from_odb(self, odb_file_name, read_requests, dtype=None, mmap_mode=None, catalog=None):
+        """
+        Reads several fields, frames and sets from an odb in a single abaqus call which opens the odb once
+
+        :param odb_file_name:   Filename of the odb
+        :param read_requests:   A list of ReadRequest, for example
+                                    [ReadRequest('S', frame_number=i) for i in range(10)]
+                                gives the stresses in the first ten frames of the last step. The labels of a
+                                request, see read_data_from_odb, are given as a tuple as the requests are used as keys
+        :param dtype:           Floating point type of the transferred data, see read_data_from_odb
+        :param mmap_mode:       Memory mapping of the transferred arrays, see read_data_from_odb
+        :param catalog:         An OdbCatalog of the odb. If given, the requests are validated against the catalog
+                                before abaqus is started and a ValueError is raised for invalid requests
+        :return:                A dict with the read requests as keys and dicts with the keys data, frame_value,
+                                node_labels and element_labels as values
+        """
+        read_requests = list(read_requests)
+        if catalog is not None:
+            for request in read_requests:
+                catalog.validate_read_request(request)
+        with exchange_directory(self.scratch, odb_file_name) as work_directory:
+            parameter_pickle_name = work_directory / 'parameter_pickle.pkl'
+            results_pickle_name = work_directory / 'results.pkl'
+            parameter_requests = []
+            for request in read_requests:
+                parameter_request = request._asdict()
+                if parameter_request['step_name'] is None:
+                    parameter_request['step_name'] = ''
+                if request.coordinate_system:
+                    parameter_request['coordinate_system'] = request.coordinate_system._asdict()
+                parameter_request['labels'] = label_list(request.labels)
+                parameter_requests.append(parameter_request)
+            with open(parameter_pickle_name, 'wb') as pickle_file:
+                pickle.dump({'odb_file_name': str(odb_file_name), 'read_requests': parameter_requests,
+                             'dtype': dtype}, pickle_file, protocol=2)
+            self.run_python_script('read_data_batch_from_odb.py', parameter_pickle_name, results_pickle_name)
+            data = load_data(results_pickle_name, mmap_mode=mmap_mode, array_directory=array_directory(self.scratch))
+        return dict(zip(read_requests, data))
+
+    @instrumented
+    def stream_data_from_odb(self, field_id, odb_file_name, step_name=None, frame_number=-1, set_name='',
+                             instance_name='', position='INTEGRATION_POINT', coordinate_system=None, dtype=None,
+                             chunk_size=100000, max_pending_chunks=2, poll_interval=0.01, labels=None):
+        """
+        Reads a field in chunks with a generator so that the memory use of the caller and the exchanged files depend
+        on the chunk size and not on the size of the model. In abaqus, the peak memory is one bulk data block, all
+        values of one element type in one instance, plus the chunk. Abaqus writes the chunks while the previous chunks
+        are processed and waits if max_pending_chunks chunks are not yet read. Abaqus is stopped if the generator is
+        closed before all chunks are read. With a persistent interface, the interface cannot be used for other calls
+        while iterating over the chunks
+
+        :param chunk_size:          Maximum number of values in each chunk
+        :param max_pending_chunks:  Maximum number of chunks that abaqus writes ahead of the reading
+        :param poll_interval:       Time in seconds between the checks for new chunks
+        :return:                    A generator giving a FieldChunk for each chunk, with data and labels as for
+                                    read_data_from_odb with get_position_numbers=True. The chunks are given in the
+                                    same order as the rows of read_data_from_odb
+
+        See read_data_from_odb for the other arguments
+        """
+        parameter_data = read_parameters(field_id, odb_file_name, step_name, frame_number, set_name, instance_name,
+                                         True, False, position, coordinate_system, dtype, labels)
+        parameter_data['chunk_size'] = chunk_size
+        parameter_data['max_pending_chunks'] = max_pending_chunks
+        with exchange_directory(self.scratch, odb_file_name) as work_directory:
+            parameter_data['output_directory'] = str(work_directory.absolute())
+            parameter_pickle_name = work_directory / 'parameter_pickle.pkl'
+            with open(parameter_pickle_name, 'wb') as pickle_file:
+                pickle.dump(parameter_data, pickle_file, protocol=2)
+            errors = []
+            stats = current_stats()
+
+            def run():
+                try:
+                    with use_stats(stats):
+                        self.run_python_script('stream_data_from_odb.py', parameter_pickle_name)
+                except Exception as error:
+                    errors.append(error)
+
+            thread = threading.Thread(target=run, daemon=True)
+            thread.start()
+            try:
+                chunk_number = 0
+                while True:
+                    chunk_file_name = work_directory / ('chunk_' + str(chunk_number) + '.pkl')
+                    if chunk_file_name.exists():
+                        chunk = load_data(chunk_file_name)
+                        chunk_file_name.unlink()
+                        for array_file_name in work_directory.glob('chunk_' + str(chunk_number) + '_*.npy'):
+                            array_file_name.unlink()
+                        chunk_number += 1
+                        yield FieldChunk(chunk['data'], chunk['node_labels'], chunk['element_labels'])
+                    elif (work_directory / 'done.pkl').exists():
+                        if chunk_number == load_data(work_directory / 'done.pkl')['number_of_chunks']:
+                            break
+                    elif not thread.is_alive():
+                        # The chunk or the done file could have been written just before abaqus exited
+                        if chunk_file_name.exists() or (work_directory / 'done.pkl').exists():
+                            continue
+                        if errors:
+                            raise errors[0]
+                        raise AbaqusError('The script stream_data_from_odb.py stopped without reading all chunks')
+                    else:
+                        time.sleep(poll_interval)
+            finally:
+                (work_directory / 'cancel').touch()
+                thread.join()
+
+    @instrumented
+    def read_history_from_odb(self, field_id, odb_file_name, step_names=None, frames=None, set_name='',
+                              instance_name='', position='INTEGRATION_POINT', coordinate_system=None, dtype=None,
+                              history_file=None, mmap_mode=None, labels=None):
+        """
+        Reads a field in all frames, or a selection of frames, of one or more steps in a single abaqus call. The odb is
+        opened once, the set is resolved once and abaqus writes the frames one by one to a memory mapped .npy file
+
+        :param field_id:            The ID of the field, for example 'S'
+        :param odb_file_name:       Filename of the odb
+        :param step_names:          Name of a step or a list of step names. Default is None which gives the last step
+        :param frames:              The frames to read in each step as a slice, for example slice(0, None, 2) for every
+                                    second frame, or a list of frame numbers where -1 is the last frame. Default is
+                                    None which reads all frames
+        :param dtype:               Floating point type of the history, for example 'float32' which halves the size.
+                                    Default is None which gives double precision
+        :param history_file:        Filename of a .npy file that abaqus writes the history to, the file is kept after
+                                    the call. Default is None which writes the history to a temporary file
+        :param mmap_mode:           Memory mapping of the history, see read_data_from_odb. Default is None which reads
+                                    the history into memory unless history_file is given, then the file is memory
+                                    mapped with mode 'r'
+        :return:                    A FieldHistory where data has the shape (frames, points, components) and
+                                    frame_values, step_names and frame_numbers have one value per frame. The labels
+                                    are the same as for read_data_from_odb with get_position_numbers=True
+
+        See read_data_from_odb for the other arguments
+        """
+        if isinstance(step_names, str):
+            step_names = [step_names]
+        if isinstance(frames, slice):
+            frames = (frames.start, frames.stop, frames.step)
+        elif frames is not None:
+            frames = [int(frame_number) for frame_number in frames]
+        parameter_data = {'field_id': field_id, 'odb_file_name': str(odb_file_name),
+                          'step_names': None if step_names is None else list(step_names), 'frames': frames,
+                          'set_name': set_name, 'instance_name': instance_name, 'position': position,
+                          'dtype': dtype, 'labels': label_list(labels)}
+        if coordinate_system:
+            parameter_data['coordinate_system'] = coordinate_system._asdict()
+        if history_file is not None and mmap_mode is None:
+            mmap_mode = 'r'
+        with exchange_directory(self.scratch, odb_file_name) as work_directory:
+            mapped_directory = None
+            if history_file is None:
+                history_file = work_directory / 'history.npy'
+                mapped_directory = array_directory(self.scratch)
+            parameter_data['history_file_name'] = str(pathlib.Path(history_file).absolute())
+            parameter_pickle_name = work_directory / 'parameter_pickle.pkl'
+            results_pickle_name = work_directory / 'results.pkl'
+            with open(parameter_pickle_name, 'wb') as pickle_file:
+                pickle.dump(parameter_data, pickle_file, protocol=2)
+            self.run_python_script('read_history_from_odb.py', parameter_pickle_name, results_pickle_name)
+            history = load_data(results_pickle_name)
+            data = load_array(history_file, mmap_mode, mapped_directory)
+        return FieldHistory(data, history['frame_values'], history['step_names'], history['frame_numbers'],
+                            history['node_labels'], history['element_labels'])
+
+    @instrumented
+    def reduce_data_from_odb(self, odb_file_name, reduction_requests):
+        """
+        Computes reductions of fields in abaqus so that only the results are transferred, for several fields, sets and
+        frames in a single abaqus call
 
+        :param odb_file_name:       Filename of the odb
+        :param reduction_requests:  A list of ReductionRequest, for example
+                                        ReductionRequest('S', ('max', 'top_k'), invariant='MISES', top_k=5)
+                                    gives the largest von Mises stress and the five largest values with their labels
+                                    and integration points in the last frame. The reductions are min, max, mean,
+                                    weighted_mean, percentiles, histogram and top_k and the invariants are MISES,
+                                    PRESS, MAX_PRINCIPAL, MID_PRINCIPAL, MIN_PRINCIPAL and MAGNITUDE. weighted_mean is
+                                    weighted with the field weight_field_id, IVOL by default. Fields with several
+                                    components require an invariant or a component, for example 'S11'
+        :return:                    A dict with the requests as keys and dicts with the reductions as keys as values,
+                                    see reduce_values in abaqus_python_scripts/reductions.py
+        """
+        reduction_requests = list(reduction_requests)
+        with exchange_directory(self.scratch, odb_file_name) as work_directory:
+            parameter_pickle_name = work_directory / 'parameter_pickle.pkl'
+            results_pickle_name = work_directory / 'results.pkl'
+            parameter_requests = []
+            for request in reduction_requests:
+                parameter_request = request._asdict()
+                if parameter_request['step_name'] is None:
+                    parameter_request['step_name'] = ''
+                if isinstance(request.reductions, str):
+                    parameter_request['reductions'] = [request.reductions]
+                parameter_request['reductions'] = list(parameter_request['reductions'])
+                parameter_request['percentiles'] = [float(percentile) for percentile in request.percentiles]
+                if not isinstance(request.bins, int):
+                    parameter_request['bins'] = np.asarray(request.bins, dtype=float)
+                parameter_requests.append(parameter_request)
+            save_data(parameter_pickle_name, {'odb_file_name': str(odb_file_name),
+                                              'reduction_requests': parameter_requests})
+            self.run_python_script('reduce_data_from_odb.py', parameter_pickle_name, results_pickle_name)
+            results = load_data(results_pickle_name)
+        return dict(zip(reduction_requests, results))
+
+    @instrumented
     def write_data_to_odb(self, field_data, field_id, odb_file_name, step_name, instance_name='', set_name='',
                           step_description='', frame_number=None, frame_value=None, field_description='',
-                          position='INTEGRATION_POINT', invariants=None):
-        with TemporaryDirectory(odb_file_name) as work_directory:
+                          position='INTEGRATION_POINT', invariants=None, dtype=None):
+        with exchange_directory(self.scratch, odb_file_name) as work_directory:
             pickle_filename = work_directory / 'load_field_to_odb_pickle.pkl'
-            data_filename = work_directory / 'field_data.npy'
-            np.save(str(data_filename), field_data)
-            if invariants is None:
-                invariants = []
-            with open(pickle_filename, 'wb') as pickle_file:
-                pickle.dump({'field_id': str(field_id), 'odb_file': str(odb_file_name), 'step_name': str(step_name),
-                             'instance_name': str(instance_name), 'set_name': str(set_name),
-                             'step_description': str(step_description),
-                             'frame_number': frame_number, 'frame_value': frame_value,
-                             'field_description': str(field_description), 'position': str(position)},
-                            pickle_file, protocol=2)
-
-            self.run_command(self.abq + ' python write_data_to_odb.py ' + str(data_filename) + ' '
-                             + str(pickle_filename), directory=abaqus_python_directory)
+            save_write_parameters(pickle_filename, field_data, field_id, odb_file_name, step_name, instance_name,
+                                  set_name, step_description, frame_number, frame_value, field_description, position,
+                                  invariants, dtype)
+            self.run_python_script('write_data_to_odb.py', pickle_filename)
+
+    @instrumented
+    def write_data_batch_to_odb(self, odb_file_name, write_requests, dtype=None):
+        """
+        Writes several fields and frames to an odb in a single abaqus call which opens and saves the odb once
+
+        :param odb_file_name:   Filename of the odb
+        :param write_requests:  A list of WriteRequest, see write_data_to_odb for the fields. The requests are written
+                                in order, a frame created by a request with frame_number=None can be written to by the
+                                following requests with frame_number=-1
+        :param dtype:           Floating point type of the transferred data, see read_data_from_odb
+        :return:                A WriteStatistics with the number of written values, the time in seconds including
+                                the start of abaqus and the throughput in values per second
+        """
+        start_time = time.perf_counter()
+        parameter_requests = []
+        number_of_values = 0
+        for request in write_requests:
+            parameter_request = request._asdict()
+            parameter_request['field_data'] = np.asarray(request.field_data)
+            parameter_request['invariants'] = [str(invariant) for invariant in request.invariants]
+            parameter_requests.append(parameter_request)
+            number_of_values += parameter_request['field_data'].size
+        with exchange_directory(self.scratch, odb_file_name) as work_directory:
+            pickle_filename = work_directory / 'write_requests.pkl'
+            save_data(pickle_filename, {'odb_file_name': str(odb_file_name), 'write_requests': parameter_requests},
+                      dtype=dtype)
+            self.run_python_script('write_data_batch_to_odb.py', pickle_filename)
+        write_time = time.perf_counter() - start_time
+        return WriteStatistics(number_of_values, write_time, number_of_values/write_time)
+
+    @instrumented
+    def write_time_series_to_odb(self, odb_file_name, field_data, step_name, frame_values, instance_name='',
+                                 set_name='', step_description='', position='INTEGRATION_POINT', invariants=(),
+                                 dtype=None):
+        """
+        Writes time series of fields as new frames last in a step in a single abaqus call
 
+        :param odb_file_name:   Filename of the odb
+        :param field_data:      A dict with field ids as keys and arrays with the shape (number of frames,
+                                number of values) or (number of frames, number of values, number of components) as
+                                values. All fields are written to the same frames
+        :param step_name:       Name of the step, created if it does not exist
+        :param frame_values:    The frame values of the new frames
+        :param position:        A dict with the output position per field id or a position used for all fields
+        :param invariants:      A dict with the invariants per field id or a list used for all fields
+        :return:                A WriteStatistics, see write_data_batch_to_odb
+        """
+        write_requests = []
+        for frame_number, frame_value in enumerate(frame_values):
+            for i, (field_id, data) in enumerate(field_data.items()):
+                field_position = position[field_id] if isinstance(position, dict) else position
+                field_invariants = invariants.get(field_id, ()) if isinstance(invariants, dict) else invariants
+                write_requests.append(WriteRequest(data[frame_number], field_id, step_name, instance_name, set_name,
+                                                   step_description, None if i == 0 else -1, frame_value,
+                                                   position=field_position, invariants=field_invariants))
+        return self.write_data_batch_to_odb(odb_file_name, write_requests, dtype=dtype)
+
+    @instrumented
     def get_data_from_path(self, path_points, odb_filename, variable, component=None, step_name=None, frame_number=None,
                            output_position='ELEMENT_NODAL'):
         odb_filename = pathlib.Path(odb_filename)
-        with TemporaryDirectory(odb_filename) as work_directory:
-            parameter_pickle_name = work_directory / 'parameter_pickle.pkl'
-            path_points_filename = work_directory / 'path_points.npy'
-            data_filename = work_directory / 'path_data.npy'
-            parameter_dict = {'odb_filename': str(odb_filename),
-                              'variable': variable,
-                              'path_points_filename': str(path_points_filename),
-                              'data_filename': str(data_filename)}
-            if component is not None:
-                parameter_dict['component'] = component
-            if step_name is not None:
-                parameter_dict['step_name'] = step_name
-            if frame_number is not None:
-                parameter_dict['frame_number'] = frame_number
-            parameter_dict['output_position'] = output_position
+        with exchange_directory(self.scratch, odb_filename) as work_directory:
+            parameter_pickle_name, data_filename = save_path_parameters(work_directory, path_points, odb_filename,
+                                                                        variable, component, step_name,
+                                                                        frame_number, output_position)
+            return_code, output = self.run_command(self.abq + ' viewer noGUI=write_data_along_path.py -- '
+                                                   + str(parameter_pickle_name), directory=abaqus_python_directory)
+            check_return_code('write_data_along_path.py', return_code, output)
+            return path_output(data_filename)
+
+    @instrumented
+    def get_data_from_paths(self, odb_filename, paths, variable, components=None, frames=None,
+                            output_position='ELEMENT_NODAL'):
+        """
+        Extracts several components of a variable along several paths in several frames in one abaqus viewer session
 
+        :param odb_filename:        Filename of the odb
+        :param paths:               Array with the points of the paths with the shape (number of paths, number of
+                                    points, 3) or (number of points, 3) for a single path
+        :param variable:            The variable, for example 'S'
+        :param components:          List of components, for example ['S11', 'S22']. Default is None which extracts
+                                    the variable itself
+        :param frames:              List of (step_name, frame_number) where step_name None gives the last step and
+                                    negative frame numbers count from the end of the step. Default is None which gives
+                                    the last frame of the last step
+        :param output_position:     The output position used for the variable. Default is ELEMENT_NODAL
+        :return:                    Array with the shape (frames, paths, points, components)
+        """
+        odb_filename = pathlib.Path(odb_filename)
+        paths = np.asarray(paths, dtype=float)
+        if paths.ndim == 2:
+            paths = paths[np.newaxis]
+        if components is None:
+            components = [None]
+        if frames is None:
+            frames = [(None, -1)]
+        with exchange_directory(self.scratch, odb_filename) as work_directory:
+            parameter_pickle_name = work_directory / 'parameter_pickle.pkl'
+            paths_filename = work_directory / 'paths.pkl'
+            data_filename = work_directory / 'path_data.pkl'
+            save_data(paths_filename, list(paths))
             with open(parameter_pickle_name, 'wb') as pickle_file:
-                pickle.dump(parameter_dict, pickle_file, protocol=2)
-            if not isinstance(path_points, np.ndarray):
-                path_points = np.array(path_points)
-            np.save(path_points_filename, path_points)
-            self.run_command(self.abq + ' viewer noGUI=write_data_along_path.py -- ' + str(parameter_pickle_name),
-                             directory=abaqus_python_directory)
-            data = np.unique(np.load(data_filename), axis=0)
-            _, idx = np.unique(data[:, 0], return_index=True)
-            return data[idx, 1]
+                pickle.dump({'odb_filename': str(odb_filename), 'variable': variable,
+                             'paths_filename': str(paths_filename), 'data_filename': str(data_filename),
+                             'components': list(components), 'frames': [tuple(frame) for frame in frames],
+                             'output_position': output_position}, pickle_file, protocol=2)
+            return_code, output = self.run_command(self.abq + ' viewer noGUI=write_data_along_path.py -- '
+                                                   + str(parameter_pickle_name), directory=abaqus_python_directory)
+            check_return_code('write_data_along_path.py', return_code, output)
+            data = load_data(data_filename)
+        return np.array([[np.column_stack([path_values(xy_data) for xy_data in path_data])
+                          for path_data in frame_data] for frame_data in data])
 
+    @instrumented
     def get_tensor_from_path(self, odb_file_name, path_points, field_id, step_name=None, frame_number=None,
                              components=('11', '22', '33', '12', '13', '23'), output_position='INTEGRATION_POINT'):
-        data = np.zeros((path_points.shape[0], len(components)))
-        for i, component in enumerate(components):
-            stress = self.get_data_from_path(path_points, odb_file_name, field_id, step_name=step_name,
-                                             frame_number=frame_number, output_position=output_position,
-                                             component=field_id + component)
-            data[:, i] = stress
-        return data
+        frame = (step_name, -1 if frame_number is None else frame_number)
+        return self.get_data_from_paths(odb_file_name, path_points, field_id,
+                                        components=[field_id + component for component in components], frames=[frame],
+                                        output_position=output_position)[0, 0]
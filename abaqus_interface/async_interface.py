@@ -0,0 +1,158 @@
+import asyncio
+import os
+import pathlib
+import pickle
+import signal
+
+from abaqus_interface.result_cache import ResultCache
+from abaqus_interface.scratch import exchange_directory, ScratchManager
+from abaqus_interface.script_calls import (abaqus_python_directory, check_return_code, frames_output, path_output,
+                                           python_command, read_output, read_parameters, save_path_parameters,
+                                           save_write_parameters)
+from abaqus_interface.transport import load_data
+
+
+class AsyncABQInterface:
+    def __init__(self, abq_command, shell=None, output=False, max_processes=4, result_cache=None, scratch=None):
+        """
+        An interface to abaqus with coroutines for reading from and writing to odbs in an asyncio event loop. Every call
+        starts abaqus as a subprocess which is awaited without blocking the loop or a thread. Cancelling a call kills
+        abaqus and removes the temporary files of the call
+
+        :param abq_command:     The command used for starting abaqus
+        :param shell:           The shell used for running abaqus. Default is None which gives /bin/bash
+        :param output:          Flag if the output from abaqus should be shown. Default is False
+        :param max_processes:   Maximum number of abaqus processes running at the same time, further calls wait for
+                                a running call to finish. Default is 4
+        :param result_cache:    A ResultCache or a directory for one, see ABQInterface
+        :param scratch:         A ScratchManager or a root for one, see ABQInterface
+        """
+        self.abq = abq_command
+        if shell is None:
+            shell = '/bin/bash'
+        self.shell_command = shell
+        self.output = output
+        if result_cache is not None and not isinstance(result_cache, ResultCache):
+            result_cache = ResultCache(result_cache)
+        self.result_cache = result_cache
+        if scratch is not None and not isinstance(scratch, ScratchManager):
+            scratch = ScratchManager(scratch)
+        self.scratch = scratch
+        self.max_processes = max_processes
+        self._semaphore = None
+        self._semaphore_loop = None
+
+    def _process_semaphore(self):
+        # The semaphore is bound to the event loop it is first used in, so it is created in the running loop, and
+        # again if the interface is used in another loop
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_processes)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def run_command(self, command_string, directory=None):
+        """
+        Runs a command in the shell in the directory when less than max_processes commands are running
+
+        :return:    The return code and the output of the command, see ABQInterface.run_command
+        """
+        if directory is None:
+            directory = os.getcwd()
+        async with self._process_semaphore():
+            stdout = None if self.output is True else asyncio.subprocess.PIPE
+            process = await asyncio.create_subprocess_exec(self.shell_command, '-i', '-c',
+                                                           'cd ' + str(directory) + ' &&' + command_string,
+                                                           cwd=directory, stdin=asyncio.subprocess.DEVNULL,
+                                                           stdout=stdout, stderr=asyncio.subprocess.STDOUT,
+                                                           start_new_session=True)
+            try:
+                output, _ = await process.communicate()
+            except BaseException:
+                # Abaqus runs in child processes of the shell, the whole process group is killed
+                if process.returncode is None:
+                    try:
+                        os.killpg(process.pid, signal.SIGKILL)
+                    except ProcessLookupError:
+                        pass
+                    await asyncio.shield(process.wait())
+                raise
+        return process.returncode, None if output is None else output.decode(errors='replace')
+
+    async def run_python_script(self, script_name, *arguments):
+        return_code, output = await self.run_command(python_command(self.abq, script_name, arguments),
+                                                     directory=abaqus_python_directory)
+        check_return_code(script_name, return_code, output)
+
+    async def _cached(self, odb_file_name, method, parameters, compute, *args):
+        if self.result_cache is None:
+            return await compute(*args)
+        return await self.result_cache.get_or_compute_async(odb_file_name, method, parameters, lambda: compute(*args))
+
+    async def get_steps(self, odb_file_name):
+        return await self._cached(odb_file_name, 'get_steps', {}, self._get_steps, odb_file_name)
+
+    async def _get_steps(self, odb_file_name):
+        with exchange_directory(self.scratch, odb_file_name) as work_directory:
+            results_pickle_name = work_directory / 'results.pkl'
+            await self.run_python_script('get_steps.py', odb_file_name, results_pickle_name)
+            return await asyncio.to_thread(load_data, results_pickle_name)
+
+    async def get_frames(self, odb_file_name, step_name=-1):
+        if step_name == -1:
+            step_name = ''
+        frames = await self._cached(odb_file_name, 'get_frames', {'step_name': step_name}, self._get_frames,
+                                    odb_file_name, step_name)
+        return frames_output(frames, odb_file_name, step_name)
+
+    async def _get_frames(self, odb_file_name, step_name):
+        with exchange_directory(self.scratch, odb_file_name) as work_directory:
+            results_pickle_name = work_directory / 'results.pkl'
+            await self.run_python_script('get_frames.py', odb_file_name, step_name, results_pickle_name)
+            return await asyncio.to_thread(load_data, results_pickle_name)
+
+    async def read_data_from_odb(self, field_id, odb_file_name, step_name=None, frame_number=-1, set_name='',
+                                 instance_name='', get_position_numbers=False, get_frame_value=False,
+                                 position='INTEGRATION_POINT', coordinate_system=None, dtype=None, out=None,
+                                 labels=None):
+        """
+        Reads a field from an odb, see ABQInterface.read_data_from_odb. The arrays are always read into memory, in a
+        thread so that the loop is not blocked, as the transferred files are removed when the call returns
+        """
+        parameter_data = read_parameters(field_id, odb_file_name, step_name, frame_number, set_name, instance_name,
+                                         get_position_numbers, get_frame_value, position, coordinate_system, dtype,
+                                         labels)
+        data = await self._cached(odb_file_name, 'read_data_from_odb', parameter_data, self._read_data_from_odb,
+                                  parameter_data)
+        return read_output(data, get_position_numbers, get_frame_value, out)
+
+    async def _read_data_from_odb(self, parameter_data):
+        with exchange_directory(self.scratch, parameter_data['odb_file_name']) as work_directory:
+            parameter_pickle_name = work_directory / 'parameter_pickle.pkl'
+            results_pickle_name = work_directory / 'results.pkl'
+            with open(parameter_pickle_name, 'wb') as pickle_file:
+                pickle.dump(parameter_data, pickle_file, protocol=2)
+            await self.run_python_script('read_data_from_odb.py', parameter_pickle_name, results_pickle_name)
+            return await asyncio.to_thread(load_data, results_pickle_name)
+
+    async def write_data_to_odb(self, field_data, field_id, odb_file_name, step_name, instance_name='', set_name='',
+                                step_description='', frame_number=None, frame_value=None, field_description='',
+                                position='INTEGRATION_POINT', invariants=None, dtype=None):
+        with exchange_directory(self.scratch, odb_file_name) as work_directory:
+            pickle_filename = work_directory / 'load_field_to_odb_pickle.pkl'
+            save_write_parameters(pickle_filename, field_data, field_id, odb_file_name, step_name, instance_name,
+                                  set_name, step_description, frame_number, frame_value, field_description, position,
+                                  invariants, dtype)
+            await self.run_python_script('write_data_to_odb.py', pickle_filename)
+
+    async def get_data_from_path(self, path_points, odb_filename, variable, component=None, step_name=None,
+                                 frame_number=None, output_position='ELEMENT_NODAL'):
+        odb_filename = pathlib.Path(odb_filename)
+        with exchange_directory(self.scratch, odb_filename) as work_directory:
+            parameter_pickle_name, data_filename = save_path_parameters(work_directory, path_points, odb_filename,
+                                                                        variable, component, step_name,
+                                                                        frame_number, output_position)
+            return_code, output = await self.run_command(self.abq + ' viewer noGUI=write_data_along_path.py -- '
+                                                         + str(parameter_pickle_name), directory=abaqus_python_directory)
+            check_return_code('write_data_along_path.py', return_code, output)
+            return await asyncio.to_thread(path_output, data_filename)
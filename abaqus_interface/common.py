@@ -1,10 +1,33 @@
 from __future__ import print_function
 import os
 import pathlib
+import re
 import shutil
+import tempfile
 
 package_path = os.path.dirname(__file__)
 
+license_error_pattern = re.compile(r'licen[cs]e.*(not available|error|denied|queued|exceeded|expired)|checkout failed|'
+                                   r'insufficient.*licen[cs]e|licen[cs]e server', re.IGNORECASE)
+
+
+class AbaqusError(RuntimeError):
+    pass
+
+
+class AbaqusLicenseError(AbaqusError):
+    pass
+
+
+def is_license_error(output):
+    """
+    Checks if the output from a failed abaqus run indicates that no license could be checked out
+
+    :param output:  The output from abaqus as a string or None if the output was not captured
+    :return:        True if the output contains a license error message
+    """
+    return output is not None and license_error_pattern.search(output) is not None
+
 
 class TemporaryDirectory:
     def __init__(self, name):
@@ -12,18 +35,10 @@ class TemporaryDirectory:
         self.work_directory = None
 
     def __enter__(self):
-        i = 0
-        created = False
-        while not created:
-            work_directory_name = pathlib.Path(str(self.name.absolute()).replace('.', '_') + '_tempdir' + str(i))
-            try:
-                work_directory_name.mkdir(exist_ok=False)
-            except FileExistsError:
-                i += 1
-            else:
-                created = True
-        self.work_directory = work_directory_name
-        return work_directory_name
+        name = pathlib.Path(self.name).absolute()
+        self.work_directory = pathlib.Path(tempfile.mkdtemp(prefix=name.name.replace('.', '_') + '_tempdir',
+                                                            dir=name.parent))
+        return self.work_directory
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         shutil.rmtree(self.work_directory)
@@ -0,0 +1,155 @@
+import numpy as np
+
+# Abaqus orders the components of full three dimensional tensors as 11, 22, 33, 12, 13, 23
+_tensor_indices = [(0, 0), (1, 1), (2, 2), (0, 1), (0, 2), (1, 2)]
+
+
+def _unit(vectors):
+    lengths = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    if np.any(lengths == 0):
+        raise ValueError('The points defining the coordinate system are not independent')
+    return vectors/lengths
+
+
+def _system_type(coordinate_system):
+    system_type = str(coordinate_system.system_type).upper()
+    if system_type in ['CARTESIAN', 'RECTANGULAR']:
+        return 'CARTESIAN'
+    if system_type == 'CYLINDRICAL':
+        return system_type
+    raise ValueError(f'The system type {coordinate_system.system_type} is not supported, supported types are '
+                     f'CARTESIAN and CYLINDRICAL')
+
+
+def rotation_matrices(coordinate_system, points):
+    """
+    Computes the rotation matrices from the global system to a coordinate system at points, defined as for
+    DatumCsysByThreePoints in abaqus. For a CARTESIAN system the x-axis points from the origin to point1 and point2
+    is in the xy-plane. For a CYLINDRICAL system the r-axis at the origin points to point1, point2 is in the r-theta
+    plane and the z-axis is normal to the plane, the directions at a point are r, theta and z at the point
+
+    :param coordinate_system:   A CoordinateSystem with system_type 'CARTESIAN', 'RECTANGULAR' or 'CYLINDRICAL'
+    :param points:              Array with the global coordinates of the points, one row per point
+    :return:                    Array with the shape (points, 3, 3) where the rows of each matrix are the base vectors
+                                of the system at the point, which gives the local components as matrix @ vector
+    """
+    points = np.atleast_2d(np.asarray(points, dtype=float))
+    origin = np.asarray(coordinate_system.origin, dtype=float)
+    first_axis = _unit(np.asarray(coordinate_system.point1, dtype=float) - origin)
+    normal = _unit(np.cross(first_axis, np.asarray(coordinate_system.point2, dtype=float) - origin))
+    matrices = np.empty((points.shape[0], 3, 3))
+    if _system_type(coordinate_system) == 'CARTESIAN':
+        matrices[:] = np.array([first_axis, np.cross(normal, first_axis), normal])
+        return matrices
+    radial = points - origin
+    radial -= np.outer(radial @ normal, normal)
+    lengths = np.linalg.norm(radial, axis=1, keepdims=True)
+    # Points on the axis get the directions of the system at the origin
+    on_axis = lengths[:, 0] < 1e-12*max(np.abs(points).max(initial=0.), 1.)
+    radial[on_axis] = first_axis
+    lengths[on_axis] = 1.
+    radial /= lengths
+    matrices[:, 0, :] = radial
+    matrices[:, 1, :] = np.cross(normal, radial)
+    matrices[:, 2, :] = normal
+    return matrices
+
+
+def transform_vectors(data, matrices):
+    """
+    :param data:        Array with the shape (points, 3) with the vectors in the global system
+    :param matrices:    Rotation matrices from rotation_matrices
+    :return:            The vectors in the local system
+    """
+    return np.einsum('pij,pj->pi', matrices, data)
+
+
+def transform_tensors(data, matrices, engineering_shear=False):
+    """
+    :param data:                Array with the shape (points, 6) with symmetric tensors in the global system with the
+                                components in the abaqus order 11, 22, 33, 12, 13, 23
+    :param matrices:            Rotation matrices from rotation_matrices
+    :param engineering_shear:   Flag if the shear components are engineering shear strains, as for the strains in
+                                abaqus, which are twice the tensor components. Default is False
+    :return:                    The tensors in the local system with the same component order
+    """
+    data = np.asarray(data, dtype=float)
+    shear_factor = 0.5 if engineering_shear else 1.
+    tensors = np.empty((data.shape[0], 3, 3))
+    for k, (i, j) in enumerate(_tensor_indices):
+        tensors[:, i, j] = data[:, k]*(1. if i == j else shear_factor)
+        tensors[:, j, i] = tensors[:, i, j]
+    rotated = np.einsum('pik,pkl,pjl->pij', matrices, tensors, matrices)
+    result = np.empty_like(data)
+    for k, (i, j) in enumerate(_tensor_indices):
+        result[:, k] = rotated[:, i, j]/(1. if i == j else shear_factor)
+    return result
+
+
+class CoordinateTransformer:
+    def __init__(self, points):
+        """
+        Transforms field data at fixed points, for example the nodes of a mesh or the integration points read as the
+        COORD field, to coordinate systems without abaqus. The rotation matrices are computed once per coordinate
+        system and reused so that one read of the data can be given in several systems
+
+        :param points:  Array with the coordinates of the points of the rows of the data, one row per point
+        """
+        self.points = np.atleast_2d(np.asarray(points, dtype=float))
+        self._matrices = {}
+
+    @classmethod
+    def from_instance(cls, instance, node_labels=None):
+        """
+        Creates a transformer for nodal data of an OdbInstance, for example from ABQInterface.get_mesh
+
+        :param instance:    The OdbInstance
+        :param node_labels: The node label of each row of the data, as returned by read_data_from_odb. Default is None
+                            which gives the nodes in the order of the instance
+        """
+        labels = np.asarray(instance.data['node_labels'])
+        coordinates = np.asarray(instance.data['node_coordinates'], dtype=float)
+        if node_labels is None:
+            return cls(coordinates)
+        order = np.argsort(labels)
+        node_labels = np.asarray(node_labels)
+        positions = order[np.minimum(np.searchsorted(labels, node_labels, sorter=order), labels.shape[0] - 1)]
+        if np.any(labels[positions] != node_labels):
+            raise ValueError('Node labels that are not present in the instance were given')
+        return cls(coordinates[positions])
+
+    def rotation_matrices(self, coordinate_system, displacements=None):
+        """
+        :param coordinate_system:   A CoordinateSystem
+        :param displacements:       Array with the displacements of the points. If given, the matrices are computed in
+                                    the deformed configuration and they are not cached. Default is None
+        :return:                    The rotation matrices at the points, see rotation_matrices
+        """
+        if displacements is not None:
+            return rotation_matrices(coordinate_system, self.points + np.asarray(displacements, dtype=float))
+        key = (_system_type(coordinate_system), tuple(coordinate_system.origin), tuple(coordinate_system.point1),
+               tuple(coordinate_system.point2))
+        if key not in self._matrices:
+            self._matrices[key] = rotation_matrices(coordinate_system, self.points)
+        return self._matrices[key]
+
+    def transform(self, data, coordinate_system, displacements=None, engineering_shear=False):
+        """
+        Gives field data in a coordinate system
+
+        :param data:                Array with vectors, shape (points, 3), or symmetric tensors, shape (points, 6),
+                                    in the global system
+        :param coordinate_system:   A CoordinateSystem
+        :param displacements:       Displacements of the points for transforming in the deformed configuration, for
+                                    rotating systems. Default is None which uses the undeformed configuration
+        :param engineering_shear:   See transform_tensors
+        :return:                    The data in the coordinate system
+        """
+        data = np.asarray(data)
+        if data.ndim != 2 or data.shape[1] not in [3, 6] or data.shape[0] != self.points.shape[0]:
+            raise ValueError(f'The data must have a row for each of the {self.points.shape[0]} points and 3 or 6 '
+                             f'components, the shape of the data is {data.shape}')
+        matrices = self.rotation_matrices(coordinate_system, displacements)
+        if data.shape[1] == 3:
+            return transform_vectors(data, matrices)
+        return transform_tensors(data, matrices, engineering_shear)
@@ -0,0 +1,207 @@
+from collections import defaultdict
+from contextlib import contextmanager
+import functools
+import inspect
+import marshal
+import threading
+import time
+
+import numpy as np
+
+_local = threading.local()
+
+
+class CallStats:
+    def __init__(self, method):
+        """
+        Timings of a call to a method of ABQInterface. The client phases are
+            abaqus:             Time from starting abaqus until it has finished, including the time in the worker
+            abaqus_startup:     Time from starting abaqus until the script starts running, including licence checkout
+            abaqus_shutdown:    Time from the end of the script until abaqus has exited
+            save_data:          Writing the parameters to abaqus
+            load_data:          Reading the results from abaqus
+        and the abaqus phases are the phases of the scripts, for example open_odb, read_values, write_values,
+        save_odb, load_data and save_data. The times of all abaqus calls made by the method are summed
+
+        :param method:  Name of the method
+        """
+        self.method = method
+        self.total = 0.
+        self.client_phases = {}
+        self.abaqus_phases = {}
+        self.abaqus_calls = 0
+        self.profiles = []
+
+    def add_client_phase(self, name, duration):
+        self.client_phases[name] = self.client_phases.get(name, 0.) + duration
+
+    def add_abaqus_call(self, start, end, timing):
+        """
+        Adds the timings written by timed_script.py for an abaqus call started at start and finished at end, times
+        given by time.time()
+        """
+        self.abaqus_calls += 1
+        self.add_client_phase('abaqus_startup', timing['start'] - start)
+        self.add_client_phase('abaqus_shutdown', end - timing['end'])
+        for name, duration in timing['phases'].items():
+            self.abaqus_phases[name] = self.abaqus_phases.get(name, 0.) + duration
+        if timing['profile'] is not None:
+            self.profiles.append(timing['profile'])
+
+    @property
+    def client_other(self):
+        """
+        Time of the call not spent in abaqus or in the transfer of data to and from abaqus
+        """
+        return self.total - sum(self.client_phases.get(name, 0.) for name in ['abaqus', 'save_data', 'load_data'])
+
+    def dump_profile(self, file_name, call=-1):
+        """
+        Writes the profile of an abaqus call to a file that can be read by pstats.Stats or snakeviz. Requires that the
+        interface is instrumented with profile=True
+
+        :param file_name:   Filename of the profile
+        :param call:        Index of the abaqus call of the method. Default is -1 which gives the last call
+        """
+        if not self.profiles:
+            raise ValueError(f'No profile is recorded for the call to {self.method}, use Instrumentation(profile=True)')
+        with open(file_name, 'wb') as profile_file:
+            marshal.dump(self.profiles[call], profile_file)
+
+    def __repr__(self):
+        phases = ', '.join(f'{name}={duration:.3f}' for name, duration in sorted(self.client_phases.items()))
+        abaqus_phases = ', '.join(f'{name}={duration:.3f}' for name, duration in sorted(self.abaqus_phases.items()))
+        return (f'CallStats({self.method}: total={self.total:.3f}, client: [{phases}], '
+                f'abaqus: [{abaqus_phases}])')
+
+
+class Instrumentation:
+    def __init__(self, callback=None, logger=None, profile=False):
+        """
+        Records the timings of the calls of an ABQInterface, given to the interface as
+            ABQInterface(abq_command, instrumentation=Instrumentation())
+
+        :param callback:    Function called with the CallStats of each call. Default is None
+        :param logger:      A logging.Logger that the CallStats of each call is logged to at the debug level.
+                            Default is None
+        :param profile:     If True, the abaqus scripts are run under cProfile and the profiles are stored in the
+                            CallStats, see CallStats.dump_profile. Default is False
+        """
+        self.callback = callback
+        self.logger = logger
+        self.profile = profile
+        self.durations = defaultdict(list)
+        self.last_stats = None
+        self.lock = threading.Lock()
+
+    def record(self, stats):
+        with self.lock:
+            self.durations[stats.method].append(stats.total)
+            self.last_stats = stats
+        if self.logger is not None:
+            self.logger.debug('%r', stats)
+        if self.callback is not None:
+            self.callback(stats)
+
+    def histogram(self, method, bins=10):
+        """
+        :return:    The counts and the bin edges of the durations of the calls to a method as given by np.histogram
+        """
+        with self.lock:
+            durations = np.array(self.durations.get(method, []))
+        return np.histogram(durations, bins=bins)
+
+    def summary(self):
+        """
+        :return:    A dict with the method names as keys and dicts with the keys calls, total, mean, median and max of
+                    the durations in seconds as values
+        """
+        with self.lock:
+            durations = {method: np.array(values) for method, values in self.durations.items()}
+        return {method: {'calls': values.shape[0], 'total': values.sum(), 'mean': values.mean(),
+                         'median': np.median(values), 'max': values.max()}
+                for method, values in durations.items()}
+
+
+def current_stats():
+    """
+    :return:    The CallStats of the instrumented call running in this thread, None if there is none
+    """
+    return getattr(_local, 'stats', None)
+
+
+@contextmanager
+def client_phase(name):
+    stats = current_stats()
+    if stats is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.add_client_phase(name, time.perf_counter() - start)
+
+
+def instrumented(method):
+    """
+    Decorator for the methods of ABQInterface that records a CallStats for each call if the interface has an
+    Instrumentation. Calls made by an instrumented method are included in the stats of the method. For generator
+    methods the stats cover the time from the first value until the generator is exhausted or closed
+    """
+    if inspect.isgeneratorfunction(method):
+        return _instrumented_generator(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.instrumentation is None or current_stats() is not None:
+            return method(self, *args, **kwargs)
+        stats = CallStats(method.__name__)
+        _local.stats = stats
+        start = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            stats.total = time.perf_counter() - start
+            _local.stats = None
+            self.instrumentation.record(stats)
+    return wrapper
+
+
+def _instrumented_generator(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.instrumentation is None or current_stats() is not None:
+            yield from method(self, *args, **kwargs)
+            return
+        stats = CallStats(method.__name__)
+        generator = method(self, *args, **kwargs)
+        start = time.perf_counter()
+        try:
+            while True:
+                # The stats are only current while the generator runs and not while the caller handles the values
+                with use_stats(stats):
+                    try:
+                        value = next(generator)
+                    except StopIteration:
+                        return
+                yield value
+        finally:
+            with use_stats(stats):
+                generator.close()
+            stats.total = time.perf_counter() - start
+            self.instrumentation.record(stats)
+    return wrapper
+
+
+@contextmanager
+def use_stats(stats):
+    """
+    Makes stats the CallStats of this thread, used for work that an instrumented call runs in another thread
+    """
+    previous_stats = current_stats()
+    _local.stats = stats
+    try:
+        yield
+    finally:
+        _local.stats = previous_stats
@@ -0,0 +1,159 @@
+import numpy as np
+
+
+def _as_label_index(index):
+    # A Mesh gives the index of its nodes, the index of integration point data is given by Mesh.label_index
+    if isinstance(index, LabelIndex):
+        return index
+    return index.label_index()
+
+
+class LabelIndex:
+    def __init__(self, labels, points=None):
+        """
+        Maps node labels, or element labels and integration points, to the rows of field data. Two indices for
+        different odbs, sets or meshes are used to reorder data between their orderings without dicts. The keys are
+        sorted once when the index is created and the lookups are vectorized
+
+        :param labels:  Array with the node or element label of each row
+        :param points:  Array with the integration point number of each row. Default is None which numbers the rows
+                        with the same label 1, 2, 3 and so on in the order they appear, which is the numbering of the
+                        integration points for data read from an odb
+        """
+        self.labels = np.asarray(labels, dtype=np.int64).reshape(-1)
+        if points is None:
+            order = np.argsort(self.labels, kind='stable')
+            sorted_labels = self.labels[order]
+            first = np.searchsorted(sorted_labels, sorted_labels)
+            points = np.empty(self.labels.shape[0], dtype=np.int64)
+            points[order] = np.arange(self.labels.shape[0]) - first + 1
+        self.points = np.asarray(points, dtype=np.int64).reshape(-1)
+        if self.points.shape != self.labels.shape:
+            raise ValueError('The labels and the points must have the same length')
+        self._order = np.lexsort((self.points, self.labels))
+        sorted_labels = self.labels[self._order]
+        sorted_points = self.points[self._order]
+        if np.any((sorted_labels[1:] == sorted_labels[:-1]) & (sorted_points[1:] == sorted_points[:-1])):
+            raise ValueError('The labels and points of the index are not unique')
+        # The keys label*stride + point are sorted in the same order as the labels and then the points, a point is
+        # smaller than the stride so that the keys are unique
+        self._stride = int(sorted_points.max(initial=0)) + 1
+        self._sorted_keys = sorted_labels*self._stride + sorted_points
+
+    @classmethod
+    def from_labels(cls, node_labels, element_labels):
+        """
+        Creates an index from the labels returned by read_data_from_odb with get_position_numbers=True, the element
+        labels are used if they are given and the node labels otherwise
+        """
+        if len(element_labels) > 0:
+            return cls(element_labels)
+        return cls(node_labels)
+
+    @classmethod
+    def from_mesh_labels(cls, labels, points_per_label=1):
+        """
+        Creates an index for data written with write_data_to_odb to the nodes or elements with the given labels, for
+        example the element labels of an OdbInstance and 8 points per element for C3D8 elements
+        """
+        labels = np.asarray(labels)
+        return cls(np.repeat(labels, points_per_label), np.tile(np.arange(1, points_per_label + 1), labels.shape[0]))
+
+    def __len__(self):
+        return self.labels.shape[0]
+
+    @property
+    def points_per_label(self):
+        return int(self.points.max(initial=0))
+
+    def rows(self, labels, points=None, missing='raise'):
+        """
+        Finds the rows of the index with the given labels and points
+
+        :param labels:  Array with labels
+        :param points:  Array with the integration points of the labels. Default is None which gives point 1 for all
+                        labels
+        :param missing: 'raise' which raises a ValueError for labels that are not in the index, or 'ignore' which
+                        gives -1 for them
+        :return:        An integer array with the rows
+        """
+        labels = np.asarray(labels, dtype=np.int64).reshape(-1)
+        if points is None:
+            points = np.ones(labels.shape[0], dtype=np.int64)
+        points = np.asarray(points, dtype=np.int64).reshape(-1)
+        rows = np.full(labels.shape[0], -1, dtype=np.int64)
+        if len(self) > 0:
+            # Points outside 0 to stride - 1 are not in the index and could give the key of another label
+            keys = labels*self._stride + points
+            positions = np.minimum(np.searchsorted(self._sorted_keys, keys), len(self) - 1)
+            found = (self._sorted_keys[positions] == keys) & (points >= 0) & (points < self._stride)
+            rows[found] = self._order[positions[found]]
+        if missing == 'raise' and np.any(rows < 0):
+            not_found = rows < 0
+            raise ValueError(f'{np.count_nonzero(not_found)} labels are not present in the index, for example the '
+                             f'label {labels[not_found][0]} with point {points[not_found][0]}')
+        return rows
+
+    def _rows_of(self, other, missing):
+        # Data at a single point per label is broadcast to all points of the labels in the other index
+        if self.points_per_label == 1:
+            return self.rows(other.labels, missing=missing)
+        return self.rows(other.labels, other.points, missing=missing)
+
+    def reorder(self, data, target, fill_value=np.nan):
+        """
+        Gathers data ordered as this index into the ordering of another index
+
+        :param data:        Array with a row for each row of this index
+        :param target:      The LabelIndex of the ordering of the result, for example of the odb the data is written to,
+                            or a Mesh for the nodes of the mesh
+        :param fill_value:  Value for the rows of target that are not in this index. Default is nan
+        :return:            Array with a row for each row of target
+        """
+        data = np.asarray(data)
+        if data.shape[0] != len(self):
+            raise ValueError(f'The data has {data.shape[0]} rows but the index has {len(self)} rows')
+        rows = self._rows_of(_as_label_index(target), 'ignore')
+        result = data[rows]
+        if np.any(rows < 0):
+            if result.dtype.kind != 'f':
+                result = result.astype(float)
+            result[rows < 0] = fill_value
+        return result
+
+    def scatter(self, data, source, out=None, fill_value=np.nan):
+        """
+        Scatters data ordered as another index into the ordering of this index
+
+        :param data:        Array with a row for each row of source
+        :param source:      The LabelIndex of the ordering of data, or a Mesh for the nodes of the mesh
+        :param out:         Array with a row for each row of this index that the data is written to, rows that are not
+                            in source are left unchanged. Default is None which creates an array filled with fill_value
+        :param fill_value:  Value for the rows that are not in source if out is not given. Default is nan
+        :return:            out
+        """
+        data = np.asarray(data)
+        source = _as_label_index(source)
+        if data.shape[0] != len(source):
+            raise ValueError(f'The data has {data.shape[0]} rows but the source index has {len(source)} rows')
+        if out is None:
+            out = np.full((len(self),) + data.shape[1:], fill_value,
+                          dtype=np.result_type(data.dtype, np.min_scalar_type(fill_value)))
+        rows = source._rows_of(self, 'ignore')
+        out[rows >= 0] = data[rows[rows >= 0]]
+        return out
+
+    def averaged(self, data):
+        """
+        Averages the data over the points of each label, for instance to write data from fully integrated elements
+        to elements with reduced integration
+
+        :param data:    Array with a row for each row of this index
+        :return:        A tuple with a LabelIndex with one row per label and an array with the averaged data with a row
+                        for each row of that index
+        """
+        unique_labels, inverse, counts = np.unique(self.labels, return_inverse=True, return_counts=True)
+        data = np.asarray(data, dtype=float)
+        sums = np.zeros((unique_labels.shape[0],) + data.shape[1:])
+        np.add.at(sums, inverse, data)
+        return LabelIndex(unique_labels), sums/counts.reshape((-1,) + (1,)*(data.ndim - 1))
@@ -0,0 +1,190 @@
+import json
+import pathlib
+import zipfile
+
+import numpy as np
+
+from abaqus_interface.label_index import LabelIndex
+
+
+def _memmap_npz(file_name, mmap_mode):
+    # The members of an npz written by np.savez are stored without compression and are memory mapped at their offsets
+    arrays = {}
+    with open(file_name, 'rb') as npz_file, zipfile.ZipFile(npz_file) as archive:
+        for info in archive.infolist():
+            npz_file.seek(info.header_offset)
+            local_header = npz_file.read(30)
+            if info.compress_type != zipfile.ZIP_STORED or local_header[:4] != b'PK\x03\x04':
+                raise ValueError(f'The member {info.filename} of {file_name} is compressed and cannot be memory mapped')
+            name_length = int.from_bytes(local_header[26:28], 'little')
+            extra_length = int.from_bytes(local_header[28:30], 'little')
+            npz_file.seek(info.header_offset + 30 + name_length + extra_length)
+            version = np.lib.format.read_magic(npz_file)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(npz_file)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(npz_file)
+            if np.prod(shape) == 0:
+                arrays[info.filename[:-4]] = np.zeros(shape, dtype=dtype)
+            else:
+                arrays[info.filename[:-4]] = np.memmap(file_name, dtype=dtype, mode=mmap_mode, offset=npz_file.tell(),
+                                                       shape=shape, order='F' if fortran_order else 'C')
+    return arrays
+
+
+class Mesh:
+    def __init__(self, instance_name, node_labels, node_coordinates, elements, node_sets=None, element_sets=None):
+        """
+        The nodes, elements and sets of an instance stored as arrays, for example exported from an odb with
+        ABQInterface.export_mesh and loaded with Mesh.load without abaqus. The mesh has the same data as an
+        OdbInstance and is accepted where an OdbInstance is, for example by
+        ABQInterface.create_empty_odb_from_nodes_and_elements, PathProbe.from_instance and
+        CoordinateTransformer.from_instance
+
+        :param instance_name:       The name of the instance
+        :param node_labels:         Array with the node labels
+        :param node_coordinates:    Array with the coordinates of the nodes, one row per node
+        :param elements:            A dict with element types like 'C3D8' as keys and dicts with the arrays labels and
+                                    connectivity, one row per element, as values
+        :param node_sets:           A dict with set names as keys and arrays with node labels as values
+        :param element_sets:        A dict with set names as keys and arrays with element labels as values
+        """
+        self.data = {'instance_name': str(instance_name), 'node_labels': node_labels,
+                     'node_coordinates': node_coordinates,
+                     'elements': {str(element_type): {'labels': element_data['labels'],
+                                                      'connectivity': element_data['connectivity']}
+                                  for element_type, element_data in elements.items()},
+                     'node_sets': dict(node_sets or {}), 'element_sets': dict(element_sets or {})}
+        self._node_index = None
+        self._element_index = None
+
+    @classmethod
+    def from_instance(cls, instance):
+        """
+        Creates a mesh from an OdbInstance, or from the dict returned by get_mesh.py
+        """
+        data = instance if isinstance(instance, dict) else instance.data
+        return cls(data['instance_name'], data['node_labels'], data['node_coordinates'], data['elements'],
+                   data.get('node_sets', None), data.get('element_sets', None))
+
+    @property
+    def name(self):
+        return self.data['instance_name']
+
+    @property
+    def node_labels(self):
+        return self.data['node_labels']
+
+    @property
+    def node_coordinates(self):
+        return self.data['node_coordinates']
+
+    @property
+    def elements(self):
+        return self.data['elements']
+
+    @property
+    def node_sets(self):
+        return self.data['node_sets']
+
+    @property
+    def element_sets(self):
+        return self.data['element_sets']
+
+    @property
+    def element_types(self):
+        return list(self.elements)
+
+    @property
+    def element_labels(self):
+        """
+        The labels of all elements, ordered by the element types in element_types
+        """
+        labels = [element_data['labels'] for element_data in self.elements.values()]
+        return np.concatenate(labels) if labels else np.zeros(0, dtype=np.int32)
+
+    @property
+    def node_index(self):
+        """
+        A LabelIndex mapping node labels to the rows of node_labels and node_coordinates
+        """
+        if self._node_index is None:
+            self._node_index = LabelIndex(self.node_labels)
+        return self._node_index
+
+    @property
+    def element_index(self):
+        """
+        A LabelIndex mapping element labels to the rows of element_labels
+        """
+        if self._element_index is None:
+            self._element_index = LabelIndex(self.element_labels)
+        return self._element_index
+
+    def node_rows(self, labels, missing='raise'):
+        """
+        :return:    The rows of the nodes with the labels in node_labels and node_coordinates, see LabelIndex.rows
+        """
+        return self.node_index.rows(labels, missing=missing)
+
+    def element_rows(self, labels, missing='raise'):
+        """
+        :return:    The rows of the elements with the labels in element_labels, see LabelIndex.rows
+        """
+        return self.element_index.rows(labels, missing=missing)
+
+    def label_index(self, points_per_element=None):
+        """
+        A LabelIndex of data written to the mesh, for example with write_data_to_odb
+
+        :param points_per_element:  Number of integration points per element. Default is None which gives the index of
+                                    nodal data
+        """
+        if points_per_element is None:
+            return self.node_index
+        return LabelIndex.from_mesh_labels(self.element_labels, points_per_element)
+
+    def save(self, file_name):
+        """
+        Writes the mesh to an uncompressed .npz file that can be memory mapped by Mesh.load
+        """
+        arrays = {'node_labels': np.asarray(self.node_labels, dtype=np.int32),
+                  'node_coordinates': np.asarray(self.node_coordinates, dtype=float)}
+        manifest = {'instance_name': self.name, 'element_types': self.element_types,
+                    'node_sets': list(self.node_sets), 'element_sets': list(self.element_sets)}
+        for i, element_data in enumerate(self.elements.values()):
+            arrays['element_labels_' + str(i)] = np.asarray(element_data['labels'], dtype=np.int32)
+            arrays['connectivity_' + str(i)] = np.asarray(element_data['connectivity'], dtype=np.int32)
+        for i, labels in enumerate(self.node_sets.values()):
+            arrays['node_set_' + str(i)] = np.asarray(labels, dtype=np.int32)
+        for i, labels in enumerate(self.element_sets.values()):
+            arrays['element_set_' + str(i)] = np.asarray(labels, dtype=np.int32)
+        # The set names and element types can be any strings and are kept in a manifest instead of the member names
+        arrays['manifest'] = np.frombuffer(json.dumps(manifest).encode(), dtype=np.uint8)
+        with open(file_name, 'wb') as mesh_file:
+            np.savez(mesh_file, **arrays)
+
+    @classmethod
+    def load(cls, file_name, mmap_mode='r'):
+        """
+        Loads a mesh written by save
+
+        :param file_name:   Filename of the mesh
+        :param mmap_mode:   Memory mapping of the arrays, see np.load. Default is 'r' which reads the arrays from the
+                            file when they are used. None reads all arrays into memory
+        """
+        file_name = pathlib.Path(file_name)
+        if mmap_mode is None:
+            with np.load(file_name) as npz_data:
+                arrays = {name: npz_data[name] for name in npz_data.files}
+        else:
+            arrays = _memmap_npz(file_name, mmap_mode)
+        manifest = json.loads(bytes(arrays['manifest']).decode())
+        elements = {element_type: {'labels': arrays['element_labels_' + str(i)],
+                                   'connectivity': arrays['connectivity_' + str(i)]}
+                    for i, element_type in enumerate(manifest['element_types'])}
+        node_sets = {set_name: arrays['node_set_' + str(i)] for i, set_name in enumerate(manifest['node_sets'])}
+        element_sets = {set_name: arrays['element_set_' + str(i)]
+                        for i, set_name in enumerate(manifest['element_sets'])}
+        return cls(manifest['instance_name'], arrays['node_labels'], arrays['node_coordinates'], elements, node_sets,
+                   element_sets)
@@ -0,0 +1,95 @@
+import numpy as np
+
+# Output positions that abaqus can compute from the data at another position
+extrapolated_positions = {'ELEMENT_NODAL': 'INTEGRATION_POINT', 'CENTROID': 'INTEGRATION_POINT'}
+
+
+class OdbCatalog:
+    def __init__(self, data):
+        """
+        The structure of an odb as returned by ABQInterface.get_odb_catalog. The catalog is built from a dict with
+        the keys
+            steps:          A list with a dict for each step with the keys name, description, frames and fields.
+                            frames is a list of dicts with the keys frame_number, frame_value, increment_number,
+                            description and field_ids. fields is a dict with the field ids as keys and dicts with the
+                            keys type, description, positions and components as values
+            instances:      A list with a dict for each instance with the keys name, number_of_nodes,
+                            number_of_elements, node_sets and element_sets where the sets are dicts with the set
+                            names as keys and the number of nodes or elements as values
+            node_sets:      The assembly node sets, as for the instances
+            element_sets:   The assembly element sets, as for the instances
+        """
+        self.data = data
+        self.steps = {step['name']: step for step in data['steps']}
+        self.instances = {instance['name']: instance for instance in data['instances']}
+
+    @property
+    def step_names(self):
+        return [step['name'] for step in self.data['steps']]
+
+    @property
+    def instance_names(self):
+        return [instance['name'] for instance in self.data['instances']]
+
+    def step(self, step_name=None):
+        if not step_name or step_name == -1:
+            return self.data['steps'][-1]
+        if step_name not in self.steps:
+            raise ValueError(f"The step name {step_name} is not present in the odb")
+        return self.steps[step_name]
+
+    def frames(self, step_name=None):
+        return self.step(step_name)['frames']
+
+    def frame_values(self, step_name=None):
+        return np.array([frame['frame_value'] for frame in self.frames(step_name)])
+
+    def frame(self, step_name=None, frame_number=-1):
+        frames = self.frames(step_name)
+        if not -len(frames) <= frame_number < len(frames):
+            raise ValueError(f"The frame number {frame_number} is not present in the step "
+                             f"{self.step(step_name)['name']} with {len(frames)} frames")
+        return frames[frame_number]
+
+    def fields(self, step_name=None):
+        return self.step(step_name)['fields']
+
+    def instance(self, instance_name=''):
+        if not instance_name:
+            if len(self.data['instances']) != 1:
+                raise ValueError('odb has multiple instances, please specify an instance')
+            return self.data['instances'][0]
+        if instance_name not in self.instances:
+            raise ValueError(f"The instance {instance_name} is not present in the odb")
+        return self.instances[instance_name]
+
+    def node_sets(self, instance_name=''):
+        return self.instance(instance_name)['node_sets']
+
+    def element_sets(self, instance_name=''):
+        return self.instance(instance_name)['element_sets']
+
+    def validate_read_request(self, read_request):
+        """
+        Checks that the step, frame, field, output position, instance and set of a ReadRequest exist in the odb
+
+        :param read_request:    The ReadRequest to check
+        :return:                Nothing, raises ValueError if the request cannot be read
+        """
+        frame = self.frame(read_request.step_name, read_request.frame_number)
+        if read_request.field_id not in frame['field_ids']:
+            raise ValueError(f"The field {read_request.field_id} is not present in frame {frame['frame_number']} "
+                             f"of step {self.step(read_request.step_name)['name']}")
+        positions = self.fields(read_request.step_name)[read_request.field_id]['positions']
+        if (read_request.position not in positions
+                and extrapolated_positions.get(read_request.position, None) not in positions):
+            raise ValueError(f"The field {read_request.field_id} is not available at {read_request.position}, "
+                             f"available positions are {positions}")
+        instance = self.instance(read_request.instance_name)
+        if read_request.set_name:
+            if read_request.position == 'NODAL':
+                sets = instance['node_sets']
+            else:
+                sets = instance['element_sets']
+            if read_request.set_name not in sets:
+                raise ValueError(f"The set {read_request.set_name} is not present in the instance {instance['name']}")
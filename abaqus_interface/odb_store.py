@@ -0,0 +1,199 @@
+from collections import namedtuple, OrderedDict
+import json
+import pathlib
+
+import numpy as np
+
+from abaqus_interface.label_index import LabelIndex
+
+StoredFrame = namedtuple('StoredFrame', ['step_name', 'frame_number', 'frame_value'])
+
+
+def _extends(manifest, old_manifest):
+    for field_id, old_field in old_manifest['fields'].items():
+        field = manifest['fields'].get(field_id, None)
+        if field is None or field['directory'] != old_field['directory']:
+            return False
+        if field['frames'][:len(old_field['frames'])] != old_field['frames']:
+            return False
+    return True
+
+
+class OdbStore:
+    def __init__(self, directory, max_cached_chunks=16):
+        """
+        Reads the fields exported from an odb with ABQInterface.export_odb without abaqus. Only the chunks of the rows
+        that are asked for are read, and the last read chunks are kept in memory so that repeated reads of the same
+        rows do not read or decompress the files again. Uncompressed chunks are memory mapped
+
+        :param directory:           The directory of the store
+        :param max_cached_chunks:   Number of chunks kept in memory. Default is 16
+        """
+        self.directory = pathlib.Path(directory)
+        manifest_file_name = self.directory / 'manifest.json'
+        if not manifest_file_name.exists():
+            raise ValueError(f'{self.directory} is not an exported odb store, there is no manifest.json')
+        self.manifest = None
+        self._manifest_time = None
+        self.max_cached_chunks = max_cached_chunks
+        self._chunks = OrderedDict()
+        self._labels = {}
+        self.refresh()
+
+    def refresh(self):
+        """
+        Reads the manifest again if the store has been updated, for example by an incremental export. The chunks of
+        the frames already in the store do not change and are kept in memory
+
+        :return:    True if the manifest was read again
+        """
+        manifest_file_name = self.directory / 'manifest.json'
+        manifest_time = manifest_file_name.stat().st_mtime_ns
+        if manifest_time == self._manifest_time:
+            return False
+        with open(manifest_file_name) as manifest_file:
+            manifest = json.load(manifest_file)
+        if self.manifest is not None and not _extends(manifest, self.manifest):
+            # The store is exported again and the chunk files are replaced
+            self._chunks.clear()
+            self._labels.clear()
+        self.manifest = manifest
+        self._manifest_time = manifest_time
+        return True
+
+    @property
+    def odb_file_name(self):
+        return self.manifest['odb_file_name']
+
+    @property
+    def field_ids(self):
+        return list(self.manifest['fields'])
+
+    def _field(self, field_id):
+        if field_id not in self.manifest['fields']:
+            raise ValueError(f'The field {field_id} is not in the store, the fields are {", ".join(self.field_ids)}')
+        return self.manifest['fields'][field_id]
+
+    def position(self, field_id):
+        return self._field(field_id)['position']
+
+    def components(self, field_id):
+        return self._field(field_id)['components']
+
+    def frames(self, field_id):
+        """
+        :return:    A list of StoredFrame with the frames of the field in the store, in the order they were exported
+        """
+        return [StoredFrame(frame['step_name'], frame['frame_number'], frame['frame_value'])
+                for frame in self._field(field_id)['frames']]
+
+    def _frame(self, field_id, step_name, frame_number):
+        frames = self._field(field_id)['frames']
+        if step_name is None:
+            step_name = frames[-1]['step_name']
+        step_frames = [frame for frame in frames if frame['step_name'] == step_name]
+        if not step_frames:
+            raise ValueError(f'The step {step_name} of the field {field_id} is not in the store')
+        if frame_number == -1:
+            return step_frames[-1]
+        for frame in step_frames:
+            if frame['frame_number'] == frame_number:
+                return frame
+        raise ValueError(f'Frame {frame_number} in the step {step_name} of the field {field_id} is not in the store')
+
+    def _load_chunk(self, chunk_file):
+        if chunk_file in self._chunks:
+            self._chunks.move_to_end(chunk_file)
+            return self._chunks[chunk_file]
+        if chunk_file.endswith('.npz'):
+            with np.load(self.directory / chunk_file) as chunk_data:
+                chunk = chunk_data['data']
+        else:
+            chunk = np.load(self.directory / chunk_file, mmap_mode='r')
+        self._chunks[chunk_file] = chunk
+        while len(self._chunks) > self.max_cached_chunks:
+            self._chunks.popitem(last=False)
+        return chunk
+
+    def _label_array(self, field_id, frame):
+        label_file = self._field(field_id)['label_files'][frame['labels']]
+        if label_file not in self._labels:
+            self._labels[label_file] = np.load(self.directory / label_file, mmap_mode='r')
+        return self._labels[label_file]
+
+    def read(self, field_id, step_name=None, frame_number=-1, rows=None):
+        """
+        Reads a field in a frame
+
+        :param field_id:        The ID of the field, for example 'S'
+        :param step_name:       Name of the step. Default is None which gives the last exported step of the field
+        :param frame_number:    The frame number in the odb. Default is -1 which gives the last exported frame of the
+                                step
+        :param rows:            A slice or an array with the rows to read. Default is None which reads all rows
+        :return:                Array with the data of the rows, with the same layout as for read_data_from_odb
+        """
+        frame = self._frame(field_id, step_name, frame_number)
+        chunk_size = self.manifest['chunk_size']
+        if rows is None or isinstance(rows, slice):
+            start, stop, step = (rows or slice(None)).indices(frame['rows'])
+            if step == 1:
+                if start >= stop:
+                    return self._empty(field_id, frame)
+                # Only the chunks overlapping the rows are read
+                parts = []
+                for chunk in range(start//chunk_size, (stop - 1)//chunk_size + 1):
+                    offset = chunk*chunk_size
+                    parts.append(self._load_chunk(frame['chunks'][chunk])[max(start - offset, 0):stop - offset])
+                return np.concatenate(parts) if len(parts) > 1 else np.array(parts[0])
+            rows = np.arange(start, stop, step)
+        rows = np.asarray(rows, dtype=np.int64)
+        if rows.size and (rows.min() < -frame['rows'] or rows.max() >= frame['rows']):
+            raise IndexError(f'Rows outside of the {frame["rows"]} rows of the field {field_id} are given')
+        rows = rows % max(frame['rows'], 1)
+        result = self._empty(field_id, frame, rows.shape[0])
+        chunk_numbers = rows//chunk_size
+        for chunk in np.unique(chunk_numbers):
+            in_chunk = chunk_numbers == chunk
+            result[in_chunk] = self._load_chunk(frame['chunks'][chunk])[rows[in_chunk] - chunk*chunk_size]
+        return result
+
+    def _empty(self, field_id, frame, number_of_rows=0):
+        first_chunk = self._load_chunk(frame['chunks'][0])
+        return np.empty((number_of_rows,) + first_chunk.shape[1:], dtype=first_chunk.dtype)
+
+    def labels(self, field_id, step_name=None, frame_number=-1):
+        """
+        :return:    The node labels and the element labels of the rows of the field as for read_data_from_odb with
+                    get_position_numbers=True, memory mapped from the store
+        """
+        frame = self._frame(field_id, step_name, frame_number)
+        labels = self._label_array(field_id, frame)
+        empty = np.zeros(0, dtype=np.int32)
+        if self.position(field_id) in ['NODAL', 'ELEMENT_NODAL']:
+            return labels, empty
+        return empty, labels
+
+    def label_index(self, field_id, step_name=None, frame_number=-1):
+        """
+        :return:    A LabelIndex of the rows of the field
+        """
+        node_labels, element_labels = self.labels(field_id, step_name, frame_number)
+        return LabelIndex.from_labels(node_labels, element_labels)
+
+    def history(self, field_id, step_names=None, rows=None):
+        """
+        Reads a field in all exported frames of steps
+
+        :param field_id:    The ID of the field
+        :param step_names:  A step name or a list of step names. Default is None which gives all exported steps
+        :param rows:        A slice or an array with the rows to read in each frame. Default is None which reads all
+                            rows
+        :return:            The stored frames as a list of StoredFrame and an array with the shape
+                            (frames, rows, components), or (frames, rows) for scalar fields
+        """
+        if isinstance(step_names, str):
+            step_names = [step_names]
+        frames = [frame for frame in self.frames(field_id) if step_names is None or frame.step_name in step_names]
+        if not frames:
+            raise ValueError(f'The field {field_id} has no exported frames in the steps {step_names}')
+        return frames, np.stack([self.read(field_id, frame.step_name, frame.frame_number, rows) for frame in frames])
@@ -0,0 +1,364 @@
+import re
+
+import numpy as np
+
+_hex_corners = np.array([[-1, -1, -1], [1, -1, -1], [1, 1, -1], [-1, 1, -1],
+                         [-1, -1, 1], [1, -1, 1], [1, 1, 1], [-1, 1, 1]], dtype=float)
+# Natural coordinates of the mid-side nodes 9-20 of C3D20 elements
+_hex_mid_nodes = np.array([[0, -1, -1], [1, 0, -1], [0, 1, -1], [-1, 0, -1],
+                           [0, -1, 1], [1, 0, 1], [0, 1, 1], [-1, 0, 1],
+                           [-1, -1, 0], [1, -1, 0], [1, 1, 0], [-1, 1, 0]], dtype=float)
+
+
+def _hex_corner_products(xi):
+    terms = 1 + xi[:, np.newaxis, :]*_hex_corners
+    return terms[:, :, 0]*terms[:, :, 1]*terms[:, :, 2]
+
+
+def _hex8(xi):
+    return _hex_corner_products(xi)/8
+
+
+def _hex20(xi):
+    n = np.empty((xi.shape[0], 20))
+    n[:, :8] = _hex_corner_products(xi)*(xi @ _hex_corners.T - 2)/8
+    for i, node in enumerate(_hex_mid_nodes):
+        zero_direction = np.argmin(np.abs(node))
+        value = 1 - xi[:, zero_direction]**2
+        for direction in range(3):
+            if direction != zero_direction:
+                value = value*(1 + xi[:, direction]*node[direction])
+        n[:, 8 + i] = value/4
+    return n
+
+
+def _tet4(xi):
+    return np.column_stack([1 - xi.sum(axis=1), xi])
+
+
+def _tet10(xi):
+    l1, l2, l3, l4 = _tet4(xi).T
+    return np.column_stack([l1*(2*l1 - 1), l2*(2*l2 - 1), l3*(2*l3 - 1), l4*(2*l4 - 1),
+                            4*l1*l2, 4*l2*l3, 4*l3*l1, 4*l1*l4, 4*l2*l4, 4*l3*l4])
+
+
+def _wedge6(xi):
+    triangle = np.column_stack([1 - xi[:, 0] - xi[:, 1], xi[:, 0], xi[:, 1]])
+    return np.hstack([triangle*(1 - xi[:, 2:3])/2, triangle*(1 + xi[:, 2:3])/2])
+
+
+def _hex_outside(xi):
+    return np.max(np.abs(xi), axis=1) - 1
+
+
+def _tet_outside(xi):
+    return np.max(np.column_stack([-xi, xi.sum(axis=1) - 1]), axis=1)
+
+
+def _wedge_outside(xi):
+    return np.max(np.column_stack([-xi[:, :2], xi[:, :2].sum(axis=1) - 1, np.abs(xi[:, 2]) - 1]), axis=1)
+
+
+class _ElementFamily:
+    def __init__(self, shape_functions, outside, center, vertices, quadratic=False):
+        """
+        :param shape_functions: Function giving the shape functions with the shape (points, nodes) for natural
+                                coordinates with the shape (points, 3)
+        :param outside:         Function giving how far outside the element natural coordinates are, values <= 0
+                                are inside the element
+        :param center:          Natural coordinates of the element center, used as start point for the inverse mapping
+        :param vertices:        Natural coordinates of the corner nodes. Points between the center and the corners
+                                are used as start points if the mapping from the center does not end in the element
+        :param quadratic:       Flag if the element has mid-side nodes which allows curved edges that can extend
+                                outside the bounding box of the nodes
+        """
+        self.quadratic = quadratic
+        self.shape_functions = shape_functions
+        self.outside = outside
+        self.center = np.array(center, dtype=float)
+        self.start_points = np.vstack([self.center, (self.center + np.array(vertices, dtype=float))/2])
+
+    def derivatives(self, xi, step=1e-4):
+        # The shape functions are polynomials of at most third degree in each direction, central differences are
+        # accurate to round off
+        derivatives = np.empty(xi.shape[:1] + (self.shape_functions(xi[:1]).shape[1], 3))
+        for direction in range(3):
+            delta = np.zeros(3)
+            delta[direction] = step
+            derivatives[:, :, direction] = (self.shape_functions(xi + delta) - self.shape_functions(xi - delta))/(2*step)
+        return derivatives
+
+
+# The element families indexed by the number of nodes in the abaqus element type, C3D8R gives 8 for instance
+_tet_vertices = [(0, 0, 0), (1, 0, 0), (0, 1, 0), (0, 0, 1)]
+_wedge_vertices = [(0, 0, -1), (1, 0, -1), (0, 1, -1), (0, 0, 1), (1, 0, 1), (0, 1, 1)]
+element_families = {4: _ElementFamily(_tet4, _tet_outside, (0.25, 0.25, 0.25), _tet_vertices),
+                    6: _ElementFamily(_wedge6, _wedge_outside, (1/3, 1/3, 0.), _wedge_vertices),
+                    8: _ElementFamily(_hex8, _hex_outside, (0., 0., 0.), _hex_corners),
+                    10: _ElementFamily(_tet10, _tet_outside, (0.25, 0.25, 0.25), _tet_vertices, quadratic=True),
+                    20: _ElementFamily(_hex20, _hex_outside, (0., 0., 0.), _hex_corners, quadratic=True)}
+
+
+# The continuum solid elements for stress, coupled and heat transfer analyses, for example C3D8R, C3D20RT and DC3D10,
+# which have the same node numbering. Other elements, like the acoustic AC3D8, Eulerian EC3D8R, cohesive COH3D8 and
+# variable node C3D15V elements, are not supported
+_element_type_pattern = re.compile(r'^D?C3D(\d+)[A-Z]*$')
+
+
+def element_family(element_type):
+    match = _element_type_pattern.match(str(element_type))
+    if match is None or int(match.group(1)) not in element_families:
+        raise ValueError(f"The element type {element_type} is not supported, supported types are the three "
+                         f"dimensional continuum solid elements C3D and DC3D with {sorted(element_families)} nodes")
+    return int(match.group(1))
+
+
+class _BoundingBoxGrid:
+    def __init__(self, box_min, box_max):
+        """
+        A uniform grid where each cell holds the elements with bounding boxes overlapping the cell. The cell size is
+        the median element size which gives a few elements per cell
+        """
+        self.origin = box_min.min(axis=0)
+        element_sizes = np.max(box_max - box_min, axis=1)
+        self.cell_size = max(np.median(element_sizes), 1e-12*max(np.ptp(box_max, axis=0).max(), 1.))
+        extent = box_max.max(axis=0) - self.origin
+        self.shape = np.floor(extent/self.cell_size).astype(np.int64) + 1
+
+        lower = self._cell_indices(box_min)
+        upper = self._cell_indices(box_max)
+        cells_per_element = np.prod(upper - lower + 1, axis=1)
+        element_ids = np.repeat(np.arange(box_min.shape[0]), cells_per_element)
+        # Index of each cell within the bounding box of its element, decomposed into i, j and k
+        local_index = np.arange(element_ids.shape[0]) - np.repeat(np.cumsum(cells_per_element) - cells_per_element,
+                                                                  cells_per_element)
+        box_shape = (upper - lower + 1)[element_ids]
+        i = lower[element_ids, 0] + local_index % box_shape[:, 0]
+        j = lower[element_ids, 1] + (local_index // box_shape[:, 0]) % box_shape[:, 1]
+        k = lower[element_ids, 2] + local_index // (box_shape[:, 0]*box_shape[:, 1])
+        keys = self._key(i, j, k)
+        order = np.argsort(keys, kind='stable')
+        self.element_ids = element_ids[order]
+        self.cell_keys, self.cell_starts, cell_counts = np.unique(keys[order], return_index=True, return_counts=True)
+        self.cell_ends = self.cell_starts + cell_counts
+
+    def _cell_indices(self, points):
+        return np.clip(np.floor((points - self.origin)/self.cell_size).astype(np.int64), 0, self.shape - 1)
+
+    def _key(self, i, j, k):
+        return i + self.shape[0]*(j + self.shape[1]*k)
+
+    def candidates(self, points):
+        """
+        :return:    Arrays with the point index and the element id for each candidate pair
+        """
+        cells = self._cell_indices(points)
+        keys = self._key(cells[:, 0], cells[:, 1], cells[:, 2])
+        position = np.minimum(np.searchsorted(self.cell_keys, keys), self.cell_keys.shape[0] - 1)
+        found = self.cell_keys[position] == keys
+        starts = np.where(found, self.cell_starts[position], 0)
+        counts = np.where(found, self.cell_ends[position] - self.cell_starts[position], 0)
+        point_ids = np.repeat(np.arange(points.shape[0]), counts)
+        offsets = np.arange(point_ids.shape[0]) - np.repeat(np.cumsum(counts) - counts, counts)
+        return point_ids, self.element_ids[np.repeat(starts, counts) + offsets]
+
+
+class PathProbe:
+    def __init__(self, node_labels, node_coordinates, elements, tolerance=1e-6, chunk_size=100000):
+        """
+        Locates points in a mesh and interpolates nodal data to the points with the shape functions of the elements
+        without abaqus. The elements containing the points are found with a grid of the element bounding boxes and
+        the inverse isoparametric mapping is solved with Newton iterations for all points at once. Supported elements
+        are the three dimensional continuum solid elements with 4, 6, 8, 10 and 20 nodes, like C3D4, C3D6, C3D8R,
+        C3D10, C3D20R and the coupled and heat transfer versions C3D8T and DC3D8
+
+        :param node_labels:         Array with the node labels
+        :param node_coordinates:    Array with the node coordinates, one row per node
+        :param elements:            A dict with element types as keys and tuples with element labels and connectivity
+                                    as values, as for OdbInstance.from_arrays
+        :param tolerance:           Tolerance in natural coordinates for points on element boundaries
+        :param chunk_size:          Number of points processed at once, limits the memory use
+        """
+        self.node_labels = np.asarray(node_labels)
+        self.node_coordinates = np.zeros((self.node_labels.shape[0], 3))
+        node_coordinates = np.asarray(node_coordinates, dtype=float)
+        self.node_coordinates[:, :node_coordinates.shape[1]] = node_coordinates
+        self.tolerance = tolerance
+        self.chunk_size = chunk_size
+        self._label_order = np.argsort(self.node_labels)
+
+        connectivity_per_family = {}
+        labels_per_family = {}
+        for element_type, (labels, connectivity) in elements.items():
+            family = element_family(element_type)
+            connectivity_per_family.setdefault(family, []).append(self.node_indices(connectivity))
+            labels_per_family.setdefault(family, []).append(np.asarray(labels))
+        self.families = sorted(connectivity_per_family)
+        self.connectivity = {family: np.vstack(connectivity_per_family[family]) for family in self.families}
+        self.element_labels = np.concatenate([np.concatenate(labels_per_family[family]) for family in self.families])
+        # Elements are numbered family by family
+        self.element_family = np.concatenate([np.full(self.connectivity[family].shape[0], family)
+                                              for family in self.families])
+        family_sizes = [self.connectivity[family].shape[0] for family in self.families]
+        self.family_offset = dict(zip(self.families, np.cumsum([0] + family_sizes)[:-1]))
+        box_min = np.vstack([self.node_coordinates[self.connectivity[family]].min(axis=1) for family in self.families])
+        box_max = np.vstack([self.node_coordinates[self.connectivity[family]].max(axis=1) for family in self.families])
+        # A curved edge of a quadratic element extends at most a quarter of the mid-side node offset outside the
+        # bounding box of its nodes, a padding of a tenth of the element size is used for quadratic elements
+        curved = np.array([element_families[family].quadratic for family in self.element_family])
+        padding = (tolerance + 0.1*curved[:, np.newaxis])*np.max(box_max - box_min, axis=1, keepdims=True)
+        self.box_min = box_min - padding
+        self.box_max = box_max + padding
+        self.grid = _BoundingBoxGrid(self.box_min, self.box_max)
+
+    @classmethod
+    def from_instance(cls, instance, **kwargs):
+        """
+        Creates a probe for the mesh of an OdbInstance, for example from ABQInterface.get_mesh
+        """
+        data = instance.data
+        elements = {element_type: (element_data['labels'], element_data['connectivity'])
+                    for element_type, element_data in data['elements'].items()}
+        return cls(data['node_labels'], data['node_coordinates'], elements, **kwargs)
+
+    def node_indices(self, labels):
+        labels = np.asarray(labels)
+        positions = np.minimum(np.searchsorted(self.node_labels, labels, sorter=self._label_order),
+                               self.node_labels.shape[0] - 1)
+        indices = self._label_order[positions]
+        if np.any(self.node_labels[indices] != labels):
+            raise ValueError('Node labels that are not present in the mesh were given')
+        return indices
+
+    def _inverse_mapping(self, family, points, element_indices, start_point, max_iterations=20):
+        element_family = element_families[family]
+        coordinates = self.node_coordinates[self.connectivity[family][element_indices]]
+        xi = np.tile(start_point, (points.shape[0], 1))
+        # Only the pairs that have not converged are iterated further
+        active = np.arange(points.shape[0])
+        for _ in range(max_iterations):
+            active_coordinates = coordinates[active]
+            residual = points[active] - np.einsum('pn,pnd->pd', element_family.shape_functions(xi[active]),
+                                                  active_coordinates)
+            jacobian = np.einsum('pnd,pnk->pdk', active_coordinates, element_family.derivatives(xi[active]))
+            singular = np.abs(np.linalg.det(jacobian)) < 1e-300
+            jacobian[singular] = np.eye(3)
+            step = np.linalg.solve(jacobian, residual[:, :, np.newaxis])[:, :, 0]
+            # Far away points could make the iterations diverge, they are outside anyway
+            xi[active] = np.clip(xi[active] + step, -3, 3)
+            active = active[np.max(np.abs(step), axis=1) >= 1e-12]
+            if active.shape[0] == 0:
+                break
+        # Pairs where the iterations did not converge are marked with nan
+        residual = points - np.einsum('pn,pnd->pd', element_family.shape_functions(xi), coordinates)
+        element_size = np.max(np.ptp(coordinates, axis=1), axis=1)
+        xi[np.linalg.norm(residual, axis=1) > 1e-8*element_size] = np.nan
+        return xi
+
+    def _resolve(self, points, point_ids, element_ids, start_point, point_elements, point_coordinates):
+        # Each point appears at most once in point_ids
+        for family in self.families:
+            start_points = element_families[family].start_points
+            pairs = self.element_family[element_ids] == family
+            if start_point >= start_points.shape[0] or not np.any(pairs):
+                continue
+            xi = self._inverse_mapping(family, points[point_ids[pairs]], element_ids[pairs] - self.family_offset[family],
+                                       start_points[start_point])
+            inside = element_families[family].outside(xi) <= self.tolerance
+            point_elements[point_ids[pairs][inside]] = element_ids[pairs][inside]
+            point_coordinates[point_ids[pairs][inside]] = xi[inside]
+
+    def locate(self, points):
+        """
+        Finds the elements containing points
+
+        :param points:  Array with the coordinates of the points, one row per point
+        :return:        An array with the index of the element containing each point, -1 for points outside the mesh,
+                        and an array with the natural coordinates of the points in the elements
+        """
+        points = np.atleast_2d(np.asarray(points, dtype=float))
+        points = np.hstack([points, np.zeros((points.shape[0], 3 - points.shape[1]))])
+        element_indices = np.full(points.shape[0], -1, dtype=np.int64)
+        natural_coordinates = np.full((points.shape[0], 3), np.nan)
+        for start in range(0, points.shape[0], self.chunk_size):
+            chunk = points[start:start + self.chunk_size]
+            point_ids, element_ids = self.grid.candidates(chunk)
+            in_box = np.all((chunk[point_ids] >= self.box_min[element_ids])
+                            & (chunk[point_ids] <= self.box_max[element_ids]), axis=1)
+            point_ids, element_ids = point_ids[in_box], element_ids[in_box]
+            # The candidates of each point are tried one at a time, closest element center first, and only for the
+            # points that have not been found yet. Most points are then found in the first candidate
+            distances = np.sum((chunk[point_ids] - (self.box_min[element_ids] + self.box_max[element_ids])/2)**2, axis=1)
+            order = np.lexsort((distances, point_ids))
+            point_ids, element_ids = point_ids[order], element_ids[order]
+            counts = np.bincount(point_ids, minlength=chunk.shape[0])
+            rank = np.arange(point_ids.shape[0]) - np.repeat(np.cumsum(counts) - counts, counts)
+            order = np.argsort(rank, kind='stable')
+            point_ids, element_ids = point_ids[order], element_ids[order]
+            rank_starts = np.searchsorted(rank[order], np.arange(counts.max(initial=0) + 1))
+            chunk_elements = element_indices[start:start + self.chunk_size]
+            chunk_coordinates = natural_coordinates[start:start + self.chunk_size]
+            # Distorted quadratic elements can map points outside the element to the same coordinates as points
+            # inside, the candidates are tried again from start points closer to the corners for points not found
+            for start_point in range(max(len(element_families[family].start_points) for family in self.families)):
+                for first, last in zip(rank_starts[:-1], rank_starts[1:]):
+                    pair_points, pair_elements = point_ids[first:last], element_ids[first:last]
+                    unresolved = chunk_elements[pair_points] < 0
+                    if not np.any(unresolved):
+                        continue
+                    self._resolve(chunk, pair_points[unresolved], pair_elements[unresolved], start_point,
+                                  chunk_elements, chunk_coordinates)
+                if np.all(chunk_elements[point_ids] >= 0):
+                    break
+        return element_indices, natural_coordinates
+
+    def nodal_values(self, values, node_labels=None):
+        """
+        Orders data as the nodes of the probe. Data at element nodes, given with repeated node labels, is averaged
+        at the nodes as in the abaqus viewer
+
+        :param values:      Array with one row per value
+        :param node_labels: The node label of each row. Default is None which means that the rows are ordered as the
+                            node labels of the probe
+        :return:            Array with a row for each node of the probe, nan for nodes without values
+        """
+        values = np.asarray(values, dtype=float)
+        if node_labels is None:
+            return values
+        indices = self.node_indices(node_labels)
+        sums = np.zeros((self.node_labels.shape[0],) + values.shape[1:])
+        np.add.at(sums, indices, values)
+        counts = np.bincount(indices, minlength=self.node_labels.shape[0]).astype(float)
+        counts[counts == 0] = np.nan
+        return sums/counts.reshape((-1, ) + (1, )*(values.ndim - 1))
+
+    def interpolate(self, points, values, node_labels=None):
+        """
+        Interpolates nodal data to points
+
+        :param points:      Array with the coordinates of the points, one row per point
+        :param values:      Nodal data, see nodal_values
+        :param node_labels: The node label of each row of values, see nodal_values
+        :return:            Array with the interpolated data at each point, nan for points outside the mesh
+        """
+        values = self.nodal_values(values, node_labels)
+        element_indices, natural_coordinates = self.locate(points)
+        data = np.full((element_indices.shape[0],) + values.shape[1:], np.nan)
+        for family in self.families:
+            offset = self.family_offset[family]
+            rows = (element_indices >= offset) & (element_indices < offset + self.connectivity[family].shape[0])
+            shape_functions = element_families[family].shape_functions(natural_coordinates[rows])
+            element_values = values[self.connectivity[family][element_indices[rows] - offset]]
+            data[rows] = np.einsum('pn,pn...->p...', shape_functions, element_values)
+        return data
+
+    def path_data(self, path_points, values, node_labels=None):
+        """
+        Interpolates nodal data along a path given by points, corresponds to ABQInterface.get_data_from_path with
+        the data averaged at the nodes
+
+        :return:    The distance along the path and the data at each point of the path
+        """
+        path_points = np.asarray(path_points, dtype=float)
+        distances = np.concatenate([[0.], np.cumsum(np.linalg.norm(np.diff(path_points, axis=0), axis=1))])
+        return distances, self.interpolate(path_points, values, node_labels)
@@ -0,0 +1,206 @@
+import hashlib
+import json
+import os
+import pathlib
+import shutil
+import time
+import uuid
+
+from abaqus_interface.transport import load_data, save_data
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits/lookups if lookups else 0.
+
+    def __repr__(self):
+        return (f'CacheStats(hits={self.hits}, misses={self.misses}, stores={self.stores}, '
+                f'evictions={self.evictions}, invalidations={self.invalidations})')
+
+
+class _CacheLock:
+    def __init__(self, lock_file_name):
+        self.lock_file_name = lock_file_name
+        self.lock_file = None
+
+    def __enter__(self):
+        self.lock_file = open(self.lock_file_name, 'a')
+        if fcntl is not None:
+            fcntl.flock(self.lock_file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if fcntl is not None:
+            fcntl.flock(self.lock_file, fcntl.LOCK_UN)
+        self.lock_file.close()
+
+
+class ResultCache:
+    def __init__(self, directory, max_size=10*1024**3):
+        """
+        Persistent cache of results read from odb files. The entries are stored per odb in a directory named by a
+        hash of the odb path. The directory also holds the size and modification time of the odb when the entries
+        were created and all entries of an odb are removed when the odb has changed. The least recently used entries
+        are removed when the total size exceeds max_size. Entries are written to a temporary directory and renamed so
+        that several processes can use the same cache directory
+
+        :param directory:   Directory for the cache, created if it does not exist
+        :param max_size:    Max total size of the entries in bytes. Default is 10 GB
+        """
+        self.directory = pathlib.Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.stats = CacheStats()
+
+    @staticmethod
+    def _odb_identity(odb_file_name):
+        odb_file_name = pathlib.Path(odb_file_name).absolute()
+        stat = odb_file_name.stat()
+        return {'odb_file_name': str(odb_file_name), 'size': stat.st_size, 'mtime': stat.st_mtime_ns}
+
+    @staticmethod
+    def _hash(data):
+        return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _odb_directory(self, identity):
+        odb_directory = self.directory / self._hash(identity['odb_file_name'])
+        identity_file_name = odb_directory / 'identity.json'
+        try:
+            with open(identity_file_name) as identity_file:
+                cached_identity = json.load(identity_file)
+        except (FileNotFoundError, ValueError):
+            cached_identity = None
+        if cached_identity != identity:
+            with _CacheLock(self.directory / 'lock'):
+                if cached_identity is not None and odb_directory.exists():
+                    shutil.rmtree(odb_directory, ignore_errors=True)
+                    self.stats.invalidations += 1
+                odb_directory.mkdir(exist_ok=True)
+                with open(identity_file_name, 'w') as identity_file:
+                    json.dump(identity, identity_file)
+        return odb_directory
+
+    def get_or_compute(self, odb_file_name, method, parameters, compute, mmap_mode=None):
+        """
+        Returns a cached result or computes and stores it
+
+        :param odb_file_name:   The odb the result is read from
+        :param method:          Name of the method computing the result
+        :param parameters:      A dict with all parameters the result depends on, must be serializable by json with
+                                str as fallback
+        :param compute:         Function without arguments computing the result if it is not in the cache
+        :param mmap_mode:       Passed to np.load when the arrays of a cached result are read
+        :return:                The result
+        """
+        identity, entry_directory, result = self._lookup(odb_file_name, method, parameters, mmap_mode)
+        if entry_directory is None:
+            return result
+        result = compute()
+        self._store_computed(odb_file_name, identity, entry_directory, result)
+        return result
+
+    async def get_or_compute_async(self, odb_file_name, method, parameters, compute, mmap_mode=None):
+        """
+        As get_or_compute but compute is a coroutine function which is awaited if the result is not in the cache
+        """
+        identity, entry_directory, result = self._lookup(odb_file_name, method, parameters, mmap_mode)
+        if entry_directory is None:
+            return result
+        result = await compute()
+        self._store_computed(odb_file_name, identity, entry_directory, result)
+        return result
+
+    def _lookup(self, odb_file_name, method, parameters, mmap_mode):
+        """
+        :return:    The odb identity, the entry directory and None if the result is missing, otherwise the identity,
+                    None and the cached result
+        """
+        identity = self._odb_identity(odb_file_name)
+        entry_directory = self._odb_directory(identity) / self._hash({'method': method, 'parameters': parameters})
+        try:
+            result = load_data(entry_directory / 'data.pkl', mmap_mode=mmap_mode)
+            os.utime(entry_directory)
+        except (OSError, EOFError):
+            self.stats.misses += 1
+            return identity, entry_directory, None
+        self.stats.hits += 1
+        return identity, None, result
+
+    def _store_computed(self, odb_file_name, identity, entry_directory, result):
+        if self._odb_identity(odb_file_name) != identity:
+            # The odb was modified while the result was computed, for example by a running job, and the result can
+            # be from either version of the odb
+            return
+        self.store(entry_directory, result)
+
+    def store(self, entry_directory, result):
+        temporary_directory = entry_directory.parent / ('.tmp-' + uuid.uuid4().hex)
+        try:
+            temporary_directory.mkdir()
+            save_data(temporary_directory / 'data.pkl', result)
+            os.rename(temporary_directory, entry_directory)
+        except OSError:
+            # The odb was invalidated or another process stored the same entry
+            shutil.rmtree(temporary_directory, ignore_errors=True)
+            return
+        self.stats.stores += 1
+        self.evict()
+
+    def _entries(self, remove_stale_before=None):
+        entries = []
+        for odb_directory in self.directory.iterdir():
+            if not odb_directory.is_dir():
+                continue
+            for entry_directory in odb_directory.iterdir():
+                if entry_directory.name.startswith('.tmp-'):
+                    # Left by processes that were killed while storing an entry
+                    try:
+                        if remove_stale_before and entry_directory.stat().st_mtime < remove_stale_before:
+                            shutil.rmtree(entry_directory, ignore_errors=True)
+                    except FileNotFoundError:
+                        pass
+                elif entry_directory.is_dir():
+                    try:
+                        size = sum(f.stat().st_size for f in entry_directory.iterdir())
+                        entries.append((entry_directory.stat().st_mtime_ns, size, entry_directory))
+                    except FileNotFoundError:
+                        pass
+        return entries
+
+    @property
+    def size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """
+        Removes the least recently used entries until the total size is below max_size
+        """
+        with _CacheLock(self.directory / 'lock'):
+            entries = sorted(self._entries(remove_stale_before=time.time() - 3600.))
+            total_size = sum(size for _, size, _ in entries)
+            for _, size, entry_directory in entries:
+                if total_size <= self.max_size:
+                    break
+                shutil.rmtree(entry_directory, ignore_errors=True)
+                total_size -= size
+                self.stats.evictions += 1
+
+    def clear(self):
+        with _CacheLock(self.directory / 'lock'):
+            for odb_directory in self.directory.iterdir():
+                if odb_directory.is_dir():
+                    shutil.rmtree(odb_directory, ignore_errors=True)
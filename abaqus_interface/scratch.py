@@ -0,0 +1,169 @@
+from contextlib import contextmanager
+import atexit
+import os
+import pathlib
+import shutil
+import tempfile
+import threading
+import weakref
+
+from abaqus_interface.common import TemporaryDirectory
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+session_prefix = 'abaqus_python_'
+scratch_roots = {'local': tempfile.gettempdir(), 'shm': '/dev/shm'}
+
+_process_array_directory = None
+_process_array_directory_lock = threading.Lock()
+
+
+def _clear_directory(directory):
+    for entry in os.scandir(directory):
+        if entry.is_dir(follow_symlinks=False):
+            shutil.rmtree(entry.path)
+        else:
+            os.unlink(entry.path)
+
+
+def _close_session(session_directory, lock_file):
+    if lock_file is not None:
+        lock_file.close()
+    shutil.rmtree(session_directory, ignore_errors=True)
+
+
+def remove_stale_sessions(root):
+    """
+    Removes the session directories in a scratch root that are left by processes that did not close their
+    ScratchManager, for example after a crash. A session is stale when no process holds the lock on its lock file. Only
+    supported on systems with fcntl
+
+    :param root:    The scratch root
+    :return:        The number of removed session directories
+    """
+    if fcntl is None:
+        return 0
+    removed = 0
+    for session_directory in pathlib.Path(root).glob(session_prefix + '*'):
+        try:
+            # The sessions are renamed to the session prefix when they are locked, a session without a lock file
+            # was created without fcntl and is skipped
+            with open(session_directory / 'lock') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                # The directory is removed while the lock is held so that no other process removes it at the same time
+                shutil.rmtree(session_directory, ignore_errors=True)
+        except OSError:
+            continue
+        removed += 1
+    return removed
+
+
+class ScratchManager:
+    def __init__(self, root='local', cleanup_stale=True):
+        """
+        Exchange directories for the files transferred between the interface and abaqus, placed on a local disk or in
+        memory instead of next to the odb, which can be on a slow network filesystem. The manager creates a session
+        directory in root and the exchange directories of the calls in it. The directories are emptied and reused by
+        later calls instead of being created and removed for every call, a directory is only used by one call at a time
+        so the number of directories is the largest number of concurrent calls. The session directory is removed by
+        close() or when the manager is garbage collected. Memory mapped results are moved to the array_directory of the
+        session so that they stay valid when the exchange directory is reused
+
+        :param root:            Directory for the session directory, 'local' for the temporary directory of the system
+                                or 'shm' for /dev/shm which keeps the files in memory. Default is 'local'
+        :param cleanup_stale:   If True, session directories in root left by crashed processes are removed when the
+                                manager is created. Default is True
+        """
+        self.root = pathlib.Path(scratch_roots.get(str(root), root)).absolute()
+        if not self.root.is_dir():
+            raise ValueError(f'The scratch root {self.root} is not a directory')
+        if cleanup_stale:
+            remove_stale_sessions(self.root)
+        # The session is created under a name that remove_stale_sessions does not match and renamed when the lock is
+        # held, otherwise another process could remove it between the creation and the locking. mkdtemp creates a
+        # unique directory atomically so the renamed directory is unique as well
+        directory = pathlib.Path(tempfile.mkdtemp(prefix='.' + session_prefix + str(os.getpid()) + '_', dir=self.root))
+        self._lock_file = None
+        if fcntl is not None:
+            self._lock_file = open(directory / 'lock', 'a')
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+        self.directory = directory.with_name(directory.name[1:])
+        os.rename(directory, self.directory)
+        self.array_directory = self.directory / 'arrays'
+        self.array_directory.mkdir()
+        self._free_directories = []
+        self._number_of_directories = 0
+        self._lock = threading.Lock()
+        self._finalizer = weakref.finalize(self, _close_session, self.directory, self._lock_file)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self._finalizer()
+
+    @property
+    def number_of_directories(self):
+        """
+        The number of exchange directories created by the manager
+        """
+        return self._number_of_directories
+
+    @contextmanager
+    def work_directory(self):
+        """
+        Context manager giving an empty exchange directory that is emptied and returned to the pool on exit
+        """
+        with self._lock:
+            if self._free_directories:
+                work_directory = self._free_directories.pop()
+            else:
+                self._number_of_directories += 1
+                work_directory = self.directory / ('worker_' + str(self._number_of_directories))
+                work_directory.mkdir()
+        try:
+            yield work_directory
+        finally:
+            try:
+                _clear_directory(work_directory)
+            except OSError:
+                # Files still used by another process, the directory is not reused
+                pass
+            else:
+                with self._lock:
+                    self._free_directories.append(work_directory)
+
+
+def exchange_directory(scratch, odb_file_name):
+    """
+    :param scratch:         A ScratchManager or None
+    :param odb_file_name:   Filename of the odb of the call
+    :return:                A context manager giving a directory from scratch, or a temporary directory next to the
+                            odb if scratch is None
+    """
+    if scratch is None:
+        return TemporaryDirectory(pathlib.Path(odb_file_name))
+    return scratch.work_directory()
+
+
+def array_directory(scratch):
+    """
+    :param scratch:     A ScratchManager or None
+    :return:            The directory that memory mapped results are moved to from the exchange directories, the
+                        array directory of scratch or a temporary directory for the process, removed at exit, if scratch
+                        is None
+    """
+    global _process_array_directory
+    if scratch is not None:
+        return scratch.array_directory
+    with _process_array_directory_lock:
+        if _process_array_directory is None:
+            _process_array_directory = pathlib.Path(tempfile.mkdtemp(prefix='abaqus_python_arrays_'))
+            atexit.register(shutil.rmtree, _process_array_directory, ignore_errors=True)
+    return _process_array_directory
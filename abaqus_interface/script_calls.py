@@ -0,0 +1,112 @@
+import pickle
+import pathlib
+import shlex
+
+import numpy as np
+
+from abaqus_interface.common import AbaqusError, AbaqusLicenseError, is_license_error
+from abaqus_interface.transport import copy_to_buffer, save_data
+
+abaqus_python_directory = pathlib.Path(__file__).parents[1].absolute() / "abaqus_python_scripts"
+
+
+def python_command(abq_command, script_name, arguments):
+    return abq_command + ' python ' + script_name + ' ' + ' '.join(shlex.quote(str(arg)) for arg in arguments)
+
+
+def check_return_code(script_name, return_code, output):
+    if return_code != 0:
+        if is_license_error(output):
+            raise AbaqusLicenseError('No abaqus license could be checked out for ' + script_name + '\n' + output)
+        raise AbaqusError('The script ' + script_name + ' failed with return code ' + str(return_code)
+                          + ('' if output is None else '\n' + output))
+
+
+def read_parameters(field_id, odb_file_name, step_name, frame_number, set_name, instance_name, get_position_numbers,
+                    get_frame_value, position, coordinate_system, dtype, labels=None):
+    if step_name is None:
+        step_name = ''
+    parameter_data = {'field_id': field_id, 'odb_file_name': str(odb_file_name), 'step_name': step_name,
+                      'frame_number': frame_number, 'set_name': set_name, 'instance_name': instance_name,
+                      'get_position_numbers': get_position_numbers, 'get_frame_value': get_frame_value,
+                      'position': position, 'dtype': dtype, 'labels': label_list(labels)}
+    if coordinate_system:
+        parameter_data['coordinate_system'] = coordinate_system._asdict()
+    return parameter_data
+
+
+def label_list(labels):
+    # The labels are sent as a list of ints which is read by python 2 in abaqus and used in the result cache key
+    if labels is None:
+        return None
+    return [int(label) for label in np.asarray(labels).ravel()]
+
+
+def read_output(data, get_position_numbers, get_frame_value, out):
+    if out is not None:
+        data['data'] = copy_to_buffer(data['data'], out)
+
+    if not get_position_numbers and not get_frame_value:
+        return data['data']
+    elif not get_position_numbers:
+        return data['data'], data['frame_value']
+    elif not get_frame_value:
+        return data['data'], data['node_labels'], data['element_labels']
+    else:
+        return data['data'], data['frame_value'], data['node_labels'], data['element_labels']
+
+
+def frames_output(frames, odb_file_name, step_name):
+    if frames['frames'] is None:
+        raise ValueError(f"The step name {step_name} is not present in the odb {odb_file_name}")
+    return frames['frames']
+
+
+def save_write_parameters(pickle_filename, field_data, field_id, odb_file_name, step_name, instance_name, set_name,
+                          step_description, frame_number, frame_value, field_description, position, invariants,
+                          dtype):
+    if invariants is None:
+        invariants = []
+    save_data(pickle_filename, {'field_data': np.asarray(field_data), 'field_id': str(field_id),
+                                'odb_file': str(odb_file_name), 'step_name': str(step_name),
+                                'instance_name': str(instance_name), 'set_name': str(set_name),
+                                'step_description': str(step_description),
+                                'frame_number': frame_number, 'frame_value': frame_value,
+                                'field_description': str(field_description), 'position': str(position),
+                                'invariants': [str(invariant) for invariant in invariants]},
+              dtype=dtype)
+
+
+def save_path_parameters(work_directory, path_points, odb_filename, variable, component, step_name, frame_number,
+                         output_position):
+    parameter_pickle_name = work_directory / 'parameter_pickle.pkl'
+    path_points_filename = work_directory / 'path_points.npy'
+    data_filename = work_directory / 'path_data.npy'
+    parameter_dict = {'odb_filename': str(odb_filename),
+                      'variable': variable,
+                      'path_points_filename': str(path_points_filename),
+                      'data_filename': str(data_filename)}
+    if component is not None:
+        parameter_dict['component'] = component
+    if step_name is not None:
+        parameter_dict['step_name'] = step_name
+    if frame_number is not None:
+        parameter_dict['frame_number'] = frame_number
+    parameter_dict['output_position'] = output_position
+
+    with open(parameter_pickle_name, 'wb') as pickle_file:
+        pickle.dump(parameter_dict, pickle_file, protocol=2)
+    if not isinstance(path_points, np.ndarray):
+        path_points = np.array(path_points)
+    np.save(path_points_filename, path_points)
+    return parameter_pickle_name, data_filename
+
+
+def path_output(data_filename):
+    return path_values(np.load(data_filename))
+
+
+def path_values(xy_data):
+    data = np.unique(xy_data, axis=0)
+    _, idx = np.unique(data[:, 0], return_index=True)
+    return data[idx, 1]
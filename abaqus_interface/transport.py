@@ -0,0 +1,121 @@
+"""
+Exchange of data with the abaqus python scripts through files. The numpy arrays are written as raw .npy files next to a
+protocol 2 pickle with the rest of the data where each array is replaced by {'npy_file': filename}. For the pickle
+results.pkl the arrays are written as results_0.npy, results_1.npy and so on. The same format is read and written by
+abaqus_python_scripts/transport.py
+"""
+import os
+import pathlib
+import pickle
+import shutil
+import tempfile
+import weakref
+
+import numpy as np
+
+from abaqus_interface.instrumentation import client_phase
+
+
+def _replace_arrays(data, base_name, array_files, dtype):
+    if isinstance(data, np.ndarray):
+        if dtype is not None and data.dtype.kind == 'f':
+            data = data.astype(dtype)
+        file_name = base_name.parent / (base_name.name + '_' + str(len(array_files)) + '.npy')
+        np.save(file_name, data)
+        array_files.append(file_name)
+        return {'npy_file': file_name.name}
+    if isinstance(data, dict):
+        return {key: _replace_arrays(value, base_name, array_files, dtype) for key, value in data.items()}
+    if isinstance(data, (list, tuple)):
+        return type(data)(_replace_arrays(value, base_name, array_files, dtype) for value in data)
+    return data
+
+
+def _remove_file(file_name):
+    try:
+        os.unlink(file_name)
+    except OSError:
+        # Still mapped on systems that do not allow removing mapped files, removed with the array directory instead
+        pass
+
+
+def _load_arrays(data, directory, mmap_mode, array_directory):
+    if isinstance(data, dict):
+        if len(data) == 1 and 'npy_file' in data:
+            return load_array(directory / data['npy_file'], mmap_mode, array_directory)
+        return {key: _load_arrays(value, directory, mmap_mode, array_directory) for key, value in data.items()}
+    if isinstance(data, (list, tuple)):
+        return type(data)(_load_arrays(value, directory, mmap_mode, array_directory) for value in data)
+    return data
+
+
+def load_array(file_name, mmap_mode=None, array_directory=None):
+    """
+    Reads a .npy file
+
+    :param file_name:       Filename of the .npy file
+    :param mmap_mode:       Passed to np.load, see load_data
+    :param array_directory: A directory that the file is moved to before it is memory mapped so that the array stays
+                            valid when the directory of file_name is removed. The moved file is removed when the array
+                            is garbage collected. Only used if mmap_mode is given. Default is None which maps the file
+                            where it is
+    :return:                The array
+    """
+    if mmap_mode is None or array_directory is None:
+        return np.load(file_name, mmap_mode=mmap_mode)
+    handle, mapped_file_name = tempfile.mkstemp(suffix='.npy', dir=array_directory)
+    os.close(handle)
+    shutil.move(str(file_name), mapped_file_name)
+    array = np.load(mapped_file_name, mmap_mode=mmap_mode)
+    weakref.finalize(array, _remove_file, mapped_file_name)
+    return array
+
+
+def save_data(file_name, data, dtype=None):
+    """
+    Writes data to a pickle and the numpy arrays to .npy files
+
+    :param file_name:   Filename of the pickle
+    :param data:        The data to write, numpy arrays in dicts, lists and tuples are written as .npy files
+    :param dtype:       If given, floating point arrays are converted to this type before they are written,
+                        for example 'float32'. Default is None which keeps the type of the arrays
+    :return:            Nothing
+    """
+    file_name = pathlib.Path(file_name)
+    with client_phase('save_data'):
+        header = _replace_arrays(data, file_name.with_suffix(''), [], dtype)
+        with open(file_name, 'wb') as pickle_file:
+            pickle.dump(header, pickle_file, protocol=2)
+
+
+def load_data(file_name, mmap_mode=None, array_directory=None):
+    """
+    Reads data written by save_data
+
+    :param file_name:       Filename of the pickle
+    :param mmap_mode:       Passed to np.load for the arrays, with mmap_mode='r' the arrays are memory mapped instead of
+                            read into memory. Default is None which reads the arrays into memory
+    :param array_directory: A directory that the array files are moved to before they are memory mapped, see
+                            load_array. Needed if the directory of file_name is removed while the arrays are used.
+                            Default is None which maps the files where they are
+    :return:                The data with the numpy arrays loaded
+    """
+    file_name = pathlib.Path(file_name)
+    with client_phase('load_data'):
+        with open(file_name, 'rb') as pickle_file:
+            header = pickle.load(pickle_file, encoding='latin1')
+        return _load_arrays(header, file_name.absolute().parent, mmap_mode, array_directory)
+
+
+def copy_to_buffer(data, out):
+    """
+    Copies an array, typically memory mapped, into a caller provided buffer
+
+    :param data:    The array to copy
+    :param out:     A numpy array with the same shape as data
+    :return:        out
+    """
+    if out.shape != data.shape:
+        raise ValueError('The buffer has shape ' + str(out.shape) + ' but the data has shape ' + str(data.shape))
+    np.copyto(out, data, casting='same_kind')
+    return out
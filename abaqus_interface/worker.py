@@ -0,0 +1,192 @@
+import os
+import pickle
+import secrets
+import signal
+import socket
+import struct
+import subprocess
+import tempfile
+import threading
+import time
+
+from abaqus_interface.common import AbaqusError, AbaqusLicenseError, is_license_error
+
+message_header = struct.Struct('>Q')
+
+# Scripts that do not change the odb and can be run again if the worker crashes while running them
+idempotent_scripts = frozenset(['get_steps.py', 'get_frames.py', 'get_odb_catalog.py', 'get_mesh.py', 'export_odb.py',
+                                'read_data_from_odb.py', 'read_data_batch_from_odb.py', 'read_history_from_odb.py',
+                                'reduce_data_from_odb.py', 'stream_data_from_odb.py'])
+
+
+class AbaqusWorkerError(AbaqusError):
+    pass
+
+
+def _receive_bytes(connection, size):
+    chunks = []
+    while size > 0:
+        chunk = connection.recv(min(size, 1 << 20))
+        if not chunk:
+            raise EOFError('The connection to the abaqus worker was closed')
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def send_message(connection, message):
+    payload = pickle.dumps(message, protocol=2)
+    connection.sendall(message_header.pack(len(payload)) + payload)
+
+
+def receive_message(connection):
+    size = message_header.unpack(_receive_bytes(connection, message_header.size))[0]
+    return pickle.loads(_receive_bytes(connection, size), encoding='latin1')
+
+
+class AbaqusWorker:
+    def __init__(self, abq_command, shell_command, script_directory, output=False, odb_cache_size=4,
+                 startup_timeout=600., max_restarts=1):
+        """
+        A long lived abaqus python process running abaqus_worker.py which runs the abaqus python scripts on request.
+        The worker is started at the first request and restarted if it has crashed
+
+        :param abq_command:         The command used for starting abaqus
+        :param shell_command:       The shell the worker is started in
+        :param script_directory:    Directory with the abaqus python scripts
+        :param output:              Flag if the output from abaqus should be shown. Default is False
+        :param odb_cache_size:      Number of odbs the worker keeps open for reading between the requests
+        :param startup_timeout:     Time in seconds to wait for the worker to connect, including waiting for licenses
+        :param max_restarts:        Number of times a request is retried with a new worker if the worker crashes
+                                    before the request is sent or while running a script in idempotent_scripts
+        """
+        self.abq = abq_command
+        self.shell_command = shell_command
+        self.script_directory = script_directory
+        self.output = output
+        self.odb_cache_size = odb_cache_size
+        self.startup_timeout = startup_timeout
+        self.max_restarts = max_restarts
+        self.process = None
+        self.connection = None
+        self.log_file = None
+        self.lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.bind(('127.0.0.1', 0))
+        listener.listen(1)
+        listener.settimeout(1.)
+        token = secrets.token_hex(16)
+        command = ('cd ' + str(self.script_directory) + ' && ' + self.abq + ' python abaqus_worker.py '
+                   + str(listener.getsockname()[1]) + ' ' + token + ' ' + str(self.odb_cache_size))
+        if self.output is True:
+            self.process = subprocess.Popen([self.shell_command, '-i', '-c', command], stdin=subprocess.DEVNULL,
+                                            start_new_session=True)
+        else:
+            # The output is kept to find out why the worker did not start
+            self.log_file = tempfile.TemporaryFile()
+            self.process = subprocess.Popen([self.shell_command, '-i', '-c', command], stdin=subprocess.DEVNULL,
+                                            stdout=self.log_file, stderr=subprocess.STDOUT,
+                                            start_new_session=True)
+        deadline = time.monotonic() + self.startup_timeout
+        try:
+            while self.connection is None:
+                try:
+                    connection, _ = listener.accept()
+                except socket.timeout:
+                    if self.process.poll() is not None:
+                        output = self._read_log()
+                        if is_license_error(output):
+                            raise AbaqusLicenseError('The abaqus worker could not check out a license\n' + output)
+                        raise AbaqusWorkerError('The abaqus worker exited with return code '
+                                                + str(self.process.returncode) + ' during start up')
+                    if time.monotonic() > deadline:
+                        self.kill()
+                        raise AbaqusWorkerError('The abaqus worker did not start within '
+                                                + str(self.startup_timeout) + ' s')
+                    continue
+                connection.settimeout(self.startup_timeout)
+                try:
+                    authenticated = _receive_bytes(connection, len(token)) == token.encode('ascii')
+                except (OSError, EOFError):
+                    authenticated = False
+                if authenticated:
+                    connection.settimeout(None)
+                    self.connection = connection
+                else:
+                    connection.close()
+        finally:
+            listener.close()
+
+    def run_script(self, script_name, arguments, idempotent=None):
+        """
+        Runs an abaqus python script in the worker
+
+        :param script_name:     Filename of the script in the script directory
+        :param arguments:       List with the command line arguments to the script
+        :param idempotent:      Flag if the script can be run again if the worker crashes while running it. A script
+                                writing to an odb is not run again as the crash can have happened during the save.
+                                Default is None which gives True for the scripts in idempotent_scripts
+        :return:                Nothing, raises AbaqusWorkerError if the script raised an exception
+        """
+        if idempotent is None:
+            idempotent = script_name in idempotent_scripts
+        request = {'command': 'run_script', 'script': script_name, 'arguments': [str(arg) for arg in arguments]}
+        with self.lock:
+            for attempt in range(self.max_restarts + 1):
+                if not self.running:
+                    self.close()
+                    self.start()
+                sent = False
+                try:
+                    send_message(self.connection, request)
+                    sent = True
+                    reply = receive_message(self.connection)
+                except (OSError, EOFError):
+                    self.kill()
+                    if sent and not idempotent:
+                        raise AbaqusWorkerError('The abaqus worker crashed when running ' + script_name
+                                                + ', the script is not run again as it can have changed the odb')
+                    if attempt == self.max_restarts:
+                        raise AbaqusWorkerError('The abaqus worker crashed when running ' + script_name)
+                else:
+                    if reply['status'] == 'error':
+                        raise AbaqusWorkerError('The script ' + script_name + ' failed in the abaqus worker\n'
+                                                + reply['message'])
+                    return
+
+    def _read_log(self):
+        if self.log_file is None:
+            return None
+        self.log_file.seek(0)
+        return self.log_file.read().decode(errors='replace')
+
+    def kill(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+        if self.running:
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        if self.process is not None:
+            self.process.wait()
+            self.process = None
+        if self.log_file is not None:
+            self.log_file.close()
+            self.log_file = None
+
+    def close(self, timeout=30.):
+        if self.connection is not None and self.running:
+            try:
+                send_message(self.connection, {'command': 'shutdown'})
+                self.process.wait(timeout)
+            except (OSError, subprocess.TimeoutExpired):
+                pass
+        self.kill()
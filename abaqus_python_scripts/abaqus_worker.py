@@ -0,0 +1,83 @@
+"""
+Long lived worker running inside abaqus python, started by abaqus_interface.worker.AbaqusWorker with
+
+    abaqus python abaqus_worker.py port token odb_cache_size
+
+The worker connects to the client on localhost, sends the token and then runs the scripts in this directory on request
+until the client asks it to shut down or closes the connection. Odbs opened for reading are kept open between the
+requests in the cache in utilities.
+"""
+from __future__ import print_function, division
+
+import os
+import pickle
+import runpy
+import socket
+import struct
+import sys
+import traceback
+
+import utilities
+
+script_directory = os.path.dirname(os.path.abspath(__file__))
+message_header = struct.Struct('>Q')
+
+
+def _receive_bytes(connection, size):
+    chunks = []
+    while size > 0:
+        chunk = connection.recv(min(size, 1 << 20))
+        if not chunk:
+            raise EOFError('The connection to the client was closed')
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def send_message(connection, message):
+    payload = pickle.dumps(message, protocol=2)
+    connection.sendall(message_header.pack(len(payload)) + payload)
+
+
+def receive_message(connection):
+    size = message_header.unpack(_receive_bytes(connection, message_header.size))[0]
+    return pickle.loads(_receive_bytes(connection, size))
+
+
+def run_script(script_name, arguments):
+    script_path = os.path.join(script_directory, script_name)
+    argv = sys.argv
+    sys.argv = [script_path] + arguments
+    try:
+        runpy.run_path(script_path, run_name='__main__')
+    finally:
+        sys.argv = argv
+
+
+def main():
+    port = int(sys.argv[-3])
+    token = sys.argv[-2]
+    utilities.odb_cache = utilities.OdbCache(int(sys.argv[-1]))
+    connection = socket.create_connection(('127.0.0.1', port))
+    connection.sendall(token.encode('ascii'))
+    try:
+        while True:
+            try:
+                request = receive_message(connection)
+            except EOFError:
+                break
+            if request['command'] == 'shutdown':
+                break
+            try:
+                run_script(str(request['script']), [str(argument) for argument in request['arguments']])
+            except (Exception, SystemExit):
+                send_message(connection, {'status': 'error', 'message': traceback.format_exc()})
+            else:
+                send_message(connection, {'status': 'ok'})
+    finally:
+        utilities.odb_cache.close()
+        connection.close()
+
+
+if __name__ == '__main__':
+    main()
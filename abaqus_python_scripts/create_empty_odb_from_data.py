@@ -1,40 +1,44 @@
 from __future__ import print_function
 
 import os
-import pickle
 import sys
 
 from abaqusConstants import DEFORMABLE_BODY, THREE_D
 import odbAccess
 
-from odb_io_functions import add_element_set, add_node_set
-from utilities import OpenOdb
+from transport import load_data
 
 
-def main():
-    pickle_filename = sys.argv[-1]
-    with open(pickle_filename, 'rb') as pickle_file:
-        data_for_creating_odb = pickle.load(pickle_file)
-    odb_file_name = str(data_for_creating_odb['odb_file_name'])
-    instances = data_for_creating_odb['instance_data']
+def create_empty_odb_from_data(odb_file_name, instances):
+    """
+    Creates an odb with a part and an instance for each instance in instances and saves it once
+
+    :param odb_file_name:   Filename of the odb
+    :param instances:       A list of dicts with the keys instance_name, node_labels, node_coordinates, elements,
+                            node_sets and element_sets, see OdbInstance in abaqus_interface/abaqus_interface.py
+    :return:                Nothing
+    """
     odb = odbAccess.Odb(name=os.path.basename(odb_file_name), path=odb_file_name)
+    for instance_data in instances:
+        instance_name = str(instance_data['instance_name'])
+        part = odb.Part(name=instance_name, embeddedSpace=THREE_D,
+                        type=DEFORMABLE_BODY)  # Todo Implement 2D models
+        # The arrays are passed directly without creating a tuple for every node and element
+        part.addNodes(labels=instance_data['node_labels'], coordinates=instance_data['node_coordinates'])
+        for element_type, element_data in instance_data['elements'].items():
+            part.addElements(labels=element_data['labels'], connectivity=element_data['connectivity'],
+                             type=str(element_type))
+        instance = odb.rootAssembly.Instance(name=instance_name, object=part)
+
+        for node_set_name, node_labels in instance_data['node_sets'].items():
+            instance.NodeSetFromNodeLabels(name=str(node_set_name), nodeLabels=node_labels)
+
+        for element_set_name, element_labels in instance_data['element_sets'].items():
+            instance.ElementSetFromElementLabels(name=str(element_set_name), elementLabels=element_labels)
+    odb.save()
     odb.close()
-    for instance in instances:
-        with OpenOdb(odb_file_name, read_only=False) as odb:
-            instance_name = str(instance['instance_name'])
-            part = odb.Part(name=instance_name, embeddedSpace=THREE_D,
-                            type=DEFORMABLE_BODY)  # Todo Implement 2D models
-            part.addNodes(nodeData=instance['nodes'])
-            for element_type, element_data in instance['elements'].iteritems():
-                part.addElements(elementData=element_data, type=str(element_type))
-            odb.rootAssembly.Instance(name=instance_name, object=part)
-
-        for node_set_name, nodes in instance['node_sets'].iteritems():
-            add_node_set(odb_file_name, str(node_set_name), nodes, instance_name)
-
-        for element_set_name, elements in instance['element_sets'].iteritems():
-            add_element_set(odb_file_name, str(element_set_name), elements, instance_name)
 
 
 if __name__ == '__main__':
-    main()
+    data_for_creating_odb = load_data(sys.argv[-1])
+    create_empty_odb_from_data(str(data_for_creating_odb['odb_file_name']), data_for_creating_odb['instance_data'])
@@ -1,88 +1,185 @@
 from __future__ import print_function, division
 
 import odbAccess
-from abaqusConstants import DEFORMABLE_BODY, THREE_D
+from abaqusConstants import DEFORMABLE_BODY, NODAL, THREE_D
 import os
 import sys
 
+import numpy as np
+
+from transport import load_data
+from utilities import OpenOdb
+
 
 def _copy_node_and_elements(to_odb_base, from_odb_base):
     nodal_data = from_odb_base.nodes
     if len(nodal_data) > 0:
-        node_labels = []
-        nodal_coordinates = []
-        for n in nodal_data:
-            node_labels.append(n.label)
-            nodal_coordinates.append(n.coordinates)
+        node_labels = [None]*len(nodal_data)
+        nodal_coordinates = [None]*len(nodal_data)
+        for i, n in enumerate(nodal_data):
+            node_labels[i] = n.label
+            nodal_coordinates[i] = n.coordinates
         to_odb_base.addNodes(labels=node_labels, coordinates=nodal_coordinates)
 
-    element_data = from_odb_base.elements
     element_dict = {}
-
-    for e in element_data:
+    for e in from_odb_base.elements:
         element_type = e.type
         if element_type not in element_dict:
             element_dict[element_type] = {'labels': [], 'connectivity': []}
         element_dict[element_type]['labels'].append(e.label)
         element_dict[element_type]['connectivity'].append(e.connectivity)
 
-    for element_type, element_data in element_dict.iteritems():
+    for element_type, element_data in element_dict.items():
         to_odb_base.addElements(labels=element_data['labels'], connectivity=element_data['connectivity'],
                                 type=element_type)
 
 
-def _copy_sets(to_odb_base, from_odb_base):
+def _label_fields(odb):
+    # A nodal and an element field of the odb, the labels of the sets are taken from the bulk data of the fields
+    # instead of from the node and element objects of the sets which is much slower
+    node_field = None
+    element_field = None
+    for step_name in odb.steps.keys():
+        frames = odb.steps[step_name].frames
+        if len(frames) == 0:
+            continue
+        fields = frames[-1].fieldOutputs
+        for field_id in fields.keys():
+            positions = [location.position for location in fields[field_id].locations]
+            if node_field is None and NODAL in positions:
+                node_field = fields[field_id].getSubset(position=NODAL)
+            if element_field is None and any(position != NODAL for position in positions):
+                element_field = fields[field_id]
+    return node_field, element_field
+
+
+def _set_labels(field, region, position):
+    # The labels of a set from the bulk data of a field or None if the field has no values in the set
+    if field is None:
+        return None
+    label_arrays = [block.nodeLabels if position == NODAL else block.elementLabels
+                    for block in field.getSubset(region=region).bulkDataBlocks]
+    if not label_arrays:
+        return None
+    return tuple(np.unique(np.concatenate(label_arrays)).tolist())
+
+
+def _copy_sets(to_odb_base, from_odb_base, node_field=None, element_field=None):
+    # The sets are created from labels, using the node and element objects of the old odb is much slower. The fields
+    # are subsets of the instance from_odb_base and give the labels in bulk, the objects are only used for sets without
+    # values in the fields and for the sets of the parts where the fields are None
     for node_set_name in from_odb_base.nodeSets.keys():
         node_set = from_odb_base.nodeSets[node_set_name]
-        to_odb_base.NodeSet(name=node_set_name, nodes=node_set.nodes)
+        node_labels = _set_labels(node_field, node_set, NODAL)
+        if node_labels is None:
+            node_labels = [n.label for n in node_set.nodes]
+        to_odb_base.NodeSetFromNodeLabels(name=node_set_name, nodeLabels=node_labels)
 
     for element_set_name in from_odb_base.elementSets.keys():
         element_set = from_odb_base.elementSets[element_set_name]
-        to_odb_base.ElementSet(name=element_set_name, elements=element_set.elements)
-
-
-def create_empty_odb(new_odb_file_name, old_odb_file_name):
+        element_labels = _set_labels(element_field, element_set, None)
+        if element_labels is None:
+            element_labels = [e.label for e in element_set.elements]
+        to_odb_base.ElementSetFromElementLabels(name=element_set_name, elementLabels=element_labels)
+
+
+def _copy_field(new_frame, field, new_instances):
+    new_field = new_frame.FieldOutput(name=field.name, description=field.description, type=field.type,
+                                      componentLabels=field.componentLabels, validInvariants=field.validInvariants)
+    for block in field.bulkDataBlocks:
+        if block.instance is None:
+            # Values of assembly level nodes have no instance and are not copied
+            continue
+        data = block.data
+        if len(data.shape) == 1:
+            data = data[:, np.newaxis]
+        if block.position == NODAL:
+            labels = block.nodeLabels
+        else:
+            # The blocks have one row per integration point or element node, addData takes one label per element
+            # which is taken from the first row of each element
+            element_labels = block.elementLabels
+            first_rows = np.ones(len(element_labels), dtype=bool)
+            first_rows[1:] = element_labels[1:] != element_labels[:-1]
+            labels = element_labels[first_rows]
+        new_field.addData(position=block.position, instance=new_instances[block.instance.name], labels=labels,
+                          data=data)
+
+
+def _copy_results(new_odb, old_odb, step_names, frame_numbers=None, field_ids=None):
+    new_instances = new_odb.rootAssembly.instances
+    for step_name in step_names:
+        old_step = old_odb.steps[step_name]
+        new_step = new_odb.Step(name=step_name, description=old_step.description, domain=old_step.domain,
+                                timePeriod=old_step.timePeriod)
+        if frame_numbers is None:
+            frames = old_step.frames
+        else:
+            frames = [old_step.frames[frame_number] for frame_number in frame_numbers]
+        for old_frame in frames:
+            new_frame = new_step.Frame(incrementNumber=old_frame.incrementNumber, frameValue=old_frame.frameValue,
+                                       description=old_frame.description)
+            for field_id in old_frame.fieldOutputs.keys():
+                if field_ids is None or field_id in field_ids:
+                    _copy_field(new_frame, old_frame.fieldOutputs[field_id], new_instances)
+
+
+def create_empty_odb(new_odb_file_name, old_odb_file_name, step_names=None, frame_numbers=None, field_ids=None):
     """
     :param new_odb_file_name:   Filename including path for the new odb
     :param old_odb_file_name:   Filename including path for the odb file containing the geometry
+    :param step_names:          Names of the steps with results to copy to the new odb. Default is None which copies
+                                no results
+    :param frame_numbers:       Numbers of the frames to copy in each of the steps. Default is None which copies all
+                                frames
+    :param field_ids:           The fields to copy. Default is None which copies all fields
     :return:                    Nothing
     """
 
     new_odb = odbAccess.Odb(name=os.path.basename(new_odb_file_name), path=new_odb_file_name)
-    old_odb = odbAccess.openOdb(old_odb_file_name, readOnly=True)
+    with OpenOdb(old_odb_file_name, read_only=True) as old_odb:
+        _copy_odb(new_odb, old_odb)
+        if step_names:
+            _copy_results(new_odb, old_odb, step_names, frame_numbers, field_ids)
+    new_odb.update()
+    new_odb.save()
+    new_odb.close()
+
+
+def _copy_odb(new_odb, old_odb):
     # Copying the part and copying the nodes in that part
     for part_name in old_odb.parts.keys():
         old_part = old_odb.parts[part_name]
         new_part = new_odb.Part(name=part_name, embeddedSpace=THREE_D, type=old_part.type)
         _copy_node_and_elements(new_part, old_part)
         _copy_sets(new_part, old_part)
-        new_odb.update()
-        new_odb.save()
 
     # Copying the instances and copying the nodes
+    node_field, element_field = _label_fields(old_odb)
     for instance_name in old_odb.rootAssembly.instances.keys():
         old_instance = old_odb.rootAssembly.instances[instance_name]
-        try:
-            new_part = new_odb.parts[instance_name]
-        except KeyError:
+        if instance_name not in new_odb.parts.keys():
             try:
                 new_part = new_odb.Part(name=instance_name, embeddedSpace=THREE_D,
                                         type=old_odb.parts[instance_name].type)
             except KeyError:
                 new_part = new_odb.Part(name=instance_name, embeddedSpace=THREE_D, type=DEFORMABLE_BODY)
 
-        # Copying the instance nodes to the part with the same name
-        _copy_node_and_elements(new_part, old_instance)
+            # Copying the instance nodes to the part with the same name
+            _copy_node_and_elements(new_part, old_instance)
 
         new_instance = new_odb.rootAssembly.Instance(name=instance_name, object=new_odb.parts[instance_name])
-        _copy_sets(new_instance, old_instance)
-        new_odb.update()
-        new_odb.save()
-    new_odb.close()
-    old_odb.close()
+        # The label fields are restricted to the instance once so that each set only searches the instance
+        _copy_sets(new_instance, old_instance,
+                   None if node_field is None else node_field.getSubset(region=old_instance),
+                   None if element_field is None else element_field.getSubset(region=old_instance))
 
 
 if __name__ == '__main__':
-    old_file = sys.argv[-1]
-    new_file = sys.argv[-2]
-    create_empty_odb(new_file, old_file)
+    parameters = load_data(sys.argv[-1])
+    field_id_list = parameters['field_ids']
+    if field_id_list is not None:
+        field_id_list = [str(field_id) for field_id in field_id_list]
+    create_empty_odb(str(parameters['new_odb_file_name']), str(parameters['old_odb_file_name']),
+                     step_names=[str(step_name) for step_name in parameters['step_names'] or []],
+                     frame_numbers=parameters['frame_numbers'], field_ids=field_id_list)
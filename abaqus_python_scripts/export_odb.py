@@ -0,0 +1,283 @@
+"""
+Export of fields in many frames of an odb to a store on disk that is read without abaqus by
+abaqus_interface/odb_store.py. The store is a directory with a manifest, manifest.json, and one directory per field
+with the data of each frame split in chunks of rows. The labels are stored once per field as long as they do not
+change between the frames. The manifest is written last so that a store is only seen when it is complete. The paths in
+the manifest are relative to the store and use / as separator
+"""
+from __future__ import print_function, division
+
+import json
+import os
+import pickle
+import shutil
+import sys
+
+import numpy as np
+
+from abaqus_constants import output_positions
+from odb_io_functions import get_field_data, get_field_region, get_frame_numbers
+from utilities import OpenOdb
+
+manifest_version = 1
+
+
+def _replace_file(source, destination):
+    try:
+        os.replace(source, destination)
+    except AttributeError:
+        # Python 2 has no os.replace and os.rename does not overwrite files on windows
+        if os.path.exists(destination):
+            os.remove(destination)
+        os.rename(source, destination)
+
+
+def write_manifest(store_directory, manifest):
+    file_name = os.path.join(store_directory, 'manifest.json')
+    with open(file_name + '.tmp', 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=1)
+    _replace_file(file_name + '.tmp', file_name)
+
+
+def _swap_directory(directory, store_directory):
+    # The old store is only removed when the new store is complete
+    old_directory = None
+    if os.path.exists(store_directory):
+        old_directory = store_directory.rstrip(os.sep) + '.old-' + str(os.getpid())
+        os.rename(store_directory, old_directory)
+    os.rename(directory, store_directory)
+    if old_directory is not None:
+        shutil.rmtree(old_directory, ignore_errors=True)
+
+
+def _field_position(field, positions, field_id, requested):
+    if positions and field_id in positions:
+        return str(positions[field_id])
+    field_positions = [str(location.position) for location in field.locations]
+    for position in ['INTEGRATION_POINT', 'NODAL', 'ELEMENT_NODAL']:
+        if position in field_positions:
+            return position
+    if not requested:
+        # For instance EVOL which only has output at WHOLE_ELEMENT
+        return None
+    raise ValueError('The field ' + field_id + ' has no output at the supported positions '
+                     + ', '.join(output_positions))
+
+
+def _export_region(odb, set_name, instance_name, position, field_id, requested):
+    try:
+        return get_field_region(odb, set_name, instance_name, output_positions[position])
+    except KeyError:
+        # The set only exists as a node set or as an element set
+        if not requested:
+            return None
+        raise ValueError('The set ' + str(set_name) + ' has no ' + ('nodes' if position == 'NODAL' else 'elements')
+                         + ' for the ' + position + ' output of the field ' + field_id)
+
+
+def _frames_to_export(odb, step_names, frames, job_running=False):
+    if step_names is None:
+        step_names = odb.steps.keys()
+    last_step_name = str(odb.steps.keys()[-1])
+    frames_to_export = []
+    for step_name in step_names:
+        number_of_frames = len(odb.steps[step_name].frames)
+        frame_numbers = sorted(set(get_frame_numbers(frames, number_of_frames, step_name)))
+        if job_running and str(step_name) == last_step_name:
+            # The newest frame of a running job can still be written by the solver and is exported when the next frame
+            # is added or the job has finished
+            frame_numbers = [frame_number for frame_number in frame_numbers if frame_number < number_of_frames - 1]
+        frames_to_export.extend((str(step_name), frame_number) for frame_number in frame_numbers)
+    return frames_to_export
+
+
+class _FieldWriter(object):
+    def __init__(self, store_directory, field_entry, chunk_size, compress, dtype):
+        self.store_directory = store_directory
+        self.entry = field_entry
+        self.chunk_size = chunk_size
+        self.compress = compress
+        self.dtype = dtype
+        self.labels = None
+        if self.entry['label_files']:
+            self.labels = np.load(os.path.join(store_directory, self.entry['label_files'][-1]))
+        directory = os.path.join(store_directory, self.entry['directory'])
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def write_frame(self, step_name, frame_number, frame, field):
+        data, node_labels, element_labels = get_field_data(field, output_positions[self.entry['position']])
+        labels = node_labels if self.entry['position'] in ['NODAL', 'ELEMENT_NODAL'] else element_labels
+        if self.labels is None or not np.array_equal(labels, self.labels):
+            label_file = self.entry['directory'] + '/labels_' + str(len(self.entry['label_files'])) + '.npy'
+            np.save(os.path.join(self.store_directory, label_file), labels.astype(np.int32))
+            self.entry['label_files'].append(label_file)
+            self.labels = labels
+        if self.dtype is not None:
+            data = data.astype(self.dtype)
+        frame_directory = self.entry['directory'] + '/frame_' + str(len(self.entry['frames']))
+        if os.path.isdir(os.path.join(self.store_directory, frame_directory)):
+            # Left by an export that was stopped before the manifest was written
+            shutil.rmtree(os.path.join(self.store_directory, frame_directory))
+        os.makedirs(os.path.join(self.store_directory, frame_directory))
+        chunk_files = []
+        for i, start in enumerate(range(0, data.shape[0], self.chunk_size)):
+            chunk_file = frame_directory + '/chunk_' + str(i) + ('.npz' if self.compress else '.npy')
+            chunk = np.ascontiguousarray(data[start:start + self.chunk_size])
+            if self.compress:
+                np.savez_compressed(os.path.join(self.store_directory, chunk_file), data=chunk)
+            else:
+                np.save(os.path.join(self.store_directory, chunk_file), chunk)
+            chunk_files.append(chunk_file)
+        self.entry['frames'].append({'step_name': step_name, 'frame_number': frame_number,
+                                     'frame_value': float(frame.frameValue), 'rows': int(data.shape[0]),
+                                     'labels': len(self.entry['label_files']) - 1, 'chunks': chunk_files})
+
+
+def read_manifest(store_directory):
+    """
+    :return:    The manifest of a store or None if the directory has no store
+    """
+    file_name = os.path.join(store_directory, 'manifest.json')
+    if not os.path.exists(file_name):
+        return None
+    with open(file_name) as manifest_file:
+        return json.load(manifest_file)
+
+
+def _new_manifest(odb_file_name, set_name, instance_name, chunk_size, compress, dtype):
+    return {'version': manifest_version, 'odb_file_name': os.path.abspath(odb_file_name), 'set_name': set_name or '',
+            'instance_name': instance_name or '', 'chunk_size': chunk_size, 'compress': compress,
+            'dtype': None if dtype is None else str(dtype), 'fields': {}, 'exported_frames': []}
+
+
+def export_odb(odb_file_name, store_directory, field_ids=None, step_names=None, frames=None, set_name=None,
+               instance_name=None, positions=None, chunk_size=100000, compress=True, dtype=None, incremental=False):
+    """
+    Exports fields in frames of an odb to a store in a single pass over the frames. The exported frames are recorded in
+    the manifest and an incremental export only reads the frames that are not in the store, for instance the frames
+    added by a running job since the last export
+
+    :param odb_file_name:       Filename of the odb-file with the .odb extension
+    :param store_directory:     The directory of the store, created if it does not exist. An existing store is replaced
+                                when the new store is complete
+    :param field_ids:           The fields to export. Default is None which exports all fields of the frames that have
+                                output at a supported position for the set, the other fields are skipped
+    :param step_names:          The steps to export. Default is None which exports all steps
+    :param frames:              The frames to export in each step, a list with frame numbers or a tuple
+                                (start, stop, step) as for read_field_history_from_odb. Default is None which exports
+                                all frames
+    :param set_name:            Name of the set to export. Default is None which exports the whole instance
+    :param instance_name:       Name of the instance, see read_field_from_odb
+    :param positions:           A dict with field ids as keys and output positions as strings as values for the fields
+                                that should not be exported at their default position. The default position is
+                                INTEGRATION_POINT if the field has output there, otherwise NODAL
+    :param chunk_size:          Number of rows in each chunk
+    :param compress:            Flag if the chunks should be compressed, written as .npz files, or written as .npy
+                                files that can be memory mapped
+    :param dtype:               If given, the floating point type of the exported data, for example 'float32'
+    :param incremental:         If True, the frames in an existing store are kept and only the other frames are
+                                exported. The store must be exported from the same odb with the same set, instance,
+                                chunk size, compression and dtype. Default is False
+    :return:                    The manifest
+
+    While the job writing the odb is running, when the lock file of the job exists, the newest frame of the last step is
+    not exported. Frames without output of all fields in field_ids are not exported and are not recorded as exported
+    so that they are exported by a later incremental export when the output has been written
+    """
+    manifest = _new_manifest(odb_file_name, set_name, instance_name, chunk_size, compress, dtype)
+    old_manifest = read_manifest(store_directory) if incremental and os.path.isdir(store_directory) else None
+    if old_manifest is not None:
+        settings = ['odb_file_name', 'set_name', 'instance_name', 'chunk_size', 'compress', 'dtype']
+        if [old_manifest.get(key, None) for key in settings] != [manifest[key] for key in settings]:
+            raise ValueError('The store in ' + store_directory + ' is exported with other settings and cannot be '
+                             'updated incrementally')
+        manifest = old_manifest
+        if 'exported_frames' not in manifest:
+            manifest['exported_frames'] = sorted(set((frame['step_name'], frame['frame_number'])
+                                                     for field in manifest['fields'].values()
+                                                     for frame in field['frames']))
+        _export_frames(odb_file_name, store_directory, manifest, field_ids, step_names, frames, set_name,
+                       instance_name, positions, chunk_size, compress, dtype)
+        write_manifest(store_directory, manifest)
+        return manifest
+
+    # A new store is written to a staging directory so that an existing store is kept if the export fails
+    staging_directory = store_directory.rstrip(os.sep) + '.staging-' + str(os.getpid())
+    if os.path.exists(staging_directory):
+        shutil.rmtree(staging_directory)
+    os.makedirs(staging_directory)
+    try:
+        _export_frames(odb_file_name, staging_directory, manifest, field_ids, step_names, frames, set_name,
+                       instance_name, positions, chunk_size, compress, dtype)
+        write_manifest(staging_directory, manifest)
+    except Exception:
+        shutil.rmtree(staging_directory, ignore_errors=True)
+        raise
+    _swap_directory(staging_directory, store_directory)
+    return manifest
+
+
+def _export_frames(odb_file_name, store_directory, manifest, field_ids, step_names, frames, set_name, instance_name,
+                   positions, chunk_size, compress, dtype):
+    exported_frames = set((str(step_name), frame_number) for step_name, frame_number in manifest['exported_frames'])
+    job_running = os.path.exists(os.path.splitext(odb_file_name)[0] + '.lck')
+    requested = field_ids is not None
+    with OpenOdb(odb_file_name, read_only=True) as odb:
+        regions = {}
+        writers = {}
+        skipped_field_ids = set()
+        for step_name, frame_number in _frames_to_export(odb, step_names, frames, job_running):
+            if (step_name, frame_number) in exported_frames:
+                continue
+            frame = odb.steps[step_name].frames[frame_number]
+            frame_field_ids = [str(field_id) for field_id in frame.fieldOutputs.keys()]
+            if field_ids is not None:
+                if any(field_id not in frame_field_ids for field_id in field_ids):
+                    continue
+                frame_field_ids = list(field_ids)
+            for field_id in frame_field_ids:
+                if field_id in skipped_field_ids:
+                    continue
+                field = frame.fieldOutputs[field_id]
+                if field_id not in manifest['fields']:
+                    position = _field_position(field, positions, field_id, requested)
+                    if position is not None and position not in regions:
+                        regions[position] = _export_region(odb, set_name, instance_name, position, field_id,
+                                                           requested)
+                    if position is None or regions[position] is None:
+                        skipped_field_ids.add(field_id)
+                        continue
+                    manifest['fields'][field_id] = {'directory': 'field_' + str(len(manifest['fields'])),
+                                                    'position': position,
+                                                    'components': [str(label) for label in field.componentLabels],
+                                                    'label_files': [], 'frames': []}
+                if field_id not in writers:
+                    writers[field_id] = _FieldWriter(store_directory, manifest['fields'][field_id], chunk_size,
+                                                     compress, dtype)
+                position = manifest['fields'][field_id]['position']
+                if position not in regions:
+                    regions[position] = _export_region(odb, set_name, instance_name, position, field_id, True)
+                field = field.getSubset(position=output_positions[position]).getSubset(region=regions[position])
+                writers[field_id].write_frame(step_name, frame_number, frame, field)
+            manifest['exported_frames'].append([step_name, frame_number])
+
+
+if __name__ == '__main__':
+    parameter_pickle_name = sys.argv[-1]
+    with open(parameter_pickle_name, 'rb') as parameter_pickle:
+        parameters = pickle.load(parameter_pickle)
+    export_frames = parameters['frames']
+    if isinstance(export_frames, list):
+        export_frames = [int(frame_number) for frame_number in export_frames]
+    export_field_ids = parameters['field_ids']
+    if export_field_ids is not None:
+        export_field_ids = [str(field_id) for field_id in export_field_ids]
+    export_step_names = parameters['step_names']
+    if export_step_names is not None:
+        export_step_names = [str(step_name) for step_name in export_step_names]
+    export_odb(str(parameters['odb_file_name']), str(parameters['store_directory']),
+               field_ids=export_field_ids, step_names=export_step_names, frames=export_frames,
+               set_name=str(parameters['set_name']), instance_name=str(parameters['instance_name']),
+               positions=parameters['positions'], chunk_size=parameters['chunk_size'],
+               compress=parameters['compress'], dtype=parameters['dtype'], incremental=parameters['incremental'])
@@ -1,13 +1,18 @@
 from __future__ import print_function, division
 
-import pickle
 import sys
 
+from transport import save_data
 from utilities import OpenOdb
 
 odb_filename = sys.argv[-3]
 step_name = sys.argv[-2]
 results_pickle_file = sys.argv[-1]
 with OpenOdb(odb_filename, read_only=True) as odb:
-    with open(results_pickle_file, 'wb') as results_pickle:
-        pickle.dump(range(len(odb.steps[step_name].frames)), results_pickle)
+    step_names = list(odb.steps.keys())
+    if not step_name:
+        step_name = step_names[-1]
+    frames = None
+    if step_name in step_names:
+        frames = list(range(len(odb.steps[step_name].frames)))
+    save_data(results_pickle_file, {'step_names': step_names, 'frames': frames})
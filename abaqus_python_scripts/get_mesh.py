@@ -0,0 +1,68 @@
+from __future__ import print_function, division
+
+import sys
+
+import numpy as np
+
+from transport import save_data
+from utilities import OpenOdb
+
+
+def get_mesh(odb, instance_name='', include_sets=False):
+    """
+    Reads the nodes and elements of an instance
+
+    :param odb:             The opened odb
+    :param instance_name:   Name of the instance. Default is '' which only works if the odb has a single instance
+    :param include_sets:    Flag if the node sets and element sets of the instance should be read. Default is False
+    :return:                A dict with the keys instance_name, node_labels, node_coordinates and elements where
+                            elements is a dict with element types as keys and dicts with the keys labels and
+                            connectivity as values, see OdbInstance in abaqus_interface/abaqus_interface.py. With
+                            include_sets, the dict also has node_sets and element_sets with the set names as keys and
+                            arrays with the labels as values
+    """
+    instances = odb.rootAssembly.instances
+    if not instance_name:
+        if len(instances) != 1:
+            raise ValueError('odb has multiple instances, please specify an instance')
+        instance_name = instances.keys()[0]
+    instance = instances[instance_name]
+
+    nodes = instance.nodes
+    node_labels = np.empty(len(nodes), dtype=np.int32)
+    # Nodes of two dimensional models have two coordinates, z is zero
+    node_coordinates = np.zeros((len(nodes), 3))
+    for i, node in enumerate(nodes):
+        node_labels[i] = node.label
+        node_coordinates[i, :len(node.coordinates)] = node.coordinates
+
+    element_lists = {}
+    for element in instance.elements:
+        if element.type not in element_lists:
+            element_lists[element.type] = ([], [])
+        element_lists[element.type][0].append(element.label)
+        element_lists[element.type][1].append(element.connectivity)
+    elements = {}
+    for element_type, (labels, connectivity) in element_lists.items():
+        elements[str(element_type)] = {'labels': np.array(labels, dtype=np.int32),
+                                       'connectivity': np.array(connectivity, dtype=np.int32)}
+    mesh = {'instance_name': str(instance_name), 'node_labels': node_labels, 'node_coordinates': node_coordinates,
+            'elements': elements}
+    if include_sets:
+        mesh['node_sets'] = {}
+        for set_name, node_set in instance.nodeSets.items():
+            mesh['node_sets'][str(set_name)] = np.array([node.label for node in node_set.nodes], dtype=np.int32)
+        mesh['element_sets'] = {}
+        for set_name, element_set in instance.elementSets.items():
+            mesh['element_sets'][str(set_name)] = np.array([element.label for element in element_set.elements],
+                                                           dtype=np.int32)
+    return mesh
+
+
+if __name__ == '__main__':
+    odb_filename = sys.argv[-4]
+    mesh_instance_name = sys.argv[-3]
+    read_sets = bool(int(sys.argv[-2]))
+    results_pickle_file = sys.argv[-1]
+    with OpenOdb(odb_filename, read_only=True) as odb_to_read:
+        save_data(results_pickle_file, get_mesh(odb_to_read, mesh_instance_name, read_sets))
@@ -0,0 +1,71 @@
+from __future__ import print_function, division
+
+import sys
+
+from transport import save_data
+from utilities import OpenOdb
+
+
+def _field_catalog(field):
+    return {'type': str(field.type),
+            'description': str(field.description),
+            'positions': [str(location.position) for location in field.locations],
+            'components': [str(label) for label in field.componentLabels]}
+
+
+def _set_sizes(sets, members):
+    sizes = {}
+    for set_name in sets.keys():
+        set_members = getattr(sets[set_name], members)
+        if len(set_members) > 0 and not hasattr(set_members[0], 'label'):
+            # Assembly sets have one sequence per instance
+            sizes[str(set_name)] = sum(len(instance_members) for instance_members in set_members)
+        else:
+            sizes[str(set_name)] = len(set_members)
+    return sizes
+
+
+def get_odb_catalog(odb):
+    """
+    Walks through an odb and collects the steps, frames, fields, instances and sets
+
+    :param odb: The opened odb
+    :return:    A dict with the keys steps, instances, node_sets and element_sets where node_sets and element_sets are
+                the assembly sets, see abaqus_interface/odb_catalog.py for the layout
+    """
+    steps = []
+    for step_name in odb.steps.keys():
+        step = odb.steps[step_name]
+        frames = []
+        fields = {}
+        for frame_number, frame in enumerate(step.frames):
+            field_ids = [str(field_id) for field_id in frame.fieldOutputs.keys()]
+            frames.append({'frame_number': frame_number,
+                           'frame_value': frame.frameValue,
+                           'increment_number': frame.incrementNumber,
+                           'description': str(frame.description),
+                           'field_ids': field_ids})
+            for field_id in field_ids:
+                if field_id not in fields:
+                    fields[field_id] = _field_catalog(frame.fieldOutputs[field_id])
+        steps.append({'name': str(step_name), 'description': str(step.description), 'frames': frames,
+                      'fields': fields})
+
+    instances = []
+    for instance_name in odb.rootAssembly.instances.keys():
+        instance = odb.rootAssembly.instances[instance_name]
+        instances.append({'name': str(instance_name),
+                          'number_of_nodes': len(instance.nodes),
+                          'number_of_elements': len(instance.elements),
+                          'node_sets': _set_sizes(instance.nodeSets, 'nodes'),
+                          'element_sets': _set_sizes(instance.elementSets, 'elements')})
+    return {'steps': steps, 'instances': instances,
+            'node_sets': _set_sizes(odb.rootAssembly.nodeSets, 'nodes'),
+            'element_sets': _set_sizes(odb.rootAssembly.elementSets, 'elements')}
+
+
+if __name__ == '__main__':
+    odb_filename = sys.argv[-2]
+    results_pickle_file = sys.argv[-1]
+    with OpenOdb(odb_filename, read_only=True) as odb_to_read:
+        save_data(results_pickle_file, get_odb_catalog(odb_to_read))
@@ -1,6 +1,8 @@
 from __future__ import print_function, division
 
 from collections import namedtuple
+import os
+import time
 
 import numpy as np
 
@@ -8,18 +10,25 @@ from abaqusConstants import INTEGRATION_POINT, ELEMENT_NODAL, NODAL, CYLINDRICAL
 from abaqusConstants import SCALAR, TENSOR_3D_FULL, VECTOR
 
 from abaqus_constants import abaqus_constants
+from reductions import reduce_values, scalar_values
+from timing import phase
+from transport import save_data
 from utilities import OpenOdb
 
 CoordinateSystem = namedtuple('CoordinateSystem', ['name', 'origin', 'point1', 'point2', 'system_type'])
 cylindrical_system_z = CoordinateSystem(name='cylindrical', origin=(0., 0., 0.), point1=(1., 0., 0.),
                                         point2=(0., 1., 0.), system_type=CYLINDRICAL)
 
+# np.isin is not available in the numpy of older abaqus versions and np.in1d is removed in numpy 2
+_isin = getattr(np, 'isin', None) or np.in1d
+
 
 def read_field_from_odb(field_id, odb_file_name, step_name=None, frame_number=-1, set_name=None, instance_name=None,
                         coordinate_system=None, rotating_system=False, position=INTEGRATION_POINT,
-                        get_position_numbers=False, get_frame_value=False):
+                        get_position_numbers=False, get_frame_value=False, labels=None):
     """
-    Function for reading a field from an odb-file
+    Function for reading a field from an odb-file. The odb is opened read only and is not changed by the reading, so
+    several processes can read the same odb at the same time
     :param field_id:                The ID of the field. example 'S'  for stresses
     :param odb_file_name:           Filename of the odb-file with the .odb extension
     :param step_name:               Name of the step to read from, default is None which takes the last step in
@@ -37,6 +46,9 @@ def read_field_from_odb(field_id, odb_file_name, step_name=None, frame_number=-1
     :param get_position_numbers:    A flag if nodal and element numbers should be returned together with the data.
                                     Default is False
     :param get_frame_value:         Flag if the frame value should be provided with the data. Default is False
+    :param labels:                  Node labels for NODAL and ELEMENT_NODAL and element labels for the other positions
+                                    of the values to read from the set. The values are given in the same order as
+                                    without labels. Default is None which reads all values of the set
 
     :return:                        The function returns a numpy matrix with the field data.
                                     Depending on the flags it could also return double with the frame value as well
@@ -51,86 +63,434 @@ def read_field_from_odb(field_id, odb_file_name, step_name=None, frame_number=-1
                                     else:
                                         return data, frame_value, node_labels, element_labels
     """
-    if coordinate_system is not None:
-        coordinate_system = CoordinateSystem(str(coordinate_system['name']), coordinate_system['origin'],
-                                             coordinate_system['point1'], coordinate_system['point2'],
-                                             abaqus_constants[coordinate_system['system_type']])
-    with OpenOdb(odb_file_name, read_only=False) as odb:
-        if not instance_name:
-            if len(odb.rootAssembly.instances) == 1:
-                base = odb.rootAssembly.instances[odb.rootAssembly.instances.keys()[0]]
-            else:
-                raise ValueError('odb has multiple instances, please specify an instance')
-        else:
-            base = odb.rootAssembly.instances[instance_name]
-        if position in [INTEGRATION_POINT, CENTROID, ELEMENT_NODAL, ELEMENT_FACE]:
-            set_dict = base.elementSets
-            set_func = base.ElementSet
-            all_name = 'ALL_ELEMENTS'
-            object_list = base.elements
+    with OpenOdb(odb_file_name, read_only=True) as odb:
+        data, frame_value, node_labels, element_labels = read_field_from_open_odb(odb, field_id, step_name,
+                                                                                  frame_number, set_name,
+                                                                                  instance_name, coordinate_system,
+                                                                                  rotating_system, position, labels)
+
+    if not get_position_numbers and not get_frame_value:
+        return data
+    elif not get_position_numbers:
+        return data, frame_value
+    elif not get_frame_value:
+        return data, node_labels, element_labels
+    else:
+        return data, frame_value, node_labels, element_labels
+
+
+def read_fields_from_odb(odb_file_name, read_requests):
+    """
+    Function for reading several fields, frames and sets from an odb-file which is only opened once
+
+    :param odb_file_name:   Filename of the odb-file with the .odb extension
+    :param read_requests:   A list of dicts with the keys field_id, step_name, frame_number, set_name, instance_name,
+                            position, coordinate_system and labels with the same meaning as the arguments to
+                            read_field_from_odb. All keys except field_id are optional
+    :return:                A list with a dict for each request with the keys data, frame_value, node_labels and
+                            element_labels
+    """
+    results = []
+    with OpenOdb(odb_file_name, read_only=True) as odb:
+        for request in read_requests:
+            data, frame_value, node_labels, element_labels = read_field_from_open_odb(
+                odb, request['field_id'], request.get('step_name', None), request.get('frame_number', -1),
+                request.get('set_name', ''), request.get('instance_name', None),
+                request.get('coordinate_system', None), request.get('rotating_system', False),
+                request.get('position', INTEGRATION_POINT), request.get('labels', None))
+            results.append({'data': data, 'frame_value': frame_value, 'node_labels': node_labels,
+                            'element_labels': element_labels})
+    return results
+
+
+def reduce_fields_from_odb(odb_file_name, reduction_requests):
+    """
+    Function for computing reductions, like the maximum or percentiles, of several fields, frames and sets in an
+    odb-file which is only opened once. Only the results of the reductions are returned instead of the fields
+
+    :param odb_file_name:       Filename of the odb-file with the .odb extension
+    :param reduction_requests:  A list of dicts with the keys field_id, reductions, invariant, component, step_name,
+                                frame_number, set_name, instance_name, position, weight_field_id, percentiles, bins
+                                and top_k. The reductions are computed on the invariant or the component of the
+                                field, see reductions.scalar_values, and weighted_mean is weighted by the field
+                                weight_field_id, typically IVOL, at the same position. See read_field_from_odb and
+                                reductions.reduce_values for the other keys. All keys except field_id and reductions
+                                are optional
+    :return:                    A list with the dict returned by reduce_values for each request
+    """
+    results = []
+    regions = {}
+    with OpenOdb(odb_file_name, read_only=True) as odb:
+        for request in reduction_requests:
+            position = request.get('position', INTEGRATION_POINT)
+            region_key = (request.get('instance_name', ''), request.get('set_name', ''), position)
+            if region_key not in regions:
+                regions[region_key] = get_field_region(odb, region_key[1], region_key[0], position)
+            step_name = request.get('step_name', None)
+            if not step_name:
+                step_name = odb.steps.keys()[-1]
+            frame = odb.steps[step_name].frames[request.get('frame_number', -1)]
+            field = get_frame_field(frame, request['field_id'], regions[region_key], position)
+            data, node_labels, element_labels = get_field_data(field, position)
+            values = scalar_values(data, field.componentLabels, request.get('invariant', None),
+                                   request.get('component', None), request['field_id'])
+            del data
+            weights = None
+            if 'weighted_mean' in request['reductions']:
+                weight_field = get_frame_field(frame, request.get('weight_field_id', 'IVOL'), regions[region_key],
+                                               position)
+                weights, _, _ = get_field_data(weight_field, position, get_labels=False)
+                if weights.shape != values.shape:
+                    raise ValueError('The weights and the values of ' + request['field_id'] + ' do not match')
+            labels = node_labels if position in [NODAL, ELEMENT_NODAL] else element_labels
+            results.append(reduce_values(values, labels, request['reductions'], weights,
+                                         request.get('percentiles', (50., )), request.get('bins', 10),
+                                         request.get('top_k', 10)))
+    return results
+
+
+def read_field_from_open_odb(odb, field_id, step_name=None, frame_number=-1, set_name=None, instance_name=None,
+                             coordinate_system=None, rotating_system=False, position=INTEGRATION_POINT, labels=None):
+    """
+    Reads a field from an open odb, which can be opened read only, see read_field_from_odb for the arguments
+
+    :return:    data, frame_value, node_labels, element_labels
+    """
+    region = get_field_region(odb, set_name, instance_name, position)
+    transform_system = get_transform_system(odb, coordinate_system)
+
+    if not step_name:
+        step_name = odb.steps.keys()[-1]
+
+    if frame_number == -1:
+        frame_number = len(odb.steps[step_name].frames) - 1
+    frame = odb.steps[step_name].frames[frame_number]
+    field = get_frame_field(frame, field_id, region, position, transform_system, rotating_system)
+    data, node_labels, element_labels = get_field_data(field, position, labels=labels)
+    return data, frame.frameValue, node_labels, element_labels
+
+
+def get_field_region(odb, set_name, instance_name, position):
+    """
+    Finds the region to read a field from, see read_field_from_odb for the arguments. No set is created so the odb can
+    be opened read only
+
+    :return:    The element set or node set, or the instance if no set name is given
+    """
+    if not instance_name:
+        if len(odb.rootAssembly.instances) == 1:
+            base = odb.rootAssembly.instances[odb.rootAssembly.instances.keys()[0]]
         else:
-            set_dict = base.nodeSets
-            set_func = base.NodeSet
-            all_name = 'ALL_NODES'
-            object_list = base.nodes
-
-        if set_name == '':
-            if all_name not in set_dict:
-                objects = object_list
-                set_func(name=all_name, elements=objects)
-            element_set = set_dict[all_name]
+            raise ValueError('odb has multiple instances, please specify an instance')
+    else:
+        base = odb.rootAssembly.instances[instance_name]
+    if not set_name:
+        return base
+    if position in [INTEGRATION_POINT, CENTROID, ELEMENT_NODAL, ELEMENT_FACE]:
+        return base.elementSets[set_name]
+    return base.nodeSets[set_name]
+
+
+def get_transform_system(odb, coordinate_system):
+    """
+    Finds the datum coordinate system for a coordinate system given as a dict. The datum is created if it does not
+    exist, on an odb opened read only it only exists in memory and is not saved to the odb
+
+    :return:    The datum coordinate system or None if coordinate_system is None
+    """
+    if coordinate_system is None:
+        return None
+    coordinate_system = CoordinateSystem(str(coordinate_system['name']), coordinate_system['origin'],
+                                         coordinate_system['point1'], coordinate_system['point2'],
+                                         abaqus_constants[coordinate_system['system_type']])
+    if coordinate_system.name not in odb.rootAssembly.datumCsyses:
+        return odb.rootAssembly.DatumCsysByThreePoints(name=coordinate_system.name,
+                                                       coordSysType=coordinate_system.system_type,
+                                                       origin=coordinate_system.origin,
+                                                       point1=coordinate_system.point1,
+                                                       point2=coordinate_system.point2)
+    return odb.rootAssembly.datumCsyses[coordinate_system.name]
+
+
+def get_frame_field(frame, field_id, region, position, transform_system=None, rotating_system=False):
+    """
+    Gives the subset of a field in a frame at a position and region, transformed to transform_system if given
+    """
+    field = frame.fieldOutputs[field_id].getSubset(position=position)
+    field = field.getSubset(region=region)
+    if transform_system is not None:
+        if rotating_system:
+            field = field.getTransformedField(transform_system, deformationField=frame.fieldOutputs['U'])
         else:
-            element_set = set_dict[set_name]
+            field = field.getTransformedField(transform_system)
+    return field
+
 
+def read_field_history_from_odb(odb_file_name, field_id, history_file_name, step_names=None, frames=None,
+                                set_name=None, instance_name=None, coordinate_system=None, rotating_system=False,
+                                position=INTEGRATION_POINT, dtype=None, labels=None):
+    """
+    Reads a field in many frames of one or more steps with the odb opened once. The set and the coordinate system
+    are resolved once and the data of each frame is written directly to a memory mapped .npy file so that only one
+    frame at a time is held in memory
+
+    :param odb_file_name:       Filename of the odb-file with the .odb extension
+    :param field_id:            The ID of the field. example 'S'  for stresses
+    :param history_file_name:   Filename of the .npy file that the data is written to as an array with the shape
+                                (frames, points, components)
+    :param step_names:          List with the names of the steps to read from. Default is None which gives the last
+                                step
+    :param frames:              The frames to read in each step, either a list with frame numbers where negative
+                                numbers count from the end of the step or a tuple (start, stop, step) as for a slice.
+                                Default is None which reads all frames
+    :param dtype:               The floating point type of the written data. Default is None which gives float64
+    :return:                    A dict with the keys step_names, frame_numbers and frame_values with a value for each
+                                read frame and node_labels and element_labels as for read_field_from_odb
+
+    See read_field_from_odb for the other arguments
+    """
+    with OpenOdb(odb_file_name, read_only=True) as odb:
+        region = get_field_region(odb, set_name, instance_name, position)
+        transform_system = get_transform_system(odb, coordinate_system)
+        if step_names is None:
+            step_names = [odb.steps.keys()[-1]]
+        frames_to_read = []
+        for step_name in step_names:
+            frame_numbers = get_frame_numbers(frames, len(odb.steps[step_name].frames), step_name)
+            frames_to_read.extend((step_name, frame_number) for frame_number in frame_numbers)
+        if len(frames_to_read) == 0:
+            raise ValueError('No frames to read for the steps ' + ', '.join(step_names))
+
+        history = None
+        frame_values = np.zeros(len(frames_to_read))
+        for i, (step_name, frame_number) in enumerate(frames_to_read):
+            frame = odb.steps[step_name].frames[frame_number]
+            field = get_frame_field(frame, field_id, region, position, transform_system, rotating_system)
+            if history is None:
+                # The shape of the history is given by the first frame, the labels are the same in all frames as
+                # the region is the same
+                number_of_values = sum(_block_size(block, position, labels) for block in field.bulkDataBlocks)
+                shape = (len(frames_to_read), number_of_values, max(len(field.componentLabels), 1))
+                history = np.lib.format.open_memmap(history_file_name, mode='w+', dtype=dtype or np.float64,
+                                                    shape=shape)
+                _, node_labels, element_labels = get_field_data(field, position, out=history[0], labels=labels)
+            else:
+                get_field_data(field, position, out=history[i], get_labels=False, labels=labels)
+            frame_values[i] = frame.frameValue
+        history.flush()
+        del history
+    return {'step_names': [step_name for step_name, _ in frames_to_read],
+            'frame_numbers': np.array([frame_number for _, frame_number in frames_to_read]),
+            'frame_values': frame_values, 'node_labels': node_labels, 'element_labels': element_labels}
+
+
+def get_frame_numbers(frames, number_of_frames, step_name):
+    """
+    Gives the frame numbers of a selection of frames in a step
+
+    :param frames:              None for all frames, a tuple (start, stop, step) as for a slice or a list with frame
+                                numbers where -1 is the last frame
+    :param number_of_frames:    Number of frames in the step
+    :param step_name:           Name of the step, used in the error message
+    :return:                    A list with the frame numbers, raises IndexError for frame numbers outside the step
+    """
+    if frames is None:
+        return list(range(number_of_frames))
+    if isinstance(frames, tuple):
+        return list(range(*slice(*frames).indices(number_of_frames)))
+    frame_numbers = []
+    for frame_number in frames:
+        if not -number_of_frames <= frame_number < number_of_frames:
+            raise IndexError('Frame ' + str(frame_number) + ' is outside the ' + str(number_of_frames)
+                             + ' frames of the step ' + str(step_name))
+        frame_numbers.append(frame_number % number_of_frames)
+    return frame_numbers
+
+
+def stream_field_from_odb(odb_file_name, field_id, output_directory, chunk_size=100000, max_pending_chunks=2,
+                          step_name=None, frame_number=-1, set_name=None, instance_name=None, coordinate_system=None,
+                          rotating_system=False, position=INTEGRATION_POINT, dtype=None, labels=None):
+    """
+    Reads a field in chunks of at most chunk_size values which are written to output_directory as they are filled.
+    Chunk i is written with save_data as chunk_i.pkl, the file is renamed to its final name when it is complete.
+    The reader removes the chunks it has read and the writing waits while max_pending_chunks chunks are unread so that
+    the disk use is bounded by the chunk size. The bulk data blocks cannot be read in parts, so the peak memory is one
+    block, all values of one element type in one instance, plus the chunk. Reading stops if a file named cancel is created in
+    output_directory. When all chunks are written, done.pkl is written with the number of chunks
+
+    :param odb_file_name:       Filename of the odb-file with the .odb extension
+    :param field_id:            The ID of the field. example 'S'  for stresses
+    :param output_directory:    The directory where the chunks are written
+    :param chunk_size:          Maximum number of values in a chunk
+    :param max_pending_chunks:  Maximum number of chunks that are written but not read
+    :param dtype:               If given, the floating point type of the written data
+
+    See read_field_from_odb for the other arguments
+    """
+    with OpenOdb(odb_file_name, read_only=True) as odb:
+        region = get_field_region(odb, set_name, instance_name, position)
+        transform_system = get_transform_system(odb, coordinate_system)
         if not step_name:
             step_name = odb.steps.keys()[-1]
-
         if frame_number == -1:
             frame_number = len(odb.steps[step_name].frames) - 1
-        field = odb.steps[step_name].frames[frame_number].fieldOutputs[field_id].getSubset(position=position)
-        field = field.getSubset(region=element_set)
-        frame_value = odb.steps[step_name].frames[frame_number].frameValue
-        if coordinate_system is not None:
-            if coordinate_system.name not in odb.rootAssembly.datumCsyses:
-                transform_system = odb.rootAssembly.DatumCsysByThreePoints(name=coordinate_system.name,
-                                                                           coordSysType=coordinate_system.system_type,
-                                                                           origin=coordinate_system.origin,
-                                                                           point1=coordinate_system.point1,
-                                                                           point2=coordinate_system.point2)
-            else:
-                transform_system = odb.rootAssembly.datumCsyses[coordinate_system.name]
-
-            if rotating_system:
-                deformation_field = odb.steps[step_name].frames[frame_number].fieldOutputs['U']
-                field = field.getTransformedField(transform_system, deformationField=deformation_field)
-            else:
-                field = field.getTransformedField(transform_system)
-        field = field.values
-
-        # ToDo: raise exception if field is empty
-        n1 = len(field)
-        n2 = 1 if type(field[0].data) is float else len(field[0].data)
-        if n2 > 1:
-            data = np.zeros((n1, n2))
+        frame = odb.steps[step_name].frames[frame_number]
+        field = get_frame_field(frame, field_id, region, position, transform_system, rotating_system)
+        number_of_components = max(len(field.componentLabels), 1)
+        writer = _ChunkWriter(output_directory, chunk_size, number_of_components, position, max_pending_chunks, dtype)
+        # The blocks are read one at a time, one whole block and the chunk are held in memory. For a model with a single
+        # element type and instance the block is the whole field
+        for block in field.bulkDataBlocks:
+            block_labels = _block_labels(block, position)
+            block_data = block.data
+            if labels is not None:
+                rows = _isin(block_labels, labels)
+                block_data, block_labels = block_data[rows], np.asarray(block_labels)[rows]
+            start = 0
+            while start < block_data.shape[0]:
+                if writer.cancelled():
+                    return
+                start = writer.add(block_data, block_labels, start)
+            del block_data, block_labels
+        writer.close()
+
+
+class _ChunkWriter(object):
+    def __init__(self, output_directory, chunk_size, number_of_components, position, max_pending_chunks, dtype):
+        self.output_directory = output_directory
+        self.data = np.zeros((chunk_size, number_of_components), dtype=dtype or np.float64)
+        self.labels = np.zeros(chunk_size, dtype=int)
+        self.position = position
+        self.max_pending_chunks = max_pending_chunks
+        self.size = 0
+        self.number_of_chunks = 0
+
+    def _file_name(self, name):
+        return os.path.join(self.output_directory, name)
+
+    def cancelled(self):
+        return os.path.exists(self._file_name('cancel'))
+
+    def add(self, data, labels, start):
+        """
+        Copies values from data and labels beginning at row start into the chunk, the chunk is written when it is full
+
+        :return:    The first row that is not copied
+        """
+        rows = min(data.shape[0] - start, self.data.shape[0] - self.size)
+        self.data[self.size:self.size + rows] = data[start:start + rows].reshape(rows, self.data.shape[1])
+        self.labels[self.size:self.size + rows] = labels[start:start + rows]
+        self.size += rows
+        if self.size == self.data.shape[0]:
+            self.write()
+        return start + rows
+
+    def write(self):
+        if self.size == 0:
+            return
+        pending_chunk = self._file_name('chunk_' + str(self.number_of_chunks - self.max_pending_chunks) + '.pkl')
+        while os.path.exists(pending_chunk) and not self.cancelled():
+            time.sleep(0.01)
+        data = self.data[:self.size]
+        if data.shape[1] == 1:
+            data = data[:, 0]
+        labels = self.labels[:self.size]
+        empty = np.zeros(0, dtype=int)
+        if self.position in [NODAL, ELEMENT_NODAL]:
+            chunk = {'data': data, 'node_labels': labels, 'element_labels': empty}
         else:
-            data = np.zeros(n1)
-        node_labels = []
-        element_labels = []
-        for i, data_point in enumerate(field):
-            data[i] = data_point.data
-            if position in [NODAL, ELEMENT_NODAL]:
-                node_labels.append(data_point.nodeLabel)
-            elif position in [INTEGRATION_POINT, CENTROID, ELEMENT_NODAL, ELEMENT_FACE]:
-                element_labels.append(data_point.elementLabel)
+            chunk = {'data': data, 'node_labels': empty, 'element_labels': labels}
+        name = 'chunk_' + str(self.number_of_chunks)
+        save_data(self._file_name(name + '_tmp.pkl'), chunk)
+        os.rename(self._file_name(name + '_tmp.pkl'), self._file_name(name + '.pkl'))
+        self.number_of_chunks += 1
+        self.size = 0
 
-    if not get_position_numbers and not get_frame_value:
-        return data
-    elif not get_position_numbers:
-        return data, frame_value
-    elif not get_frame_value:
-        return data, node_labels, element_labels
+    def close(self):
+        self.write()
+        save_data(self._file_name('done_tmp.pkl'), {'number_of_chunks': self.number_of_chunks})
+        os.rename(self._file_name('done_tmp.pkl'), self._file_name('done.pkl'))
+
+
+def _block_labels(block, position):
+    if position in [NODAL, ELEMENT_NODAL]:
+        return block.nodeLabels
+    return block.elementLabels
+
+
+def _block_size(block, position, labels=None):
+    if labels is not None:
+        return int(np.count_nonzero(_isin(_block_labels(block, position), labels)))
+    return len(_block_labels(block, position))
+
+
+def get_field_data(field, position, out=None, get_labels=True, labels=None):
+    """
+    Extracts the data and the labels from a field using the bulk data blocks of the field. The data is copied block by
+    block into a preallocated array so that only one block at a time is held in addition to the result. The ordering
+    is the same as for field.values. The sizes are taken from the label arrays to avoid reading the data twice
+
+    :param field:       The FieldOutput object, typically a subset of a field at a single output position
+    :param position:    The output position of the field
+    :param out:         An array with the shape (values, components) that the data is copied into, for instance a
+                        frame of a memory mapped history. Default is None which allocates the array
+    :param get_labels:  Flag if the labels should be extracted. Default is True
+    :param labels:      Node labels for NODAL and ELEMENT_NODAL and element labels for the other positions of the values
+                        to extract, in the ordering of the field. Default is None which extracts all values
+    :return:            data, node_labels, element_labels where data is a numpy array with one row per value, or a
+                        one dimensional array for scalar fields if out is None. The labels are integer numpy arrays
+                        where node_labels are given for NODAL and ELEMENT_NODAL and element_labels for the other
+                        positions, the other array is empty. The labels are None if get_labels is False
+    """
+    with phase('read_values'):
+        return _get_field_data(field, position, out, get_labels, labels)
+
+
+def _get_field_data(field, position, out, get_labels, labels):
+    blocks = field.bulkDataBlocks
+    # The rows of each block with the requested labels, the getSubset regions of the odb API are sets only
+    block_rows = None
+    if labels is not None:
+        block_rows = [_isin(_block_labels(block, position), labels) for block in blocks]
+    number_of_values = 0
+    for i, block in enumerate(blocks):
+        if block_rows is None:
+            number_of_values += _block_size(block, position)
+        else:
+            number_of_values += int(np.count_nonzero(block_rows[i]))
+    number_of_components = max(len(field.componentLabels), 1)
+    if number_of_values == 0:
+        raise ValueError('The field ' + str(field.name) + ' has no values for the requested region and position')
+    if out is not None:
+        if out.shape != (number_of_values, number_of_components):
+            raise ValueError('The field ' + str(field.name) + ' does not have the same number of values or components '
+                             'in all frames')
+        data = out
+    elif number_of_components > 1:
+        data = np.zeros((number_of_values, number_of_components))
     else:
-        return data, frame_value, node_labels, element_labels
+        data = np.zeros(number_of_values)
+    field_labels = None
+    if get_labels:
+        field_labels = np.zeros(number_of_values, dtype=int)
+    start = 0
+    for i, block in enumerate(blocks):
+        block_data = block.data
+        if block_rows is not None:
+            block_data = block_data[block_rows[i]]
+        end = start + block_data.shape[0]
+        data[start:end] = block_data.reshape(data[start:end].shape)
+        if get_labels:
+            block_labels = _block_labels(block, position)
+            if block_rows is not None:
+                block_labels = np.asarray(block_labels)[block_rows[i]]
+            field_labels[start:end] = block_labels
+        start = end
+    if not get_labels:
+        return data, None, None
+    if position in [NODAL, ELEMENT_NODAL]:
+        return data, field_labels, np.zeros(0, dtype=int)
+    return data, np.zeros(0, dtype=int), field_labels
 
 
 def write_field_to_odb(field_data, field_id, odb_file_name, step_name, instance_name=None, set_name=None,
@@ -165,18 +525,61 @@ def write_field_to_odb(field_data, field_id, odb_file_name, step_name, instance_
     :return:                        Nothing
     """
     with OpenOdb(odb_file_name, read_only=False) as odb:
-        if step_name not in odb.steps:
-            step = odb.Step(name=step_name, description=step_description, domain=TIME, timePeriod=1.)
-        else:
-            step = odb.steps[step_name]
-        if instance_name == '':
-            if len(odb.rootAssembly.instances) == 1:
-                instance = odb.rootAssembly.instances[odb.rootAssembly.instances.keys()[0]]
-            else:
-                raise ValueError("The odb file consist of several instances, please specfy an instance")
+        write_field_to_open_odb(odb, field_data, field_id, step_name, instance_name, set_name, step_description,
+                                frame_number, frame_value, field_description, invariants, position)
+
+
+def write_fields_to_odb(odb_file_name, write_requests):
+    """
+    Function for writing several fields and frames to an odb which is only opened and saved once
+
+    :param odb_file_name:   Filename of the odb to write to
+    :param write_requests:  A list of dicts with the keys field_data, field_id, step_name, instance_name, set_name,
+                            step_description, frame_number, frame_value, field_description, invariants and position
+                            with the same meaning as the arguments to write_field_to_odb. All keys except field_data,
+                            field_id and step_name are optional. The requests are written in order so a frame created
+                            by a request can be written to by the following requests using frame_number=-1
+    :return:                The number of written values
+    """
+    object_labels = {}
+    number_of_values = 0
+    with OpenOdb(odb_file_name, read_only=False) as odb:
+        for request in write_requests:
+            write_field_to_open_odb(odb, request['field_data'], request['field_id'], request['step_name'],
+                                    request.get('instance_name', ''), request.get('set_name', None),
+                                    request.get('step_description', ''), request.get('frame_number', None),
+                                    request.get('frame_value', None), request.get('field_description', ''),
+                                    request.get('invariants', None), request.get('position', INTEGRATION_POINT),
+                                    object_labels)
+            number_of_values += request['field_data'].size
+    return number_of_values
+
+
+def write_field_to_open_odb(odb, field_data, field_id, step_name, instance_name=None, set_name=None,
+                            step_description='', frame_number=None, frame_value=None, field_description='',
+                            invariants=None, position=INTEGRATION_POINT, object_labels=None):
+    """
+    Writes a field to an odb opened with write access, see write_field_to_odb for the arguments
+
+    :param object_labels:   A dict where the node and element labels of the instances and sets are stored so that
+                            they are only looked up once when several fields are written. Default is None
+    """
+    if step_name not in odb.steps:
+        step = odb.Step(name=step_name, description=step_description, domain=TIME, timePeriod=1.)
+    else:
+        step = odb.steps[step_name]
+    if not instance_name:
+        if len(odb.rootAssembly.instances) == 1:
+            instance = odb.rootAssembly.instances[odb.rootAssembly.instances.keys()[0]]
         else:
-            instance = odb.rootAssembly.instances[instance_name]
+            raise ValueError("The odb file consist of several instances, please specfy an instance")
+    else:
+        instance = odb.rootAssembly.instances[instance_name]
 
+    if object_labels is None:
+        object_labels = {}
+    labels_key = (instance.name, set_name, position == NODAL)
+    if labels_key not in object_labels:
         if position in [INTEGRATION_POINT, CENTROID, ELEMENT_NODAL, ELEMENT_FACE]:
             if set_name:
                 objects = instance.elementSets[set_name].elements
@@ -189,33 +592,33 @@ def write_field_to_odb(field_data, field_id, odb_file_name, step_name, instance_
                 objects = instance.nodes
         else:
             raise TypeError("The specified position is not a valid output position for abaqus")
-        object_numbers = []
-        for obj in objects:
-            object_numbers.append(obj.label)
-        field_types = {1: SCALAR, 6: TENSOR_3D_FULL, 3: VECTOR}
-
-        if len(field_data.shape) == 1:
-            field_data = field_data[:, np.newaxis]
-        field_type = field_types[field_data.shape[1]]
-        field_data_to_frame = tuple(field_data[:, :])
-        if frame_value is None:
-            if len(step.frames) > 0:
-                frame_value = step.frames[len(step.frames)-1].frameValue + 1.0
-            else:
-                frame_value = 0.
-
-        if frame_number is None or len(step.frames) == 0 or len(step.frames) <= frame_number:
-            frame = step.Frame(incrementNumber=len(step.frames)+1, frameValue=frame_value, description='')
+        object_labels[labels_key] = [obj.label for obj in objects]
+    object_numbers = object_labels[labels_key]
+    field_types = {1: SCALAR, 6: TENSOR_3D_FULL, 3: VECTOR}
+
+    if len(field_data.shape) == 1:
+        field_data = field_data[:, np.newaxis]
+    field_type = field_types[field_data.shape[1]]
+    field_data_to_frame = tuple(field_data[:, :])
+    if frame_value is None:
+        if len(step.frames) > 0:
+            frame_value = step.frames[len(step.frames)-1].frameValue + 1.0
         else:
-            frame = step.frames[frame_number]
+            frame_value = 0.
 
-        if invariants is None:
-            invariants = []
-        if field_id in frame.fieldOutputs:
-            field = frame.fieldOutputs[field_id]
-        else:
-            field = frame.FieldOutput(name=field_id, description=field_description, type=field_type,
-                                      validInvariants=invariants)
+    if frame_number is None or len(step.frames) == 0 or len(step.frames) <= frame_number:
+        frame = step.Frame(incrementNumber=len(step.frames)+1, frameValue=frame_value, description='')
+    else:
+        frame = step.frames[frame_number]
+
+    if invariants is None:
+        invariants = []
+    if field_id in frame.fieldOutputs:
+        field = frame.fieldOutputs[field_id]
+    else:
+        field = frame.FieldOutput(name=field_id, description=field_description, type=field_type,
+                                  validInvariants=invariants)
+    with phase('write_values'):
         field.addData(position=position, instance=instance, labels=object_numbers, data=field_data_to_frame)
 
 
@@ -239,7 +642,6 @@ def get_nodal_coordinates_from_node_set(odb_file_name, node_set_name, instance_n
         node_dict = {}
         for node in node_set.nodes:
             node_dict[node.label] = node.coordinates
-        odb.close()
         return node_dict
 
 
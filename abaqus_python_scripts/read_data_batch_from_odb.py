@@ -0,0 +1,31 @@
+from __future__ import print_function, division
+
+import pickle
+import sys
+
+from abaqus_constants import output_positions
+from odb_io_functions import read_fields_from_odb
+from transport import save_data
+
+
+parameter_pickle_name = sys.argv[-2]
+results_pickle_name = sys.argv[-1]
+
+with open(parameter_pickle_name, 'rb') as parameter_pickle:
+    data = pickle.load(parameter_pickle)
+
+odb_file_name = str(data['odb_file_name'])
+read_requests = []
+for request in data['read_requests']:
+    read_requests.append({'field_id': str(request['field_id']),
+                          'step_name': str(request['step_name']),
+                          'frame_number': request['frame_number'],
+                          'set_name': str(request['set_name']),
+                          'instance_name': str(request['instance_name']),
+                          'position': output_positions[str(request['position'])],
+                          'coordinate_system': request.get('coordinate_system', None),
+                          'labels': request.get('labels', None)})
+
+field_data = read_fields_from_odb(odb_file_name, read_requests)
+
+save_data(results_pickle_name, field_data, dtype=data.get('dtype', None))
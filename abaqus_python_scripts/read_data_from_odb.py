@@ -5,6 +5,7 @@ import sys
 
 from abaqus_constants import output_positions
 from odb_io_functions import read_field_from_odb
+from transport import save_data
 
 
 parameter_pickle_name = sys.argv[-2]
@@ -23,11 +24,13 @@ get_position_numbers = data['get_position_numbers']
 get_frame_value = data['get_frame_value']
 position = output_positions[str(data['position'])]
 coordinate_system = data.get('coordinate_system', None)
+dtype = data.get('dtype', None)
+labels = data.get('labels', None)
 
 field_data = read_field_from_odb(field_id, odb_file_name, step_name, frame_number, set_name,
                                  instance_name=instance_name, get_position_numbers=get_position_numbers,
                                  get_frame_value=get_frame_value, position=position,
-                                 coordinate_system=coordinate_system)
+                                 coordinate_system=coordinate_system, labels=labels)
 
 data_dict = {}
 
@@ -40,8 +43,8 @@ else:
         pos_idx = 2
     else:
         pos_idx = 1
-    data_dict['node_labels'] = field_data[pos_idx]
-    data_dict['element_labels'] = field_data[pos_idx + 1]
+    if get_position_numbers:
+        data_dict['node_labels'] = field_data[pos_idx]
+        data_dict['element_labels'] = field_data[pos_idx + 1]
 
-with open(results_pickle_name, 'wb') as results_pickle:
-    pickle.dump(data_dict, results_pickle)
+save_data(results_pickle_name, data_dict, dtype=dtype)
@@ -0,0 +1,30 @@
+from __future__ import print_function, division
+
+import pickle
+import sys
+
+from abaqus_constants import output_positions
+from odb_io_functions import read_field_history_from_odb
+from transport import save_data
+
+
+parameter_pickle_name = sys.argv[-2]
+results_pickle_name = sys.argv[-1]
+
+with open(parameter_pickle_name, 'rb') as parameter_pickle:
+    data = pickle.load(parameter_pickle)
+
+step_names = data['step_names']
+if step_names is not None:
+    step_names = [str(step_name) for step_name in step_names]
+frames = data['frames']
+if isinstance(frames, list):
+    frames = [int(frame_number) for frame_number in frames]
+
+history = read_field_history_from_odb(str(data['odb_file_name']), str(data['field_id']),
+                                      str(data['history_file_name']), step_names=step_names, frames=frames,
+                                      set_name=str(data['set_name']), instance_name=str(data['instance_name']),
+                                      coordinate_system=data.get('coordinate_system', None),
+                                      position=output_positions[str(data['position'])], dtype=data['dtype'],
+                                      labels=data.get('labels', None))
+save_data(results_pickle_name, history)
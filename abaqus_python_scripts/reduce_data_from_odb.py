@@ -0,0 +1,31 @@
+from __future__ import print_function, division
+
+import sys
+
+from abaqus_constants import output_positions
+from odb_io_functions import reduce_fields_from_odb
+from transport import load_data, save_data
+
+
+parameter_pickle_name = sys.argv[-2]
+results_pickle_name = sys.argv[-1]
+
+data = load_data(parameter_pickle_name)
+
+reduction_requests = []
+for request in data['reduction_requests']:
+    reduction_requests.append({'field_id': str(request['field_id']),
+                               'reductions': [str(reduction) for reduction in request['reductions']],
+                               'invariant': None if request['invariant'] is None else str(request['invariant']),
+                               'component': None if request['component'] is None else str(request['component']),
+                               'step_name': str(request['step_name']),
+                               'frame_number': request['frame_number'],
+                               'set_name': str(request['set_name']),
+                               'instance_name': str(request['instance_name']),
+                               'position': output_positions[str(request['position'])],
+                               'weight_field_id': str(request['weight_field_id']),
+                               'percentiles': request['percentiles'],
+                               'bins': request['bins'],
+                               'top_k': request['top_k']})
+
+save_data(results_pickle_name, reduce_fields_from_odb(str(data['odb_file_name']), reduction_requests))
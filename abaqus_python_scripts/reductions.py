@@ -0,0 +1,148 @@
+"""
+Reductions of field data computed in abaqus so that only the results are transferred instead of the full fields.
+Only numpy is used so that the functions work with the numpy version shipped with abaqus
+"""
+from __future__ import print_function, division
+
+import numpy as np
+
+reduction_names = ['min', 'max', 'mean', 'weighted_mean', 'percentiles', 'histogram', 'top_k']
+
+
+def _tensor_components(data):
+    # Abaqus orders the components of full three dimensional tensors as 11, 22, 33, 12, 13, 23. Plane strain and
+    # axisymmetric elements only have 11, 22, 33, 12 where the out of plane shear components 13 and 23 are zero
+    if data.shape[1] == 4:
+        return [data[:, i] for i in range(4)] + [np.zeros(data.shape[0]), np.zeros(data.shape[0])]
+    return [data[:, i] for i in range(6)]
+
+
+def mises(data):
+    s11, s22, s33, s12, s13, s23 = _tensor_components(data)
+    return np.sqrt(((s11 - s22)**2 + (s22 - s33)**2 + (s33 - s11)**2)/2 + 3*(s12**2 + s13**2 + s23**2))
+
+
+def pressure(data):
+    return -np.sum(data[:, :3], axis=1)/3
+
+
+def principal_values(data):
+    """
+    The principal values are computed with the closed form solution for symmetric 3x3 matrices instead of
+    np.linalg.eigvalsh which does not support stacked matrices in the numpy versions shipped with older abaqus versions
+
+    :return:    An array with the principal values of each tensor in ascending order, one row per tensor
+    """
+    s11, s22, s33, s12, s13, s23 = _tensor_components(data)
+    mean = (s11 + s22 + s33)/3
+    d11, d22, d33 = s11 - mean, s22 - mean, s33 - mean
+    scale = np.sqrt((d11**2 + d22**2 + d33**2 + 2*(s12**2 + s13**2 + s23**2))/6)
+    # Tensors with three equal principal values have scale zero, all principal values are then the mean
+    divisor = np.where(scale > 0, scale, 1.)**3
+    determinant = (d11*d22*d33 + 2*s12*s13*s23 - d11*s23**2 - d22*s13**2 - d33*s12**2)/divisor
+    angle = np.arccos(np.clip(determinant/2, -1., 1.))/3
+    maximum = mean + 2*scale*np.cos(angle)
+    minimum = mean + 2*scale*np.cos(angle + 2*np.pi/3)
+    return np.column_stack([minimum, 3*mean - maximum - minimum, maximum])
+
+
+def magnitude(data):
+    return np.sqrt(np.sum(data**2, axis=1))
+
+
+invariant_functions = {'MISES': mises,
+                       'PRESS': pressure,
+                       'MAX_PRINCIPAL': lambda data: principal_values(data)[:, 2],
+                       'MID_PRINCIPAL': lambda data: principal_values(data)[:, 1],
+                       'MIN_PRINCIPAL': lambda data: principal_values(data)[:, 0],
+                       'MAGNITUDE': magnitude}
+
+
+def scalar_values(data, component_labels, invariant=None, component=None, field_id=''):
+    """
+    Gives the values that are reduced from field data
+
+    :param data:                The field data with one row per value, or a one dimensional array for scalar fields
+    :param component_labels:    The component labels of the field, for example ['S11', 'S22', ...]
+    :param invariant:           Name of an invariant in invariant_functions, for example 'MISES'. Default is None
+    :param component:           Name of a component, for example 'S11' or '11'. Default is None
+    :param field_id:            The ID of the field, used for finding the component if the component labels do not
+                                start with the ID
+    :return:                    A one dimensional array with a value for each row of data
+    """
+    if data.ndim == 1:
+        data = data[:, np.newaxis]
+    if invariant is not None:
+        if invariant not in invariant_functions:
+            raise ValueError('The invariant ' + str(invariant) + ' is not supported, supported invariants are '
+                             + ', '.join(sorted(invariant_functions)))
+        if invariant != 'MAGNITUDE' and data.shape[1] not in [4, 6]:
+            raise ValueError('The invariant ' + str(invariant) + ' requires a field with four or six tensor '
+                             'components')
+        return invariant_functions[invariant](data)
+    if component is not None:
+        component_labels = [str(label) for label in component_labels]
+        for i, label in enumerate(component_labels):
+            if component in [label, field_id + label] or label == field_id + component:
+                return data[:, i]
+        raise ValueError('The component ' + str(component) + ' is not in the field, the components are '
+                         + ', '.join(component_labels))
+    if data.shape[1] != 1:
+        raise ValueError('An invariant or a component must be given for fields with several components')
+    return data[:, 0]
+
+
+def _point_numbers(labels, rows):
+    # The values of a node or an element are consecutive, the point number is the position within the run of the label
+    labels = np.asarray(labels)
+    indices = np.arange(labels.shape[0])
+    new_label = np.ones(labels.shape[0], dtype=bool)
+    new_label[1:] = labels[1:] != labels[:-1]
+    run_starts = np.maximum.accumulate(np.where(new_label, indices, 0))
+    return (indices - run_starts + 1)[np.asarray(rows, dtype=int)]
+
+
+def reduce_values(values, labels, reductions, weights=None, percentiles=(50., ), bins=10, top_k=10):
+    """
+    Computes reductions of the values of a field
+
+    :param values:      One dimensional array with the values
+    :param labels:      The node or element label of each value
+    :param reductions:  List of names in reduction_names
+    :param weights:     Array with the weight of each value, for example the integration point volumes IVOL, used
+                        by weighted_mean
+    :param percentiles: The percentiles computed by percentiles, between 0 and 100
+    :param bins:        The number of bins, or the bin edges, of histogram
+    :param top_k:       The number of largest values given by top_k
+    :return:            A dict with the names of the reductions as keys. min and max give dicts with the keys value,
+                        label and point where point is the integration point number within the element, or 1 for
+                        nodes. percentiles gives an array with a value for each percentile, histogram a dict with the
+                        keys counts and bin_edges and top_k a dict with the arrays values, labels and points of the
+                        largest values in descending order
+    """
+    results = {}
+    for reduction in reductions:
+        if reduction not in reduction_names:
+            raise ValueError('The reduction ' + str(reduction) + ' is not supported, supported reductions are '
+                             + ', '.join(reduction_names))
+        if reduction in ['min', 'max']:
+            row = int(np.argmin(values)) if reduction == 'min' else int(np.argmax(values))
+            results[reduction] = {'value': float(values[row]), 'label': int(labels[row]),
+                                  'point': int(_point_numbers(labels, [row])[0])}
+        elif reduction == 'mean':
+            results[reduction] = float(np.mean(values))
+        elif reduction == 'weighted_mean':
+            if weights is None:
+                raise ValueError('weighted_mean requires weights')
+            results[reduction] = float(np.sum(values*weights)/np.sum(weights))
+        elif reduction == 'percentiles':
+            results[reduction] = np.percentile(values, list(percentiles))
+        elif reduction == 'histogram':
+            counts, bin_edges = np.histogram(values, bins=bins)
+            results[reduction] = {'counts': counts, 'bin_edges': bin_edges}
+        elif reduction == 'top_k':
+            number_of_values = min(int(top_k), values.shape[0])
+            rows = np.argsort(values, kind='mergesort')[::-1][:number_of_values]
+            results[reduction] = {'values': values[rows], 'labels': labels[rows],
+                                  'points': _point_numbers(labels, rows)}
+    return results
@@ -0,0 +1,21 @@
+from __future__ import print_function, division
+
+import pickle
+import sys
+
+from abaqus_constants import output_positions
+from odb_io_functions import stream_field_from_odb
+
+
+parameter_pickle_name = sys.argv[-1]
+
+with open(parameter_pickle_name, 'rb') as parameter_pickle:
+    data = pickle.load(parameter_pickle)
+
+stream_field_from_odb(str(data['odb_file_name']), str(data['field_id']), str(data['output_directory']),
+                      chunk_size=data['chunk_size'], max_pending_chunks=data['max_pending_chunks'],
+                      step_name=str(data['step_name']), frame_number=data['frame_number'],
+                      set_name=str(data['set_name']), instance_name=str(data['instance_name']),
+                      coordinate_system=data.get('coordinate_system', None),
+                      position=output_positions[str(data['position'])], dtype=data['dtype'],
+                      labels=data.get('labels', None))
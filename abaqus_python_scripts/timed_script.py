@@ -0,0 +1,51 @@
+"""
+Runs a script in this directory and records the time of its phases, used by abaqus_interface when the interface is
+instrumented
+
+    abaqus python timed_script.py timing_file profile script_name arguments
+
+The start and end times, the phases and, if profile is 1, the cProfile statistics of the script are written to
+timing_file with save_data. The statistics are written as the dict of pstats.Stats which can be written to a file
+readable by pstats with marshal in the client
+"""
+from __future__ import print_function, division
+
+import cProfile
+import os
+import pstats
+import runpy
+import sys
+import time
+
+import timing
+from transport import save_data
+
+
+def main():
+    start = time.time()
+    timing_file_name = sys.argv[1]
+    profile = sys.argv[2] == '1'
+    script_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), sys.argv[3])
+    arguments = sys.argv[4:]
+    argv = sys.argv
+    sys.argv = [script_path] + arguments
+    timing.phases = {}
+    profiler = cProfile.Profile() if profile else None
+    try:
+        if profiler is not None:
+            profiler.enable()
+        runpy.run_path(script_path, run_name='__main__')
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        sys.argv = argv
+        phases = timing.phases
+        timing.phases = None
+        profile_stats = None
+        if profiler is not None:
+            profile_stats = pstats.Stats(profiler).stats
+        save_data(timing_file_name, {'start': start, 'end': time.time(), 'phases': phases, 'profile': profile_stats})
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,22 @@
+"""
+Timing of the phases of the scripts, like opening the odb and reading the values. The timing is only active when a
+script is run by timed_script.py which sets phases to a dict, the phases are then added to the dict
+"""
+from __future__ import print_function, division
+
+from contextlib import contextmanager
+import time
+
+phases = None
+
+
+@contextmanager
+def phase(name):
+    if phases is None:
+        yield
+        return
+    start = time.time()
+    try:
+        yield
+    finally:
+        phases[name] = phases.get(name, 0.) + time.time() - start
@@ -0,0 +1,68 @@
+"""
+Exchange of data with abaqus_interface through files. The numpy arrays are written as raw .npy files next to a protocol
+2 pickle with the rest of the data where each array is replaced by {'npy_file': filename}. For the pickle results.pkl
+the arrays are written as results_0.npy, results_1.npy and so on. The same format is read and written by
+abaqus_interface/transport.py
+"""
+from __future__ import print_function, division
+
+import os
+import pickle
+
+import numpy as np
+
+from timing import phase
+
+
+def _replace_arrays(data, base_name, array_files, dtype):
+    if isinstance(data, np.ndarray):
+        if dtype is not None and data.dtype.kind == 'f':
+            data = data.astype(str(dtype))
+        file_name = base_name + '_' + str(len(array_files)) + '.npy'
+        np.save(file_name, data)
+        array_files.append(file_name)
+        return {'npy_file': os.path.basename(file_name)}
+    if isinstance(data, dict):
+        return dict((key, _replace_arrays(value, base_name, array_files, dtype)) for key, value in data.items())
+    if isinstance(data, (list, tuple)):
+        return type(data)(_replace_arrays(value, base_name, array_files, dtype) for value in data)
+    return data
+
+
+def _load_arrays(data, directory):
+    if isinstance(data, dict):
+        if len(data) == 1 and 'npy_file' in data:
+            return np.load(os.path.join(directory, str(data['npy_file'])))
+        return dict((key, _load_arrays(value, directory)) for key, value in data.items())
+    if isinstance(data, (list, tuple)):
+        return type(data)(_load_arrays(value, directory) for value in data)
+    return data
+
+
+def save_data(file_name, data, dtype=None):
+    """
+    Writes data to a pickle and the numpy arrays to .npy files
+
+    :param file_name:   Filename of the pickle
+    :param data:        The data to write, numpy arrays in dicts, lists and tuples are written as .npy files
+    :param dtype:       If given, floating point arrays are converted to this type before they are written,
+                        for example 'float32'. Default is None which keeps the type of the arrays
+    :return:            Nothing
+    """
+    with phase('save_data'):
+        header = _replace_arrays(data, os.path.splitext(file_name)[0], [], dtype)
+        with open(file_name, 'wb') as pickle_file:
+            pickle.dump(header, pickle_file, protocol=2)
+
+
+def load_data(file_name):
+    """
+    Reads data written by save_data
+
+    :param file_name:   Filename of the pickle
+    :return:            The data with the numpy arrays loaded
+    """
+    with phase('load_data'):
+        with open(file_name, 'rb') as pickle_file:
+            header = pickle.load(pickle_file)
+        return _load_arrays(header, os.path.dirname(os.path.abspath(file_name)))
@@ -1,5 +1,52 @@
+from collections import OrderedDict
+import os
+
 from odbAccess import openOdb
 
+from timing import phase
+
+# Set by abaqus_worker.py to keep odbs opened for reading between the requests to the worker
+odb_cache = None
+
+
+class OdbCache(object):
+    def __init__(self, max_size=4):
+        """
+        Cache of odbs opened read only, the least recently used odb is closed when more than max_size odbs are open.
+        An odb is reopened if the file has been modified since it was opened
+        """
+        self.max_size = max_size
+        self.odbs = OrderedDict()
+
+    def open(self, odb_file_name, read_only=True):
+        key = os.path.abspath(odb_file_name)
+        if not read_only:
+            self.close(key)
+            return openOdb(odb_file_name, readOnly=False)
+        modification_time = os.path.getmtime(key)
+        if key in self.odbs:
+            odb, cached_modification_time = self.odbs.pop(key)
+            if cached_modification_time == modification_time:
+                self.odbs[key] = (odb, modification_time)
+                return odb
+            odb.close()
+        odb = openOdb(odb_file_name, readOnly=True)
+        self.odbs[key] = (odb, modification_time)
+        while len(self.odbs) > self.max_size:
+            _, (old_odb, _) = self.odbs.popitem(last=False)
+            old_odb.close()
+        return odb
+
+    def close(self, odb_file_name=None):
+        if odb_file_name is None:
+            keys = list(self.odbs.keys())
+        else:
+            keys = [os.path.abspath(odb_file_name)]
+        for key in keys:
+            if key in self.odbs:
+                odb, _ = self.odbs.pop(key)
+                odb.close()
+
 
 class OpenOdb():
     def __init__(self, odb_file_name, read_only=True):
@@ -8,11 +55,17 @@ class OpenOdb():
         self.odb = None
 
     def __enter__(self):
-        self.odb = openOdb(self.filename, readOnly=self.read_only)
+        with phase('open_odb'):
+            if odb_cache is not None:
+                self.odb = odb_cache.open(self.filename, read_only=self.read_only)
+            else:
+                self.odb = openOdb(self.filename, readOnly=self.read_only)
         return self.odb
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         if self.read_only is False:
-            self.odb.update()
-            self.odb.save()
-        self.odb.close()
+            with phase('save_odb'):
+                self.odb.update()
+                self.odb.save()
+        if odb_cache is None or self.read_only is False:
+            self.odb.close()
@@ -9,6 +9,7 @@ import xyPlot
 from abaqusConstants import POINT_LIST, ELEMENT_NODAL, TRUE_DISTANCE, UNDEFORMED, PATH_POINTS, COMPONENT
 from abaqusConstants import NODAL, INTEGRATION_POINT, CENTROID
 
+from transport import load_data, save_data
 from utilities import OpenOdb
 
 # Getting rid of the flake8 issues that session is undefined
@@ -29,7 +30,7 @@ def create_path(points, path_name, session):
     return path
 
 
-def get_data_from_path(path, session, variable, component=None, output_position=ELEMENT_NODAL):
+def get_data_from_path(path, session, variable, component=None, output_position=ELEMENT_NODAL, name=None):
     if component is None:
         session.viewports['Viewport: 1'].odbDisplay.setPrimaryVariable(variableLabel=variable,
                                                                        outputPosition=output_position)
@@ -37,44 +38,99 @@ def get_data_from_path(path, session, variable, component=None, output_position=
         session.viewports['Viewport: 1'].odbDisplay.setPrimaryVariable(variableLabel=variable,
                                                                        outputPosition=output_position,
                                                                        refinement=[COMPONENT, component])
-    xy = xyPlot.XYDataFromPath(name=path.name + '_' + variable, path=path,
+    if name is None:
+        name = path.name + '_' + variable
+    xy = xyPlot.XYDataFromPath(name=name, path=path,
                                labelType=TRUE_DISTANCE, shape=UNDEFORMED, pathStyle=PATH_POINTS,
                                includeIntersections=False)
     return np.array(xy)
 
 
+def _open_viewport(odb):
+    session.Viewport(name='Viewport: 1', origin=(0.0, 0.0), width=309.913116455078,
+                     height=230.809509277344)
+    session.viewports['Viewport: 1'].makeCurrent()
+    session.viewports['Viewport: 1'].maximize()
+    o7 = session.odbs[session.odbs.keys()[0]]
+    session.viewports['Viewport: 1'].setValues(displayedObject=o7)
+
+
+def _step_index_and_frame(odb, step_name, frame_number):
+    if step_name is None:
+        step_name = odb.steps.keys()[-1]
+    step_index = odb.steps.keys().index(step_name)
+    if frame_number is None:
+        frame_number = -1
+    if frame_number < 0:
+        frame_number += len(odb.steps[step_name].frames)
+    return step_index, frame_number
+
+
+def get_data_from_paths(odb, paths, variable, components, frames, output_position):
+    """
+    Extracts several components of a variable along several paths in several frames using one viewport
+
+    :param odb:             The odb opened in the viewer
+    :param paths:           A list of arrays with the points of each path
+    :param variable:        The variable, for example 'S'
+    :param components:      List of components, for example ['S11', 'S22'], None in the list gives the variable
+    :param frames:          List of (step_name, frame_number) where step_name None gives the last step
+    :param output_position: The output position of the variable
+    :return:                A list with a list for each frame with a list for each path with the xy data of each
+                            component
+    """
+    _open_viewport(odb)
+    path_objects = [create_path(points, 'path_' + str(i), session) for i, points in enumerate(paths)]
+    data = []
+    for step_name, frame_number in frames:
+        step_index, frame_number = _step_index_and_frame(odb, step_name, frame_number)
+        session.viewports['Viewport: 1'].odbDisplay.setFrame(step=step_index, frame=frame_number)
+        frame_data = []
+        for path in path_objects:
+            path_data = []
+            for component in components:
+                xy_name = 'xy_data'
+                path_data.append(get_data_from_path(path, session, variable, component, output_position,
+                                                    name=xy_name))
+                # The xy data is removed so that the memory use is independent of the number of extractions
+                del session.xyDataObjects[xy_name]
+            frame_data.append(path_data)
+        data.append(frame_data)
+    return data
+
+
 def main():
     pickle_file_name = sys.argv[-1]
-    with open(pickle_file_name, 'r') as parameter_pickle:
+    with open(pickle_file_name, 'rb') as parameter_pickle:
         parameters = pickle.load(parameter_pickle)
 
     odb_file_name = str(parameters['odb_filename'])
-    path_points_filename = str(parameters['path_points_filename'])
     variable = str(parameters['variable'])
     output_position = output_positions[str(parameters['output_position'])]
     data_filename = str(parameters['data_filename'])
+
+    if 'paths_filename' in parameters:
+        # Several components, paths and frames in one session
+        paths = load_data(str(parameters['paths_filename']))
+        components = [None if component is None else str(component) for component in parameters['components']]
+        frames = [(None if step_name is None else str(step_name), frame_number)
+                  for step_name, frame_number in parameters['frames']]
+        with OpenOdb(odb_file_name, read_only=True) as odb:
+            data = get_data_from_paths(odb, paths, variable, components, frames, output_position)
+        save_data(data_filename, data)
+        return
+
+    path_points_filename = str(parameters['path_points_filename'])
     component = None
     if 'component' in parameters:
         component = str(parameters['component'])
 
     with OpenOdb(odb_file_name, read_only=True) as odb:
-        session.Viewport(name='Viewport: 1', origin=(0.0, 0.0), width=309.913116455078,
-                         height=230.809509277344)
-        session.viewports['Viewport: 1'].makeCurrent()
-        session.viewports['Viewport: 1'].maximize()
-        o7 = session.odbs[session.odbs.keys()[0]]
-        session.viewports['Viewport: 1'].setValues(displayedObject=o7)
-
-        if 'step_name' not in parameters:
-            step_name = odb.steps.keys()[-1]
-        else:
+        _open_viewport(odb)
+        step_name = None
+        if 'step_name' in parameters:
             step_name = str(parameters['step_name'])
-
-        step_index = odb.steps.keys().index(step_name)
-        if 'frame_number' not in parameters:
-            frame_number = len(odb.steps[step_name].frames)
-        else:
-            frame_number = parameters['frame_number']
+        step_index, frame_number = _step_index_and_frame(odb, step_name, parameters.get('frame_number', None))
         session.viewports['Viewport: 1'].odbDisplay.setFrame(step=step_index, frame=frame_number)
 
         path_points = np.load(path_points_filename)
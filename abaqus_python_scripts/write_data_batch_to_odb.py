@@ -0,0 +1,29 @@
+from __future__ import print_function, division
+
+import sys
+
+from odb_io_functions import write_fields_to_odb
+from abaqus_constants import output_positions, invariants
+from transport import load_data
+
+
+def write_data_batch_to_odb(pickle_file_name):
+    data = load_data(pickle_file_name)
+    write_requests = []
+    for request in data['write_requests']:
+        write_requests.append({'field_data': request['field_data'],
+                               'field_id': str(request['field_id']),
+                               'step_name': str(request['step_name']),
+                               'instance_name': str(request['instance_name']),
+                               'set_name': str(request['set_name']),
+                               'step_description': str(request['step_description']),
+                               'frame_number': request['frame_number'],
+                               'frame_value': request['frame_value'],
+                               'field_description': str(request['field_description']),
+                               'invariants': [invariants[str(inv)] for inv in request['invariants']],
+                               'position': output_positions[str(request['position'])]})
+    write_fields_to_odb(str(data['odb_file_name']), write_requests)
+
+
+if __name__ == '__main__':
+    write_data_batch_to_odb(sys.argv[-1])
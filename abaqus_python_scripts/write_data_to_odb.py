@@ -1,18 +1,15 @@
 from __future__ import print_function, division
 
 import sys
-import pickle
-
-import numpy as np
 
 from odb_io_functions import write_field_to_odb
 from abaqus_constants import output_positions, invariants
+from transport import load_data
 
 
-def write_data_to_odb(array_file_name, pickle_file_name):
-    field = np.load(array_file_name)
-    with open(pickle_file_name, 'rb') as pickle_file:
-        data = pickle.load(pickle_file)
+def write_data_to_odb(pickle_file_name):
+    data = load_data(pickle_file_name)
+    field = data['field_data']
     field_id = str(data['field_id'])
     instance_name = str(data['instance_name'])
     set_name = str(data['set_name'])
@@ -34,4 +31,4 @@ def write_data_to_odb(array_file_name, pickle_file_name):
 
 
 if __name__ == '__main__':
-    write_data_to_odb(sys.argv[-2], sys.argv[-1])
+    write_data_to_odb(sys.argv[-1])
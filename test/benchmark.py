@@ -0,0 +1,229 @@
+"""
+Benchmarks of the read and write paths with the stand-in abaqus in fake_abaqus. The abaqus python scripts are timed
+in this process, which measures the scripts themselves, and through ABQInterface with the fake abq launcher, which
+measures the full round trip including the start of the process and the transfer of the data. Example
+
+    python test/benchmark.py --elements 40 40 40 --frames 3 --fields S E U --save baseline.json
+    python test/benchmark.py --elements 40 40 40 --frames 3 --fields S E U --baseline baseline.json
+
+The second call reports the throughput and the peak memory relative to the baseline and exits with status 1 if a
+benchmark is slower, or uses more memory, than the baseline by more than the tolerance
+"""
+import argparse
+from collections import namedtuple
+import json
+import os
+import pathlib
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from fake_abaqus_case import fake_abaqus_directory, fake_abq_command
+
+package_directory = pathlib.Path(__file__).parents[1]
+abaqus_python_directory = pathlib.Path(__file__).parents[1] / 'abaqus_python_scripts'
+# The fake abq launcher appends the peak memory of each abaqus process to the file given by this variable
+peak_memory_variable = 'FAKE_ABAQUS_PEAK_MEMORY_FILE'
+
+BenchmarkResult = namedtuple('BenchmarkResult', ['name', 'values', 'time', 'values_per_second', 'peak_memory',
+                                                 'abaqus_peak_memory'])
+
+
+def _abaqus_peak_memory(memory_file_name):
+    # The largest peak resident memory of the abaqus processes that reported to the file, None if there were none
+    if not memory_file_name.exists():
+        return None
+    return max(int(line) for line in memory_file_name.read_text().split())
+
+
+def measure(name, values, function, setup=None, repeats=3, abaqus=False):
+    """
+    Times a function and measures the peak memory allocated while it runs
+
+    :param name:        Name of the benchmark
+    :param values:      Number of values processed by a call to the function
+    :param function:    The function, called with the return value of setup
+    :param setup:       Function that is called before each call to function and not timed. Default is None
+    :param repeats:     Number of timed calls, the fastest is reported
+    :param abaqus:      Flag if the function runs abaqus with the fake abq launcher. Default is False
+    :return:            A BenchmarkResult where peak_memory is the peak of the memory allocated by python and numpy in
+                        this process and abaqus_peak_memory the largest peak resident memory of the abaqus processes
+                        started by the function, None if abaqus is False
+    """
+    times = []
+    for _ in range(repeats):
+        argument = setup() if setup is not None else None
+        start = time.perf_counter()
+        function(argument)
+        times.append(time.perf_counter() - start)
+    # The memory is measured in a separate call as tracemalloc slows down the allocations
+    argument = setup() if setup is not None else None
+    abaqus_peak_memory = None
+    with tempfile.TemporaryDirectory() as directory:
+        memory_file_name = pathlib.Path(directory) / 'peak_memory.txt'
+        if abaqus:
+            os.environ[peak_memory_variable] = str(memory_file_name)
+        tracemalloc.start()
+        try:
+            function(argument)
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+            os.environ.pop(peak_memory_variable, None)
+        if abaqus:
+            abaqus_peak_memory = _abaqus_peak_memory(memory_file_name)
+    best_time = min(times)
+    return BenchmarkResult(name, values, best_time, values/best_time, peak_memory, abaqus_peak_memory)
+
+
+def run_benchmarks(elements_per_side=(20, 20, 20), frames=3, field_ids=('S', 'PEEQ', 'U'), repeats=3,
+                   work_directory=None):
+    """
+    Runs the benchmarks on a synthetic odb
+
+    :param elements_per_side:   Number of elements along each side of the block of C3D8 elements in the odb
+    :param frames:              Number of frames in the odb
+    :param field_ids:           Fields in every frame of the odb, must include S which is read and written
+    :param repeats:             Number of timed calls of each benchmark
+    :param work_directory:      Directory for the odbs. Default is None which uses a temporary directory
+    :return:                    A list of BenchmarkResult
+    """
+    for directory in [package_directory, fake_abaqus_directory, abaqus_python_directory]:
+        if str(directory) not in sys.path:
+            sys.path.insert(0, str(directory))
+    from synthetic_odb import block_mesh, create_synthetic_odb, field_definitions
+    from create_empty_odb_from_data import create_empty_odb_from_data
+    from create_empty_odb_from_odb import create_empty_odb
+    from odb_io_functions import read_field_from_odb, write_field_to_odb
+    from abaqus_interface import ABQInterface
+    from abaqusConstants import INTEGRATION_POINT, SCALAR, VECTOR, TENSOR_3D_FULL
+
+    with tempfile.TemporaryDirectory(dir=work_directory) as directory:
+        directory = pathlib.Path(directory)
+        odb_file_name = directory / 'benchmark.odb'
+        create_synthetic_odb(odb_file_name, elements_per_side=elements_per_side, frames_per_step=frames,
+                             field_ids=field_ids)
+        node_labels, node_coordinates, element_labels, connectivity = block_mesh(elements_per_side)
+        stress_values = 8*element_labels.shape[0]*6
+        field_values = 0
+        for field_id in field_ids:
+            field_type, position = field_definitions[field_id]
+            points = 8*element_labels.shape[0] if position == INTEGRATION_POINT else node_labels.shape[0]
+            field_values += frames*points*{SCALAR: 1, VECTOR: 3, TENSOR_3D_FULL: 6}[field_type]
+        stresses = read_field_from_odb('S', str(odb_file_name), set_name='')
+
+        def copy_odb():
+            copy_file_name = directory / 'copy.odb'
+            shutil.copy(odb_file_name, copy_file_name)
+            return copy_file_name
+
+        instance = {'instance_name': 'PART-1-1', 'node_labels': node_labels, 'node_coordinates': node_coordinates,
+                    'elements': {'C3D8': {'labels': element_labels, 'connectivity': connectivity}},
+                    'node_sets': {}, 'element_sets': {}}
+        abq = ABQInterface(fake_abq_command)
+        results = [
+            measure('read_field_from_odb', stress_values,
+                    lambda _: read_field_from_odb('S', str(odb_file_name), set_name=''), repeats=repeats),
+            measure('write_field_to_odb', stress_values,
+                    lambda file_name: write_field_to_odb(stresses, 'S2', str(file_name), 'written', set_name=''),
+                    setup=copy_odb, repeats=repeats),
+            measure('create_odb', node_labels.shape[0]*4 + connectivity.size + element_labels.shape[0],
+                    lambda _: create_empty_odb_from_data(str(directory / 'created.odb'), [instance]),
+                    repeats=repeats),
+            measure('copy_odb', field_values,
+                    lambda _: create_empty_odb(str(directory / 'copied.odb'), str(odb_file_name), ['step-1']),
+                    repeats=repeats),
+            measure('ABQInterface.read_data_from_odb', stress_values,
+                    lambda _: abq.read_data_from_odb('S', odb_file_name), repeats=repeats, abaqus=True),
+            measure('ABQInterface.write_data_to_odb', stress_values,
+                    lambda file_name: abq.write_data_to_odb(stresses, 'S2', file_name, 'written'),
+                    setup=copy_odb, repeats=repeats, abaqus=True)
+        ]
+    return results
+
+
+def compare(results, baseline, tolerance=0.2):
+    """
+    Compares the throughput and the peak memory of benchmarks with a baseline
+
+    :param results:     A list of BenchmarkResult
+    :param baseline:    A dict with the benchmark names as keys and dicts with the fields of BenchmarkResult as values,
+                        as written by save_results
+    :param tolerance:   The relative decrease in values per second, or increase in peak memory, that is reported as a
+                        regression
+    :return:            A dict with the names of the benchmarks in the baseline as keys and the throughput relative to
+                        the baseline as values, a dict with the names as keys and dicts with the peak memory relative to
+                        the baseline as values, with the keys peak_memory and abaqus_peak_memory for the memory that is
+                        measured in both, and a list with the names of the regressed benchmarks
+    """
+    ratios = {}
+    memory_ratios = {}
+    regressions = []
+    for result in results:
+        if result.name in baseline:
+            reference = baseline[result.name]
+            ratios[result.name] = result.values_per_second/reference['values_per_second']
+            memory_ratios[result.name] = {}
+            for memory_name in ['peak_memory', 'abaqus_peak_memory']:
+                memory = getattr(result, memory_name)
+                if memory is not None and reference.get(memory_name):
+                    memory_ratios[result.name][memory_name] = memory/reference[memory_name]
+            if ratios[result.name] < 1 - tolerance or any(ratio > 1 + tolerance
+                                                          for ratio in memory_ratios[result.name].values()):
+                regressions.append(result.name)
+    return ratios, memory_ratios, regressions
+
+
+def save_results(results, file_name):
+    with open(file_name, 'w') as result_file:
+        json.dump({result.name: result._asdict() for result in results}, result_file, indent=4)
+
+
+def load_results(file_name):
+    with open(file_name) as result_file:
+        return json.load(result_file)
+
+
+def _megabytes(memory):
+    return '-' if memory is None else f'{memory/2**20:.1f}'
+
+
+def _ratio(ratio):
+    return '-' if ratio is None else f'{ratio:.2f}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks of the read and write paths with the stand-in abaqus')
+    parser.add_argument('--elements', type=int, nargs=3, default=(20, 20, 20), help='Elements along x, y and z')
+    parser.add_argument('--frames', type=int, default=3, help='Number of frames in the odb')
+    parser.add_argument('--fields', nargs='+', default=['S', 'PEEQ', 'U'], help='Fields in every frame of the odb')
+    parser.add_argument('--repeats', type=int, default=3, help='Number of timed calls of each benchmark')
+    parser.add_argument('--save', help='Write the results to this json file')
+    parser.add_argument('--baseline', help='Compare the results with this json file written by --save')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Relative slowdown reported as a regression')
+    arguments = parser.parse_args()
+
+    results = run_benchmarks(tuple(arguments.elements), arguments.frames, tuple(arguments.fields),
+                             arguments.repeats)
+    ratios, memory_ratios, regressions = {}, {}, []
+    if arguments.baseline:
+        ratios, memory_ratios, regressions = compare(results, load_results(arguments.baseline), arguments.tolerance)
+    print(f'{"benchmark":35s} {"values":>10s} {"time [s]":>10s} {"values/s":>12s} {"peak [MB]":>10s} '
+          f'{"abaqus [MB]":>12s} {"baseline":>9s} {"peak":>6s} {"abaqus":>7s}')
+    for result in results:
+        ratio = _ratio(ratios.get(result.name))
+        memory_ratio = memory_ratios.get(result.name, {})
+        print(f'{result.name:35s} {result.values:10d} {result.time:10.4f} {result.values_per_second:12.4g} '
+              f'{_megabytes(result.peak_memory):>10s} {_megabytes(result.abaqus_peak_memory):>12s} {ratio:>9s} '
+              f'{_ratio(memory_ratio.get("peak_memory")):>6s} {_ratio(memory_ratio.get("abaqus_peak_memory")):>7s}')
+    if arguments.save:
+        save_results(results, arguments.save)
+    if regressions:
+        print('Regressions: ' + ', '.join(regressions))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
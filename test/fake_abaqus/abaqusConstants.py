@@ -0,0 +1,23 @@
+"""
+Stand-in for the abaqusConstants module so that the abaqus python scripts can be run with plain CPython in the tests
+"""
+
+
+class SymbolicConstant(str):
+    def __repr__(self):
+        return str(self)
+
+    def __reduce__(self):
+        return SymbolicConstant, (str(self), )
+
+
+_constant_names = ['NODAL', 'ELEMENT_NODAL', 'INTEGRATION_POINT', 'CENTROID', 'ELEMENT_FACE', 'WHOLE_ELEMENT',
+                   'CYLINDRICAL', 'RECTANGULAR', 'SPHERICAL',
+                   'MISES', 'PRESS', 'TRESCA', 'MAX_PRINCIPAL', 'MID_PRINCIPAL', 'MIN_PRINCIPAL', 'MAGNITUDE',
+                   'SCALAR', 'VECTOR', 'TENSOR_3D_FULL',
+                   'TIME', 'FREQUENCY',
+                   'DEFORMABLE_BODY', 'THREE_D', 'TWO_D_PLANAR', 'AXISYMMETRIC',
+                   'POINT_LIST', 'TRUE_DISTANCE', 'UNDEFORMED', 'PATH_POINTS', 'COMPONENT']
+
+for _name in _constant_names:
+    globals()[_name] = SymbolicConstant(_name)
@@ -0,0 +1,52 @@
+"""
+Stand-in for the abaqus command, "python abq.py python script.py arguments" runs script.py with the interpreter running
+this file and with the stub abaqus modules in this directory on the path. "python abq.py viewer noGUI=script.py --
+arguments" runs the script in the same way with the stub visualization modules. If the environment variable
+FAKE_ABAQUS_PEAK_MEMORY_FILE is set, the peak resident memory of the process in bytes is appended as a line to that file
+when the script has finished, which is used by the benchmarks
+"""
+import os
+import runpy
+import sys
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+fake_abaqus_directory = os.path.dirname(os.path.abspath(__file__))
+peak_memory_variable = 'FAKE_ABAQUS_PEAK_MEMORY_FILE'
+
+
+def _report_peak_memory():
+    file_name = os.environ.get(peak_memory_variable)
+    if not file_name or resource is None:
+        return
+    # ru_maxrss is given in kilobytes on linux and in bytes on macos
+    peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform != 'darwin':
+        peak_memory *= 1024
+    with open(file_name, 'a') as memory_file:
+        memory_file.write(str(peak_memory) + '\n')
+
+
+def main():
+    if len(sys.argv) >= 3 and sys.argv[1] == 'python':
+        script_name = os.path.abspath(sys.argv[2])
+        sys.argv = sys.argv[2:]
+    elif len(sys.argv) >= 4 and sys.argv[1] == 'viewer' and sys.argv[2].startswith('noGUI=') and sys.argv[3] == '--':
+        script_name = os.path.abspath(sys.argv[2][len('noGUI='):])
+        sys.argv = [script_name] + sys.argv[4:]
+    else:
+        sys.exit('The fake abaqus command only supports "abq python script.py arguments" and '
+                 '"abq viewer noGUI=script.py -- arguments"')
+    sys.path.insert(0, fake_abaqus_directory)
+    sys.path.insert(0, os.path.dirname(script_name))
+    try:
+        runpy.run_path(script_name, run_name='__main__')
+    finally:
+        _report_peak_memory()
+
+
+if __name__ == '__main__':
+    main()
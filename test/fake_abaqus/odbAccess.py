@@ -0,0 +1,366 @@
+"""
+Stand-in for the Abaqus odbAccess module used when the abaqus python scripts are run with plain CPython in the tests.
+Only the parts of the odb API that the scripts use are implemented. The odb is stored as a pickle on disk and the
+mesh and field data are kept as numpy arrays, transformations of fields are not implemented and leave the data as is
+"""
+from __future__ import print_function, division
+
+import os
+import pickle
+
+import numpy as np
+
+from abaqusConstants import INTEGRATION_POINT, CENTROID, ELEMENT_NODAL, ELEMENT_FACE, NODAL
+from abaqusConstants import SCALAR, VECTOR, TENSOR_3D_FULL
+
+element_positions = [INTEGRATION_POINT, CENTROID, ELEMENT_NODAL, ELEMENT_FACE]
+component_labels = {SCALAR: (), VECTOR: ('1', '2', '3'), TENSOR_3D_FULL: ('11', '22', '33', '12', '13', '23')}
+
+
+class OdbError(Exception):
+    pass
+
+
+class Repository(dict):
+    """
+    Ordered repository where keys() returns a list as in the abaqus python interpreter
+    """
+    def keys(self):
+        return list(dict.keys(self))
+
+    def values(self):
+        return list(dict.values(self))
+
+    def items(self):
+        return list(dict.items(self))
+
+
+class MeshNode(object):
+    def __init__(self, label, coordinates, instance_name):
+        self.label = int(label)
+        self.coordinates = np.array(coordinates, dtype=np.float32)
+        self.instanceName = instance_name
+
+
+class MeshElement(object):
+    def __init__(self, label, element_type, connectivity, instance_name):
+        self.label = int(label)
+        self.type = element_type
+        self.connectivity = tuple(int(n) for n in connectivity)
+        self.instanceName = instance_name
+
+
+class OdbSet(object):
+    def __init__(self, name, container, node_labels=None, element_labels=None):
+        self.name = name
+        self.instance_name = container.name
+        self._container = container
+        self.node_labels = np.array([] if node_labels is None else node_labels, dtype=int)
+        self.element_labels = np.array([] if element_labels is None else element_labels, dtype=int)
+
+    @property
+    def nodes(self):
+        labels = set(self.node_labels.tolist())
+        return [node for node in self._container.nodes if node.label in labels]
+
+    @property
+    def elements(self):
+        labels = set(self.element_labels.tolist())
+        return [element for element in self._container.elements if element.label in labels]
+
+
+class _MeshContainer(object):
+    def __init__(self, name, embedded_space=None, container_type=None):
+        self.name = name
+        self.embeddedSpace = embedded_space
+        self.type = container_type
+        self.node_labels = np.zeros(0, dtype=int)
+        self.node_coordinates = np.zeros((0, 3))
+        self.element_blocks = []
+        self.nodeSets = Repository()
+        self.elementSets = Repository()
+
+    @property
+    def nodes(self):
+        return [MeshNode(label, coordinates, self.name)
+                for label, coordinates in zip(self.node_labels, self.node_coordinates)]
+
+    @property
+    def elements(self):
+        elements = []
+        for block in self.element_blocks:
+            elements.extend(MeshElement(label, block['type'], connectivity, self.name)
+                            for label, connectivity in zip(block['labels'], block['connectivity']))
+        return elements
+
+    def element_types(self, element_labels):
+        types = np.empty(len(element_labels), dtype=object)
+        for block in self.element_blocks:
+            types[np.isin(element_labels, block['labels'])] = block['type']
+        return types
+
+    def addNodes(self, labels=None, coordinates=None, nodeData=None, nodeSetName=None):
+        if nodeData is not None:
+            node_data = np.array(nodeData, dtype=float)
+            labels = node_data[:, 0]
+            coordinates = node_data[:, 1:]
+        labels = np.asarray(labels, dtype=int)
+        coordinates = np.zeros((labels.shape[0], 3)) + np.asarray(coordinates, dtype=float).reshape(labels.shape[0], -1)
+        self.node_labels = np.concatenate([self.node_labels, labels])
+        self.node_coordinates = np.concatenate([self.node_coordinates, coordinates])
+        if nodeSetName:
+            self.NodeSetFromNodeLabels(name=nodeSetName, nodeLabels=labels)
+
+    def addElements(self, labels=None, connectivity=None, type=None, elementData=None, elementSetName=None):
+        if elementData is not None:
+            element_data = np.array(elementData, dtype=int)
+            labels = element_data[:, 0]
+            connectivity = element_data[:, 1:]
+        labels = np.asarray(labels, dtype=int)
+        self.element_blocks.append({'type': str(type), 'labels': labels,
+                                    'connectivity': np.asarray(connectivity, dtype=int).reshape(labels.shape[0], -1)})
+        if elementSetName:
+            self.ElementSetFromElementLabels(name=elementSetName, elementLabels=labels)
+
+    def NodeSet(self, name, nodes):
+        self.nodeSets[name] = OdbSet(name, self, node_labels=[n.label for n in nodes])
+        return self.nodeSets[name]
+
+    def ElementSet(self, name, elements):
+        self.elementSets[name] = OdbSet(name, self, element_labels=[e.label for e in elements])
+        return self.elementSets[name]
+
+    def NodeSetFromNodeLabels(self, name, nodeLabels):
+        self.nodeSets[name] = OdbSet(name, self, node_labels=nodeLabels)
+        return self.nodeSets[name]
+
+    def ElementSetFromElementLabels(self, name, elementLabels):
+        self.elementSets[name] = OdbSet(name, self, element_labels=elementLabels)
+        return self.elementSets[name]
+
+
+class OdbPart(_MeshContainer):
+    pass
+
+
+class OdbInstance(_MeshContainer):
+    pass
+
+
+class DatumCsys(object):
+    def __init__(self, name, coordSysType, origin, point1, point2):
+        self.name = name
+        self.coordSysType = coordSysType
+        self.origin = origin
+        self.point1 = point1
+        self.point2 = point2
+
+
+class OdbAssembly(object):
+    def __init__(self):
+        self.instances = Repository()
+        self.nodeSets = Repository()
+        self.elementSets = Repository()
+        self.datumCsyses = Repository()
+
+    def Instance(self, name, object):
+        instance = OdbInstance(name, object.embeddedSpace, object.type)
+        instance.node_labels = object.node_labels.copy()
+        instance.node_coordinates = object.node_coordinates.copy()
+        instance.element_blocks = [dict(block) for block in object.element_blocks]
+        for set_name, node_set in object.nodeSets.items():
+            instance.NodeSetFromNodeLabels(set_name, node_set.node_labels)
+        for set_name, element_set in object.elementSets.items():
+            instance.ElementSetFromElementLabels(set_name, element_set.element_labels)
+        self.instances[name] = instance
+        return instance
+
+    def DatumCsysByThreePoints(self, name, coordSysType, origin, point1, point2):
+        self.datumCsyses[name] = DatumCsys(name, coordSysType, origin, point1, point2)
+        return self.datumCsyses[name]
+
+
+class FieldValue(object):
+    def __init__(self, block, i):
+        data = block['data'][i]
+        self.data = float(data[0]) if block['type'] == SCALAR else data
+        self.position = block['position']
+        self.instance = block['instance']
+        self.elementLabel = int(block['element_labels'][i]) if block['position'] != NODAL else None
+        self.nodeLabel = int(block['node_labels'][i]) if block['position'] in [NODAL, ELEMENT_NODAL] else None
+        self.integrationPoint = int(block['integration_points'][i]) if block['position'] != NODAL else None
+        self.type = block['type']
+
+
+class FieldBulkData(object):
+    def __init__(self, block):
+        self.data = block['data']
+        self.position = block['position']
+        self.instance = block['instance']
+        self.baseElementType = block['element_type']
+        self.elementLabels = block['element_labels']
+        self.nodeLabels = block['node_labels']
+        self.integrationPoints = block['integration_points']
+        self.type = block['type']
+        self.componentLabels = component_labels[block['type']]
+
+
+class FieldLocation(object):
+    def __init__(self, position):
+        self.position = position
+
+
+class FieldOutput(object):
+    def __init__(self, name, description, type, validInvariants=None, componentLabels=None):
+        self.name = name
+        self.description = description
+        self.type = type
+        self.validInvariants = validInvariants or []
+        self.componentLabels = componentLabels or component_labels[type]
+        self.blocks = []
+
+    @property
+    def locations(self):
+        return [FieldLocation(position) for position in sorted(set(block['position'] for block in self.blocks))]
+
+    def addData(self, position, instance, labels, data):
+        labels = np.asarray(labels, dtype=int)
+        data = np.asarray(data, dtype=np.float32)
+        data = data.reshape(data.shape[0], -1)
+        values_per_label = data.shape[0] // max(labels.shape[0], 1)
+        if values_per_label * labels.shape[0] != data.shape[0]:
+            raise OdbError('The number of data values does not match the number of labels')
+        value_labels = np.repeat(labels, values_per_label)
+        point_numbers = np.tile(np.arange(1, values_per_label + 1), labels.shape[0])
+        if position == NODAL:
+            blocks = [(None, np.ones(labels.shape[0], dtype=bool))]
+            value_labels = labels
+        else:
+            types = instance.element_types(value_labels)
+            blocks = [(element_type, types == element_type) for element_type in sorted(set(types))]
+        for element_type, rows in blocks:
+            self.blocks.append({'position': position, 'instance': instance, 'element_type': element_type,
+                                'type': self.type, 'data': data[rows],
+                                'element_labels': (value_labels[rows] if position != NODAL else np.zeros(0, dtype=int)),
+                                'node_labels': (value_labels[rows] if position == NODAL else np.zeros(0, dtype=int)),
+                                'integration_points': (point_numbers[rows] if position != NODAL
+                                                       else np.zeros(0, dtype=int))})
+
+    def _subset(self, block_filter):
+        field = FieldOutput(self.name, self.description, self.type, self.validInvariants, self.componentLabels)
+        for block in self.blocks:
+            rows = block_filter(block)
+            if rows is not None and np.any(rows):
+                new_block = dict(block)
+                for key in ['data', 'element_labels', 'node_labels', 'integration_points']:
+                    if block[key].shape[0] == block['data'].shape[0]:
+                        new_block[key] = block[key][rows]
+                field.blocks.append(new_block)
+        return field
+
+    def getSubset(self, position=None, region=None, elementType=None):
+        field = self
+        if position is not None:
+            field = field._subset(lambda block: (np.ones(block['data'].shape[0], dtype=bool)
+                                                 if block['position'] == position else None))
+        if region is not None:
+            field = field._subset(lambda block: _region_rows(block, region))
+        return field
+
+    def getTransformedField(self, datumCsys, deformationField=None):
+        return self
+
+    @property
+    def values(self):
+        values = []
+        for block in self.blocks:
+            values.extend(FieldValue(block, i) for i in range(block['data'].shape[0]))
+        return values
+
+    @property
+    def bulkDataBlocks(self):
+        return [FieldBulkData(block) for block in self.blocks]
+
+
+def _region_rows(block, region):
+    if isinstance(region, OdbInstance):
+        return None if block['instance'].name != region.name else np.ones(block['data'].shape[0], dtype=bool)
+    if block['instance'].name != region.instance_name:
+        return None
+    if block['position'] == NODAL:
+        return np.isin(block['node_labels'], region.node_labels)
+    return np.isin(block['element_labels'], region.element_labels)
+
+
+class OdbFrame(object):
+    def __init__(self, frame_id, incrementNumber, frameValue, description=''):
+        self.frameId = frame_id
+        self.incrementNumber = incrementNumber
+        self.frameValue = frameValue
+        self.description = description
+        self.fieldOutputs = Repository()
+
+    def FieldOutput(self, name, description, type, validInvariants=None, componentLabels=None):
+        self.fieldOutputs[name] = FieldOutput(name, description, type, validInvariants, componentLabels)
+        return self.fieldOutputs[name]
+
+
+class OdbStep(object):
+    def __init__(self, name, description, domain, timePeriod=1.):
+        self.name = name
+        self.description = description
+        self.domain = domain
+        self.timePeriod = timePeriod
+        self.frames = []
+
+    def Frame(self, incrementNumber, frameValue, description=''):
+        self.frames.append(OdbFrame(len(self.frames), incrementNumber, frameValue, description))
+        return self.frames[-1]
+
+
+class Odb(object):
+    def __init__(self, name, path, analysisTitle='', description=''):
+        self.name = name
+        self.path = os.path.abspath(path)
+        self.analysisTitle = analysisTitle
+        self.description = description
+        self.parts = Repository()
+        self.rootAssembly = OdbAssembly()
+        self.steps = Repository()
+        self.isReadOnly = False
+        self.save()
+
+    def Part(self, name, embeddedSpace, type):
+        self.parts[name] = OdbPart(name, embeddedSpace, type)
+        return self.parts[name]
+
+    def Step(self, name, description, domain, timePeriod=1.):
+        self.steps[name] = OdbStep(name, description, domain, timePeriod)
+        return self.steps[name]
+
+    def update(self):
+        pass
+
+    def save(self):
+        if self.isReadOnly:
+            raise OdbError('The odb ' + self.path + ' is opened read only and cannot be saved')
+        temporary_file_name = self.path + '.' + str(os.getpid()) + '.tmp'
+        with open(temporary_file_name, 'wb') as odb_file:
+            pickle.dump(self, odb_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_file_name, self.path)
+
+    def close(self):
+        pass
+
+
+# The opened odbs, used as session.odbs by the stand-in visualization module
+opened_odbs = Repository()
+
+
+def openOdb(path, readOnly=False):
+    with open(path, 'rb') as odb_file:
+        odb = pickle.load(odb_file)
+    odb.path = os.path.abspath(path)
+    odb.isReadOnly = readOnly
+    opened_odbs[odb.path] = odb
+    return odb
@@ -0,0 +1,131 @@
+"""
+Functions for creating synthetic odb files for the stub odbAccess module. The mesh is a structured block of C3D8
+elements with 8 integration points and the field values are simple functions of the labels and the frame value so
+that the data read from the odb can be checked in the tests
+"""
+from __future__ import print_function, division
+
+import numpy as np
+
+import odbAccess
+from abaqusConstants import DEFORMABLE_BODY, THREE_D, TIME, INTEGRATION_POINT, NODAL, SCALAR, VECTOR, TENSOR_3D_FULL
+
+field_definitions = {'S': (TENSOR_3D_FULL, INTEGRATION_POINT),
+                     'E': (TENSOR_3D_FULL, INTEGRATION_POINT),
+                     'PEEQ': (SCALAR, INTEGRATION_POINT),
+                     'TEMP': (SCALAR, INTEGRATION_POINT),
+                     'IVOL': (SCALAR, INTEGRATION_POINT),
+                     'U': (VECTOR, NODAL),
+                     'NT11': (SCALAR, NODAL)}
+
+
+def block_mesh(elements_per_side=(2, 2, 2), size=(1., 1., 1.)):
+    """
+    Creates a structured hexahedral mesh
+
+    :param elements_per_side:   Number of elements along x, y and z
+    :param size:                The size of the block
+    :return:                    node labels, nodal coordinates, element labels and element connectivity
+    """
+    nx, ny, nz = elements_per_side
+    x, y, z = np.meshgrid(np.linspace(0, size[0], nx + 1), np.linspace(0, size[1], ny + 1),
+                          np.linspace(0, size[2], nz + 1), indexing='ij')
+    node_coordinates = np.column_stack([x.flatten(), y.flatten(), z.flatten()])
+    node_labels = np.arange(1, node_coordinates.shape[0] + 1)
+    node_index = node_labels.reshape(nx + 1, ny + 1, nz + 1)
+    i, j, k = np.meshgrid(np.arange(nx), np.arange(ny), np.arange(nz), indexing='ij')
+    i, j, k = i.flatten(), j.flatten(), k.flatten()
+    connectivity = np.column_stack([node_index[i, j, k], node_index[i + 1, j, k], node_index[i + 1, j + 1, k],
+                                    node_index[i, j + 1, k], node_index[i, j, k + 1], node_index[i + 1, j, k + 1],
+                                    node_index[i + 1, j + 1, k + 1], node_index[i, j + 1, k + 1]])
+    element_labels = np.arange(1, connectivity.shape[0] + 1)
+    return node_labels, node_coordinates, element_labels, connectivity
+
+
+def split_block_mesh(element_type, elements_per_side=(2, 2, 2), size=(1., 1., 1.)):
+    """
+    Creates a structured mesh of tetrahedral or wedge elements by splitting the elements of block_mesh. Quadratic
+    elements are created by adding nodes at the middle of the element edges
+
+    :param element_type:        One of 'C3D4', 'C3D10', 'C3D6', 'C3D8' and 'C3D20'
+    :return:                    node labels, nodal coordinates, element labels and element connectivity
+    """
+    node_labels, node_coordinates, _, hexahedra = block_mesh(elements_per_side, size)
+    if element_type in ['C3D4', 'C3D10']:
+        # Six tetrahedra around the diagonal from the first to the seventh node of the hexahedron
+        local_nodes = [(0, 1, 2, 6), (0, 2, 3, 6), (0, 3, 7, 6), (0, 7, 4, 6), (0, 4, 5, 6), (0, 5, 1, 6)]
+        edges = [(0, 1), (1, 2), (2, 0), (0, 3), (1, 3), (2, 3)]
+    elif element_type == 'C3D6':
+        local_nodes = [(0, 1, 2, 4, 5, 6), (0, 2, 3, 4, 6, 7)]
+        edges = []
+    else:
+        local_nodes = [tuple(range(8))]
+        edges = [(0, 1), (1, 2), (2, 3), (3, 0), (4, 5), (5, 6), (6, 7), (7, 4), (0, 4), (1, 5), (2, 6), (3, 7)]
+    connectivity = np.vstack([hexahedra[:, nodes] for nodes in local_nodes])
+    if element_type in ['C3D4', 'C3D10']:
+        # Abaqus orders the nodes so that the volume is positive
+        edge_vectors = node_coordinates[connectivity[:, 1:] - 1] - node_coordinates[connectivity[:, :1] - 1]
+        negative = np.linalg.det(edge_vectors) < 0
+        connectivity[negative, 1], connectivity[negative, 2] = connectivity[negative, 2], connectivity[negative, 1].copy()
+    if element_type in ['C3D10', 'C3D20']:
+        edge_nodes = np.sort(np.stack([connectivity[:, list(edge)] for edge in edges], axis=1), axis=2)
+        unique_edges, edge_index = np.unique(edge_nodes.reshape(-1, 2), axis=0, return_inverse=True)
+        mid_labels = node_labels.shape[0] + 1 + np.arange(unique_edges.shape[0])
+        node_coordinates = np.vstack([node_coordinates, node_coordinates[unique_edges - 1].mean(axis=1)])
+        node_labels = np.concatenate([node_labels, mid_labels])
+        connectivity = np.hstack([connectivity, mid_labels[edge_index.reshape(connectivity.shape[0], -1)]])
+    element_labels = np.arange(1, connectivity.shape[0] + 1)
+    return node_labels, node_coordinates, element_labels, connectivity
+
+
+def field_values(field_id, labels, points_per_label, frame_value):
+    """
+    The data written to the synthetic odb for a field. Value of component i at integration point p of element e is
+    e + 0.1*p + 1000*i + frame_value and at node n it is n + 1000*i + frame_value
+    """
+    field_type, _ = field_definitions[field_id]
+    number_of_components = {SCALAR: 1, VECTOR: 3, TENSOR_3D_FULL: 6}[field_type]
+    point_numbers = np.tile(np.arange(1, points_per_label + 1), len(labels)) if points_per_label > 1 else 0.
+    label_values = np.repeat(labels, points_per_label) + 0.1*point_numbers
+    data = label_values[:, np.newaxis] + 1000.*np.arange(number_of_components) + frame_value
+    if field_id == 'E':
+        data *= 1e-6
+    return data
+
+
+def create_synthetic_odb(odb_file_name, elements_per_side=(2, 2, 2), step_names=('step-1', ),
+                         frames_per_step=3, field_ids=('S', 'PEEQ', 'U'), instance_name='PART-1-1'):
+    """
+    Creates an odb file with a single instance, one node set and one element set and field output in every frame
+
+    :param odb_file_name:       Filename of the odb to create
+    :param elements_per_side:   Number of elements along x, y and z
+    :param step_names:          Names of the steps to create
+    :param frames_per_step:     Number of frames in each step, the frame value of frame i is i/(frames_per_step - 1)
+    :param field_ids:           Fields to write to every frame, available fields are given in field_definitions
+    :param instance_name:       Name of the part and the instance
+    :return:                    Nothing
+    """
+    odb_file_name = str(odb_file_name)
+    node_labels, node_coordinates, element_labels, connectivity = block_mesh(elements_per_side)
+    odb = odbAccess.Odb(name=instance_name, path=odb_file_name)
+    part = odb.Part(name=instance_name, embeddedSpace=THREE_D, type=DEFORMABLE_BODY)
+    part.addNodes(labels=node_labels, coordinates=node_coordinates)
+    part.addElements(labels=element_labels, connectivity=connectivity, type='C3D8')
+    part.NodeSetFromNodeLabels(name='TOP_NODES',
+                               nodeLabels=node_labels[node_coordinates[:, 2] == node_coordinates[:, 2].max()])
+    part.ElementSetFromElementLabels(name='HALF_ELEMENTS', elementLabels=element_labels[:len(element_labels)//2])
+    instance = odb.rootAssembly.Instance(name=instance_name, object=part)
+    for step_name in step_names:
+        step = odb.Step(name=step_name, description='', domain=TIME, timePeriod=1.)
+        for frame_number in range(frames_per_step):
+            frame_value = frame_number/max(frames_per_step - 1, 1)
+            frame = step.Frame(incrementNumber=frame_number, frameValue=frame_value)
+            for field_id in field_ids:
+                field_type, position = field_definitions[field_id]
+                field = frame.FieldOutput(name=field_id, description='', type=field_type)
+                labels, points = (node_labels, 1) if position == NODAL else (element_labels, 8)
+                field.addData(position=position, instance=instance, labels=labels,
+                              data=field_values(field_id, labels, points, frame_value))
+    odb.save()
+    odb.close()
@@ -0,0 +1,71 @@
+"""
+Stand-in for the abaqus visualization module providing the session used by the viewer scripts. Only a viewport with an
+odb display and paths are implemented
+"""
+from __future__ import print_function, division
+
+import odbAccess
+
+
+class OdbDisplay(object):
+    def __init__(self):
+        self.step = 0
+        self.frame = 0
+        self.variable = None
+        self.output_position = None
+        self.component = None
+
+    def setPrimaryVariable(self, variableLabel, outputPosition, refinement=None):
+        self.variable = variableLabel
+        self.output_position = outputPosition
+        self.component = None if refinement is None else refinement[1]
+
+    def setFrame(self, step, frame):
+        self.step = step
+        self.frame = frame
+
+
+class Viewport(object):
+    def __init__(self, name):
+        self.name = name
+        self.displayedObject = None
+        self.odbDisplay = OdbDisplay()
+
+    def makeCurrent(self):
+        session.currentViewportName = self.name
+
+    def maximize(self):
+        pass
+
+    def setValues(self, displayedObject):
+        self.displayedObject = displayedObject
+
+
+class Path(object):
+    def __init__(self, name, type, expression):
+        self.name = name
+        self.type = type
+        self.expression = tuple(expression)
+
+
+class Session(object):
+    def __init__(self):
+        self.viewports = odbAccess.Repository()
+        self.paths = odbAccess.Repository()
+        self.xyDataObjects = odbAccess.Repository()
+        self.currentViewportName = None
+
+    @property
+    def odbs(self):
+        return odbAccess.opened_odbs
+
+    def Viewport(self, name, origin=None, width=None, height=None):
+        self.viewports[name] = Viewport(name)
+        return self.viewports[name]
+
+    def Path(self, name, type, expression):
+        self.paths[name] = Path(name, type, expression)
+        return self.paths[name]
+
+
+session = Session()
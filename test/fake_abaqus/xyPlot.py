@@ -0,0 +1,27 @@
+"""
+Stand-in for the abaqus xyPlot module. The field is not interpolated along the path, the value at a point is
+1000*component index + frame value + distance along the path so that the tests can check which component and frame
+the data is taken from
+"""
+from __future__ import print_function, division
+
+import numpy as np
+
+from visualization import session
+
+
+def XYDataFromPath(name, path, labelType, shape, pathStyle, includeIntersections=False):
+    viewport = session.viewports[session.currentViewportName]
+    display = viewport.odbDisplay
+    odb = viewport.displayedObject
+    step = odb.steps[odb.steps.keys()[display.step]]
+    frame = step.frames[display.frame]
+    field = frame.fieldOutputs[display.variable]
+    component_index = 0
+    if display.component is not None:
+        component_index = list(field.componentLabels).index(display.component[len(display.variable):])
+    points = np.array(path.expression, dtype=float)
+    distances = np.concatenate([[0.], np.cumsum(np.linalg.norm(np.diff(points, axis=0), axis=1))])
+    xy_data = [(distance, 1000.*component_index + frame.frameValue + distance) for distance in distances]
+    session.xyDataObjects[name] = xy_data
+    return xy_data
@@ -0,0 +1,32 @@
+"""
+Common setup of the tests that run the abaqus python scripts with the stand-in abaqus in fake_abaqus. Importing the
+module puts the stub abaqus modules and synthetic_odb on the path
+"""
+import pathlib
+import sys
+import tempfile
+import unittest
+
+fake_abaqus_directory = pathlib.Path(__file__).parent / 'fake_abaqus'
+if str(fake_abaqus_directory) not in sys.path:
+    sys.path.insert(0, str(fake_abaqus_directory))
+fake_abq_command = sys.executable + ' ' + str(fake_abaqus_directory / 'abq.py')
+
+
+class SyntheticOdbTestCase(unittest.TestCase):
+    # Keyword arguments of create_synthetic_odb for the odb of the test case
+    odb_arguments = {}
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Creates the synthetic odb odb_file_name in a temporary directory that is shared by the tests of the class
+        """
+        from synthetic_odb import create_synthetic_odb
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.odb_file_name = pathlib.Path(cls.directory.name) / 'synthetic.odb'
+        create_synthetic_odb(cls.odb_file_name, **cls.odb_arguments)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
@@ -0,0 +1,83 @@
+import asyncio
+import pathlib
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+from fake_abaqus_case import fake_abq_command
+
+
+class TestAsyncInterface(unittest.TestCase):
+    def setUp(self):
+        from synthetic_odb import create_synthetic_odb
+        self.directory = tempfile.TemporaryDirectory()
+        self.odb_file_name = pathlib.Path(self.directory.name) / 'synthetic.odb'
+        create_synthetic_odb(self.odb_file_name, step_names=('load', 'unload'), frames_per_step=4)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_concurrent_reads(self):
+        from abaqus_interface import AsyncABQInterface
+
+        async def read():
+            abq = AsyncABQInterface(fake_abq_command, max_processes=2)
+            steps, frames, *data = await asyncio.gather(
+                abq.get_steps(self.odb_file_name), abq.get_frames(self.odb_file_name, 'load'),
+                *[abq.read_data_from_odb('S', self.odb_file_name, step_name='load', frame_number=i) for i in range(4)])
+            return steps, frames, data
+
+        steps, frames, data = asyncio.run(read())
+        self.assertEqual(steps, ['load', 'unload'])
+        self.assertEqual(list(frames), [0, 1, 2, 3])
+        for i, frame_data in enumerate(data):
+            self.assertEqual(frame_data.shape, (64, 6))
+            self.assertAlmostEqual(frame_data[9, 2], 2 + 0.2 + 2000 + i/3, places=3)
+
+    def test_interface_created_outside_loop(self):
+        from abaqus_interface import AsyncABQInterface
+        abq = AsyncABQInterface(fake_abq_command, max_processes=1)
+
+        async def read():
+            return await asyncio.gather(*[abq.read_data_from_odb('PEEQ', self.odb_file_name, frame_number=i)
+                                          for i in range(3)])
+
+        # The calls contend for the process semaphore, in two different event loops
+        for _ in range(2):
+            data = asyncio.run(read())
+            self.assertEqual([frame_data.shape for frame_data in data], 3*[(64, )])
+
+    def test_write_data(self):
+        from abaqus_interface import AsyncABQInterface
+
+        async def write_and_read():
+            abq = AsyncABQInterface(fake_abq_command)
+            await abq.write_data_to_odb(np.arange(9.), 'SDV1', self.odb_file_name, 'written', position='NODAL',
+                                        set_name='TOP_NODES', frame_value=1.)
+            return await abq.read_data_from_odb('SDV1', self.odb_file_name, 'written', position='NODAL',
+                                                set_name='TOP_NODES')
+
+        np.testing.assert_array_equal(asyncio.run(write_and_read()), np.arange(9.))
+
+    def test_cancellation(self):
+        from abaqus_interface import AsyncABQInterface
+
+        async def cancel():
+            abq = AsyncABQInterface("sh -c 'sleep 30' --")
+            task = asyncio.ensure_future(abq.get_steps(self.odb_file_name))
+            await asyncio.sleep(0.5)
+            self.assertEqual(len(list(pathlib.Path(self.directory.name).glob('*_tempdir*'))), 1)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        start_time = time.monotonic()
+        asyncio.run(cancel())
+        self.assertLess(time.monotonic() - start_time, 10.)
+        self.assertEqual(list(pathlib.Path(self.directory.name).glob('*_tempdir*')), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
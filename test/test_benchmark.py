@@ -0,0 +1,55 @@
+import pathlib
+import subprocess
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent))
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_run_benchmarks(self):
+        from benchmark import run_benchmarks
+        results = run_benchmarks(elements_per_side=(2, 2, 2), frames=1, repeats=1)
+        self.assertEqual([result.name for result in results],
+                         ['read_field_from_odb', 'write_field_to_odb', 'create_odb', 'copy_odb',
+                          'ABQInterface.read_data_from_odb', 'ABQInterface.write_data_to_odb'])
+        for result in results:
+            self.assertGreater(result.time, 0)
+            self.assertGreater(result.peak_memory, 0)
+        self.assertEqual(results[0].values, 2*2*2*8*6)
+        self.assertIsNone(results[0].abaqus_peak_memory)
+        for result in results[4:]:
+            self.assertGreater(result.abaqus_peak_memory, 0)
+
+    def test_abaqus_peak_memory(self):
+        from benchmark import fake_abq_command, measure
+        with tempfile.TemporaryDirectory() as directory:
+            script_name = pathlib.Path(directory) / 'allocate.py'
+            script_name.write_text('import sys\nimport numpy as np\nnp.ones(int(sys.argv[-1])*2**20//8)\n')
+
+            def run_abaqus(megabytes):
+                subprocess.run(fake_abq_command.split() + ['python', str(script_name), str(megabytes)], check=True)
+
+            large = measure('large', 1, lambda _: run_abaqus(200), repeats=1, abaqus=True)
+            small = measure('small', 1, lambda _: run_abaqus(1), repeats=1, abaqus=True)
+        # The peak memory is measured for the processes of each call and not for all child processes so far
+        self.assertGreater(large.abaqus_peak_memory - small.abaqus_peak_memory, 150*2**20)
+
+    def test_compare(self):
+        from benchmark import BenchmarkResult, compare
+        baseline = {'read': {'values_per_second': 100., 'peak_memory': 100, 'abaqus_peak_memory': None},
+                    'write': {'values_per_second': 100., 'peak_memory': 100, 'abaqus_peak_memory': 100},
+                    'export': {'values_per_second': 100., 'peak_memory': 100, 'abaqus_peak_memory': 100}}
+        results = [BenchmarkResult('read', 100, 1., 90., 110, None), BenchmarkResult('write', 100, 1., 70., 100, 100),
+                   BenchmarkResult('export', 100, 1., 100., 100, 150), BenchmarkResult('new', 100, 1., 10., 0, None)]
+        ratios, memory_ratios, regressions = compare(results, baseline, tolerance=0.2)
+        self.assertEqual(ratios, {'read': 0.9, 'write': 0.7, 'export': 1.})
+        self.assertEqual(memory_ratios, {'read': {'peak_memory': 1.1},
+                                         'write': {'peak_memory': 1., 'abaqus_peak_memory': 1.},
+                                         'export': {'peak_memory': 1., 'abaqus_peak_memory': 1.5}})
+        self.assertEqual(regressions, ['write', 'export'])
+
+
+if __name__ == '__main__':
+    unittest.main()
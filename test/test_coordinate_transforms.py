@@ -0,0 +1,60 @@
+import unittest
+
+import numpy as np
+
+
+class TestCoordinateTransforms(unittest.TestCase):
+    def test_cartesian_and_cylindrical(self):
+        from abaqus_interface.abaqus_interface import CoordinateSystem, cylindrical_system_z
+        from abaqus_interface.coordinate_transforms import CoordinateTransformer
+        points = np.array([[0., 2., 5.], [-3., 0., 1.]])
+        transformer = CoordinateTransformer(points)
+        rotated = CoordinateSystem('rotated', (0., 0., 0.), (0., 1., 0.), (-1., 0., 0.), 'CARTESIAN')
+        vectors = np.array([[1., 0., 0.], [0., 0., 1.]])
+        np.testing.assert_allclose(transformer.transform(vectors, rotated), [[0., -1., 0.], [0., 0., 1.]], atol=1e-12)
+        np.testing.assert_allclose(transformer.transform(vectors, cylindrical_system_z),
+                                   [[0., -1., 0.], [0., 0., 1.]], atol=1e-12)
+        # A uniaxial stress in x is a hoop stress at the y-axis and a radial stress at the x-axis
+        stresses = np.array([[100., 0., 0., 0., 0., 0.], [100., 0., 0., 0., 0., 0.]])
+        np.testing.assert_allclose(transformer.transform(stresses, cylindrical_system_z),
+                                   [[0., 100., 0., 0., 0., 0.], [100., 0., 0., 0., 0., 0.]], atol=1e-12)
+        self.assertIs(transformer.rotation_matrices(cylindrical_system_z),
+                      transformer.rotation_matrices(cylindrical_system_z))
+
+        # The point (0, 2) displaced to (2, 0) has the radial direction x
+        deformed = transformer.transform(stresses, cylindrical_system_z, displacements=[[2., -2., 0.], [0., 0., 0.]])
+        np.testing.assert_allclose(deformed[0], [100., 0., 0., 0., 0., 0.], atol=1e-12)
+
+    def test_from_instance(self):
+        from abaqus_interface.abaqus_interface import OdbInstance, cylindrical_system_z
+        from abaqus_interface.coordinate_transforms import CoordinateTransformer
+        instance = OdbInstance.from_arrays('PART-1-1', [1, 2, 3, 4], [[1., 0., 0.], [0., 1., 0.], [-1., 0., 0.],
+                                                                      [0., -1., 0.]],
+                                           {'C3D4': ([1], [[1, 2, 3, 4]])})
+        transformer = CoordinateTransformer.from_instance(instance, node_labels=[4, 2])
+        np.testing.assert_allclose(transformer.transform(np.array([[0., -1., 0.], [0., -1., 0.]]),
+                                                         cylindrical_system_z), [[1., 0., 0.], [-1., 0., 0.]],
+                                   atol=1e-12)
+        with self.assertRaises(ValueError):
+            CoordinateTransformer.from_instance(instance, node_labels=[5])
+
+    def test_tensor_rotation(self):
+        from abaqus_interface.abaqus_interface import CoordinateSystem
+        from abaqus_interface.coordinate_transforms import rotation_matrices, transform_tensors
+        system = CoordinateSystem('tilted', (1., 1., 1.), (2., 2., 1.), (0., 2., 3.), 'CARTESIAN')
+        data = np.random.default_rng(0).normal(size=(5, 6))
+        matrices = rotation_matrices(system, np.zeros((5, 3)))
+        np.testing.assert_allclose(np.einsum('pij,pkj->pik', matrices, matrices), np.tile(np.eye(3), (5, 1, 1)),
+                                   atol=1e-12)
+        rotated = transform_tensors(data, matrices)
+        tensors = data[:, [0, 3, 4, 3, 1, 5, 4, 5, 2]].reshape(-1, 3, 3)
+        np.testing.assert_allclose(rotated[:, [0, 3, 4, 3, 1, 5, 4, 5, 2]].reshape(-1, 3, 3),
+                                   matrices @ tensors @ matrices.transpose(0, 2, 1), atol=1e-12)
+        # The invariants are unchanged
+        np.testing.assert_allclose(rotated[:, :3].sum(axis=1), data[:, :3].sum(axis=1))
+        strains = transform_tensors(data, matrices, engineering_shear=True)
+        np.testing.assert_allclose(strains[:, 3:]/2, transform_tensors(data*[1, 1, 1, .5, .5, .5], matrices)[:, 3:])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import pathlib
+import pstats
+import unittest
+
+import numpy as np
+
+from fake_abaqus_case import fake_abq_command, SyntheticOdbTestCase
+
+
+class TestInstrumentation(SyntheticOdbTestCase):
+
+    def test_call_stats(self):
+        from abaqus_interface import ABQInterface
+        from abaqus_interface.common import AbaqusError
+        from abaqus_interface.instrumentation import Instrumentation
+        recorded = []
+        instrumentation = Instrumentation(callback=recorded.append)
+        abq = ABQInterface(fake_abq_command, instrumentation=instrumentation)
+        reference = ABQInterface(fake_abq_command).read_data_from_odb('S', self.odb_file_name)
+        np.testing.assert_array_equal(abq.read_data_from_odb('S', self.odb_file_name), reference)
+        abq.read_data_from_odb('S', self.odb_file_name, frame_number=0)
+        abq.get_steps(self.odb_file_name)
+        self.assertEqual([stats.method for stats in recorded], ['read_data_from_odb', 'read_data_from_odb',
+                                                                'get_steps'])
+        stats = recorded[0]
+        self.assertEqual(stats.abaqus_calls, 1)
+        for name in ['abaqus', 'abaqus_startup', 'abaqus_shutdown', 'load_data']:
+            self.assertGreaterEqual(stats.client_phases[name], 0.)
+        for name in ['open_odb', 'read_values', 'save_data']:
+            self.assertIn(name, stats.abaqus_phases)
+        # The odb is opened read only and is not saved by a read
+        self.assertNotIn('save_odb', stats.abaqus_phases)
+        self.assertLess(stats.client_phases['abaqus'], stats.total)
+        self.assertGreaterEqual(stats.client_other, 0.)
+        counts, _ = instrumentation.histogram('read_data_from_odb', bins=3)
+        self.assertEqual(counts.sum(), 2)
+        self.assertEqual(instrumentation.summary()['get_steps']['calls'], 1)
+        with self.assertRaises(ValueError):
+            stats.dump_profile(pathlib.Path(self.directory.name) / 'missing.prof')
+
+        with self.assertRaises(AbaqusError):
+            abq.read_data_from_odb('S', self.odb_file_name, set_name='MISSING_SET')
+        self.assertEqual(recorded[-1].abaqus_calls, 1)
+        self.assertIn('open_odb', recorded[-1].abaqus_phases)
+
+    def test_profile_with_worker(self):
+        from abaqus_interface import ABQInterface
+        from abaqus_interface.instrumentation import Instrumentation
+        instrumentation = Instrumentation(profile=True)
+        with ABQInterface(fake_abq_command, persistent=True, instrumentation=instrumentation) as abq:
+            abq.read_data_from_odb('S', self.odb_file_name)
+        stats = instrumentation.last_stats
+        self.assertIn('read_values', stats.abaqus_phases)
+        profile_file_name = pathlib.Path(self.directory.name) / 'read.prof'
+        stats.dump_profile(profile_file_name)
+        functions = [function for _, _, function in pstats.Stats(str(profile_file_name)).stats]
+        self.assertIn('read_field_from_odb', functions)
+
+    def test_stream(self):
+        from abaqus_interface import ABQInterface
+        from abaqus_interface.instrumentation import current_stats, Instrumentation
+        recorded = []
+        abq = ABQInterface(fake_abq_command, instrumentation=Instrumentation(callback=recorded.append))
+        chunks = abq.stream_data_from_odb('S', self.odb_file_name, chunk_size=10)
+        next(chunks)
+        # The stats are not current in the caller between the chunks
+        self.assertIsNone(current_stats())
+        self.assertEqual(recorded, [])
+        self.assertEqual(sum(chunk.data.shape[0] for chunk in chunks), 54)
+        self.assertEqual([stats.method for stats in recorded], ['stream_data_from_odb'])
+        stats = recorded[0]
+        self.assertEqual(stats.abaqus_calls, 1)
+        self.assertGreater(stats.client_phases['abaqus'], 0.)
+        self.assertIn('open_odb', stats.abaqus_phases)
+        self.assertGreaterEqual(stats.total, stats.client_phases['abaqus'])
+
+
+if __name__ == '__main__':
+    unittest.main()
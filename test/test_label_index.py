@@ -0,0 +1,68 @@
+import pathlib
+import unittest
+
+import numpy as np
+
+from fake_abaqus_case import fake_abq_command
+
+
+class TestLabelIndex(unittest.TestCase):
+    def test_reorder_and_scatter(self):
+        from abaqus_interface.label_index import LabelIndex
+        source = LabelIndex(np.repeat([3, 1, 2], 2))
+        np.testing.assert_array_equal(source.points, [1, 2, 1, 2, 1, 2])
+        data = 10*source.labels + source.points
+        target = LabelIndex.from_mesh_labels([1, 2, 3, 4], points_per_label=2)
+        reordered = source.reorder(data, target)
+        np.testing.assert_array_equal(reordered[:6], [11, 12, 21, 22, 31, 32])
+        self.assertTrue(np.all(np.isnan(reordered[6:])))
+        np.testing.assert_array_equal(target.scatter(data, source, fill_value=0), [11, 12, 21, 22, 31, 32, 0, 0])
+        out = np.full((8, 2), -1.)
+        target.scatter(np.column_stack([data, data]), source, out=out)
+        np.testing.assert_array_equal(out[6:], -1)
+        np.testing.assert_array_equal(source.rows([2, 3], [2, 1]), [5, 0])
+        np.testing.assert_array_equal(source.rows([4], missing='ignore'), [-1])
+        # Points that are not in the index are not found, with the stride 3 the keys of label 2 with point 4 and label 3
+        # with point -2 are the keys of label 3 with point 1 and of label 2 with point 1
+        np.testing.assert_array_equal(source.rows([2, 1, 3], [4, 0, -2], missing='ignore'), [-1, -1, -1])
+        with self.assertRaises(ValueError):
+            source.rows([4])
+        with self.assertRaises(ValueError):
+            LabelIndex([1, 1], [1, 1])
+
+    def test_different_number_of_points(self):
+        from abaqus_interface.label_index import LabelIndex
+        full = LabelIndex(np.repeat([2, 1], 8))
+        data = np.arange(16.)
+        reduced, averaged = full.averaged(data)
+        np.testing.assert_array_equal(reduced.labels, [1, 2])
+        np.testing.assert_array_equal(averaged, [11.5, 3.5])
+        # Data at a single point per element is given to all points of the elements
+        np.testing.assert_array_equal(reduced.reorder(averaged, full), np.repeat([3.5, 11.5], 8))
+
+    def test_align_odbs(self):
+        import tempfile
+        from synthetic_odb import create_synthetic_odb
+        from abaqus_interface import ABQInterface
+        from abaqus_interface.label_index import LabelIndex
+        with tempfile.TemporaryDirectory() as directory:
+            odb_file_name = pathlib.Path(directory) / 'synthetic.odb'
+            create_synthetic_odb(odb_file_name)
+            abq = ABQInterface(fake_abq_command)
+            data, label_index = abq.read_data_from_odb('S', odb_file_name, get_label_index=True)
+            self.assertEqual(len(label_index), data.shape[0])
+            data, _, element_labels, same_index = abq.read_data_from_odb('S', odb_file_name, frame_number=1,
+                                                                         get_position_numbers=True,
+                                                                         get_label_index=True)
+            self.assertIs(same_index, label_index)
+            np.testing.assert_array_equal(label_index.labels, element_labels)
+            target = LabelIndex.from_mesh_labels([8, 7, 6, 5, 4, 3, 2, 1], points_per_label=8)
+            reordered = label_index.reorder(data, target)
+            np.testing.assert_array_equal(reordered[:8], data[-8:])
+            half_data, half_index = abq.read_data_from_odb('S', odb_file_name, set_name='HALF_ELEMENTS',
+                                                           get_label_index=True)
+            np.testing.assert_array_equal(label_index.scatter(half_data, half_index)[:32], half_data)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import pathlib
+import tempfile
+import unittest
+
+import numpy as np
+
+from fake_abaqus_case import fake_abq_command
+
+
+class TestMesh(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_save_and_load(self):
+        from synthetic_odb import split_block_mesh
+        from abaqus_interface.mesh import Mesh
+        node_labels, node_coordinates, element_labels, connectivity = split_block_mesh('C3D4', (2, 2, 2))
+        mesh = Mesh('PART-1-1', node_labels, node_coordinates,
+                    {'C3D4': {'labels': element_labels, 'connectivity': connectivity},
+                     'C3D8': {'labels': np.array([1000]), 'connectivity': np.arange(1, 9)[np.newaxis]}},
+                    node_sets={'Set with spaces': node_labels[:5], 'EMPTY': []},
+                    element_sets={'ALL': element_labels})
+        mesh_file_name = pathlib.Path(self.directory.name) / 'mesh.npz'
+        mesh.save(mesh_file_name)
+        for mmap_mode in ['r', None]:
+            loaded = Mesh.load(mesh_file_name, mmap_mode=mmap_mode)
+            self.assertEqual(isinstance(loaded.node_coordinates, np.memmap), mmap_mode is not None)
+            np.testing.assert_array_equal(loaded.node_coordinates, node_coordinates)
+            np.testing.assert_array_equal(loaded.elements['C3D4']['connectivity'], connectivity)
+            self.assertEqual(loaded.element_types, ['C3D4', 'C3D8'])
+            np.testing.assert_array_equal(loaded.node_sets['Set with spaces'], node_labels[:5])
+            self.assertEqual(loaded.node_sets['EMPTY'].shape, (0, ))
+            np.testing.assert_array_equal(loaded.element_sets['ALL'], element_labels)
+
+        rows = loaded.node_rows(node_labels[::-1])
+        np.testing.assert_array_equal(loaded.node_labels[rows], node_labels[::-1])
+        np.testing.assert_array_equal(loaded.element_rows([1000, element_labels[0]]), [element_labels.shape[0], 0])
+        self.assertEqual(loaded.node_rows([-1], missing='ignore')[0], -1)
+        index = loaded.label_index(points_per_element=4)
+        self.assertEqual(len(index), 4*(element_labels.shape[0] + 1))
+
+    def test_export_mesh(self):
+        from synthetic_odb import block_mesh, create_synthetic_odb
+        from abaqus_interface import ABQInterface
+        from abaqus_interface.label_index import LabelIndex
+        odb_file_name = pathlib.Path(self.directory.name) / 'synthetic.odb'
+        create_synthetic_odb(odb_file_name, field_ids=('U', ))
+        abq = ABQInterface(fake_abq_command)
+        mesh = abq.export_mesh(odb_file_name, pathlib.Path(self.directory.name) / 'mesh.npz')
+        node_labels, node_coordinates, element_labels, connectivity = block_mesh()
+        np.testing.assert_array_equal(mesh.node_labels, node_labels)
+        np.testing.assert_array_equal(mesh.elements['C3D8']['connectivity'], connectivity)
+        self.assertEqual(sorted(mesh.node_sets), ['TOP_NODES'])
+        np.testing.assert_array_equal(mesh.element_sets['HALF_ELEMENTS'], element_labels[:element_labels.shape[0]//2])
+
+        # The nodal data of the odb is reordered to the mesh without creating a LabelIndex for the mesh
+        data, labels, _ = abq.read_data_from_odb('U', odb_file_name, position='NODAL', get_position_numbers=True)
+        reordered = LabelIndex(labels).reorder(data, mesh)
+        np.testing.assert_array_equal(reordered, data[np.argsort(labels)])
+
+        new_odb_file_name = pathlib.Path(self.directory.name) / 'new.odb'
+        abq.create_empty_odb_from_nodes_and_elements(new_odb_file_name, [mesh])
+        new_mesh = abq.export_mesh(new_odb_file_name, pathlib.Path(self.directory.name) / 'new_mesh.npz')
+        np.testing.assert_array_equal(new_mesh.node_coordinates, node_coordinates)
+        np.testing.assert_array_equal(new_mesh.node_sets['TOP_NODES'], mesh.node_sets['TOP_NODES'])
+
+        # The node sets are copied from the bulk data of U and the element sets from the elements as there is no
+        # element field in the odb
+        copied_odb_file_name = pathlib.Path(self.directory.name) / 'copied.odb'
+        abq.create_empty_odb_from_odb(copied_odb_file_name, odb_file_name)
+        copied_mesh = abq.export_mesh(copied_odb_file_name, pathlib.Path(self.directory.name) / 'copied_mesh.npz')
+        np.testing.assert_array_equal(np.sort(copied_mesh.node_sets['TOP_NODES']), mesh.node_sets['TOP_NODES'])
+        np.testing.assert_array_equal(np.sort(copied_mesh.element_sets['HALF_ELEMENTS']),
+                                      mesh.element_sets['HALF_ELEMENTS'])
+
+    def test_copy_results(self):
+        from synthetic_odb import create_synthetic_odb
+        from abaqus_interface import ABQInterface
+        odb_file_name = pathlib.Path(self.directory.name) / 'synthetic.odb'
+        create_synthetic_odb(odb_file_name, field_ids=('S', 'U'))
+        abq = ABQInterface(fake_abq_command)
+        copied_odb_file_name = pathlib.Path(self.directory.name) / 'copied.odb'
+        abq.create_empty_odb_from_odb(copied_odb_file_name, odb_file_name, step_names=['step-1'], frame_numbers=[-1],
+                                      field_ids=['S', 'U'])
+        for field_id, position in [('S', 'INTEGRATION_POINT'), ('U', 'NODAL')]:
+            data, node_labels, element_labels = abq.read_data_from_odb(field_id, odb_file_name, position=position,
+                                                                       get_position_numbers=True)
+            copied = abq.read_data_from_odb(field_id, copied_odb_file_name, position=position,
+                                            get_position_numbers=True)
+            np.testing.assert_array_equal(copied[0], data)
+            np.testing.assert_array_equal(copied[1], node_labels)
+            np.testing.assert_array_equal(copied[2], element_labels)
+        mesh = abq.export_mesh(copied_odb_file_name, pathlib.Path(self.directory.name) / 'copied_mesh.npz')
+        # The element sets are copied from the bulk data of S
+        np.testing.assert_array_equal(mesh.element_sets['HALF_ELEMENTS'], [1, 2, 3, 4])
+
+
+if __name__ == '__main__':
+    unittest.main()
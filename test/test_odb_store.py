@@ -0,0 +1,195 @@
+import pathlib
+import tempfile
+import threading
+import unittest
+
+import numpy as np
+
+from fake_abaqus_case import fake_abq_command, SyntheticOdbTestCase
+
+
+def add_frame(odb_file_name, step_name, frame_value, field_ids=('S', 'U')):
+    # Appends a frame with S and U to a synthetic odb as a running job does
+    from abaqusConstants import INTEGRATION_POINT, NODAL, TIME, TENSOR_3D_FULL, VECTOR
+    import odbAccess
+    from synthetic_odb import field_values
+    odb = odbAccess.openOdb(str(odb_file_name))
+    instance = odb.rootAssembly.instances['PART-1-1']
+    if step_name not in odb.steps:
+        odb.Step(name=step_name, description='', domain=TIME)
+    frame = odb.steps[step_name].Frame(incrementNumber=len(odb.steps[step_name].frames), frameValue=frame_value)
+    element_labels = instance.element_blocks[0]['labels']
+    if 'S' in field_ids:
+        frame.FieldOutput(name='S', description='', type=TENSOR_3D_FULL).addData(
+            position=INTEGRATION_POINT, instance=instance, labels=element_labels,
+            data=field_values('S', element_labels, 8, frame_value))
+    if 'U' in field_ids:
+        frame.FieldOutput(name='U', description='', type=VECTOR).addData(
+            position=NODAL, instance=instance, labels=instance.node_labels,
+            data=field_values('U', instance.node_labels, 1, frame_value))
+    odb.save()
+
+
+class TestOdbStore(SyntheticOdbTestCase):
+    odb_arguments = {'step_names': ('step-1', 'step-2')}
+
+    @classmethod
+    def setUpClass(cls):
+        from abaqus_interface import ABQInterface
+        super().setUpClass()
+        cls.abq = ABQInterface(fake_abq_command)
+        cls.stress, _, cls.element_labels = cls.abq.read_data_from_odb('S', cls.odb_file_name, step_name='step-1',
+                                                                       frame_number=1, get_position_numbers=True)
+
+    def test_export_and_read(self):
+        store_directory = pathlib.Path(self.directory.name) / 'store'
+        store = self.abq.export_odb(self.odb_file_name, store_directory, chunk_size=10)
+        self.assertEqual(sorted(store.field_ids), ['PEEQ', 'S', 'U'])
+        self.assertEqual(store.position('U'), 'NODAL')
+        self.assertEqual([(frame.step_name, frame.frame_number) for frame in store.frames('S')],
+                         [('step-1', 0), ('step-1', 1), ('step-1', 2), ('step-2', 0), ('step-2', 1), ('step-2', 2)])
+        self.assertEqual(len(store.manifest['fields']['S']['label_files']), 1)
+
+        np.testing.assert_array_equal(store.read('S', 'step-1', 1), self.stress)
+        np.testing.assert_array_equal(store.read('S', 'step-1', 1, rows=slice(5, 37)), self.stress[5:37])
+        np.testing.assert_array_equal(store.read('S', 'step-1', 1, rows=slice(None, None, 7)), self.stress[::7])
+        rows = np.array([63, 0, 12, 11, 40])
+        np.testing.assert_array_equal(store.read('S', 'step-1', 1, rows=rows), self.stress[rows])
+        np.testing.assert_array_equal(store.labels('S')[1], self.element_labels)
+        np.testing.assert_array_equal(store.read('PEEQ', 'step-2'),
+                                      self.abq.read_data_from_odb('PEEQ', self.odb_file_name, step_name='step-2'))
+        np.testing.assert_array_equal(store.read('U'), self.abq.read_data_from_odb('U', self.odb_file_name,
+                                                                                   position='NODAL'))
+        frames, history = store.history('S', 'step-1', rows=slice(0, 3))
+        self.assertEqual(history.shape, (3, 3, 6))
+        np.testing.assert_array_equal(history[1], self.stress[:3])
+        self.assertEqual([frame.frame_value for frame in frames], [0., 0.5, 1.])
+        with self.assertRaises(ValueError):
+            store.read('E')
+        with self.assertRaises(ValueError):
+            store.read('S', 'step-1', 7)
+
+    def test_selection(self):
+        from abaqus_interface.odb_store import OdbStore
+        store_directory = pathlib.Path(self.directory.name) / 'selection'
+        self.abq.export_odb(self.odb_file_name, store_directory, field_ids=['S'], step_names='step-1', frames=[1],
+                            compress=False, dtype='float32')
+        store = OdbStore(store_directory)
+        self.assertEqual(store.field_ids, ['S'])
+        self.assertEqual(store.frames('S'), [('step-1', 1, 0.5)])
+        data = store.read('S')
+        self.assertEqual(data.dtype, np.float32)
+        np.testing.assert_allclose(data, self.stress, rtol=1e-6)
+        self.assertEqual(len(list((store_directory / 'field_0').iterdir())), 2)
+
+
+class TestIncrementalExport(unittest.TestCase):
+    def setUp(self):
+        from synthetic_odb import create_synthetic_odb
+        from abaqus_interface import ABQInterface
+        self.directory = tempfile.TemporaryDirectory()
+        self.odb_file_name = pathlib.Path(self.directory.name) / 'job.odb'
+        self.store_directory = pathlib.Path(self.directory.name) / 'store'
+        create_synthetic_odb(self.odb_file_name, frames_per_step=2, field_ids=('S', 'U'))
+        self.abq = ABQInterface(fake_abq_command)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_incremental_export(self):
+        from synthetic_odb import field_values
+        from abaqus_interface.common import AbaqusError
+        store = self.abq.export_odb(self.odb_file_name, self.store_directory, chunk_size=20)
+        first_chunk = self.store_directory / store.manifest['fields']['S']['frames'][0]['chunks'][0]
+        modification_time = first_chunk.stat().st_mtime_ns
+        first_frame = store.read('S', 'step-1', 0)
+
+        add_frame(self.odb_file_name, 'step-1', 2.)
+        add_frame(self.odb_file_name, 'step-2', 3.)
+        self.abq.export_odb(self.odb_file_name, self.store_directory, chunk_size=20, incremental=True)
+        self.assertTrue(store.refresh())
+        self.assertFalse(store.refresh())
+        self.assertEqual(store.frames('S'), [('step-1', 0, 0.), ('step-1', 1, 1.), ('step-1', 2, 2.),
+                                             ('step-2', 0, 3.)])
+        self.assertEqual(first_chunk.stat().st_mtime_ns, modification_time)
+        np.testing.assert_array_equal(store.read('S', 'step-1', 0), first_frame)
+        np.testing.assert_array_equal(store.read('U', 'step-2'), field_values('U', store.labels('U')[0], 1, 3.))
+        with self.assertRaises(AbaqusError):
+            self.abq.export_odb(self.odb_file_name, self.store_directory, chunk_size=10, incremental=True)
+
+    def test_unsupported_fields_and_sets(self):
+        from abaqusConstants import SCALAR, WHOLE_ELEMENT
+        from abaqus_interface.common import AbaqusError
+        from abaqus_interface.odb_store import OdbStore
+        import odbAccess
+        odb = odbAccess.openOdb(str(self.odb_file_name))
+        instance = odb.rootAssembly.instances['PART-1-1']
+        element_labels = instance.element_blocks[0]['labels']
+        for frame in odb.steps['step-1'].frames:
+            frame.FieldOutput(name='EVOL', description='', type=SCALAR).addData(
+                position=WHOLE_ELEMENT, instance=instance, labels=element_labels, data=np.ones(len(element_labels)))
+        odb.save()
+
+        store = self.abq.export_odb(self.odb_file_name, self.store_directory)
+        self.assertEqual(sorted(store.field_ids), ['S', 'U'])
+        store = self.abq.export_odb(self.odb_file_name, self.store_directory, set_name='HALF_ELEMENTS')
+        self.assertEqual(store.field_ids, ['S'])
+        self.assertEqual(store.read('S').shape, (32, 6))
+        for field_ids, set_name in [(['EVOL'], ''), (['U'], 'HALF_ELEMENTS')]:
+            with self.assertRaises(AbaqusError):
+                self.abq.export_odb(self.odb_file_name, self.store_directory, field_ids=field_ids, set_name=set_name)
+        # The store of the last successful export is kept
+        self.assertEqual(OdbStore(self.store_directory).read('S').shape, (32, 6))
+        self.assertEqual(sorted(path.name for path in pathlib.Path(self.directory.name).iterdir()),
+                         ['job.odb', 'store'])
+
+    def test_frames_without_output(self):
+        store = self.abq.export_odb(self.odb_file_name, self.store_directory, field_ids=['S', 'U'])
+        add_frame(self.odb_file_name, 'step-1', 2., field_ids=('S', ))
+        store = self.abq.export_odb(self.odb_file_name, self.store_directory, field_ids=['S', 'U'], incremental=True)
+        self.assertEqual(store.manifest['exported_frames'], [['step-1', 0], ['step-1', 1]])
+        self.assertEqual(len(store.frames('S')), 2)
+
+    def test_running_job(self):
+        self.odb_file_name.with_suffix('.lck').touch()
+        store = self.abq.export_odb(self.odb_file_name, self.store_directory)
+        self.assertEqual(store.manifest['exported_frames'], [['step-1', 0]])
+        self.odb_file_name.with_suffix('.lck').unlink()
+        store = self.abq.export_odb(self.odb_file_name, self.store_directory, incremental=True)
+        self.assertEqual(store.manifest['exported_frames'], [['step-1', 0], ['step-1', 1]])
+
+    def test_watch(self):
+        lock_file_name = self.odb_file_name.with_suffix('.lck')
+        lock_file_name.touch()
+        updates = self.abq.watch_odb(self.odb_file_name, self.store_directory, min_interval=0.01, field_ids=['U'])
+        update = next(updates)
+        self.assertEqual(update.frames, [('step-1', 0)])
+        add_frame(self.odb_file_name, 'step-1', 2.)
+        update = next(updates)
+        self.assertEqual(update.frames, [('step-1', 1)])
+        self.assertEqual(len(update.store.frames('U')), 2)
+        lock_file_name.unlink()
+        updates = list(updates)
+        self.assertEqual([update.frames for update in updates], [[('step-1', 2)]])
+        self.assertEqual(len(updates[0].store.frames('U')), 3)
+
+    def test_watch_before_odb_is_written(self):
+        lock_file_name = self.odb_file_name.with_suffix('.lck')
+        lock_file_name.touch()
+        written_odb_file_name = self.odb_file_name.with_name('written.odb')
+        self.odb_file_name.rename(written_odb_file_name)
+        updates = self.abq.watch_odb(self.odb_file_name, self.store_directory, min_interval=0.01, max_interval=0.05,
+                                     field_ids=['U'])
+        timer = threading.Timer(0.3, written_odb_file_name.rename, [self.odb_file_name])
+        timer.start()
+        try:
+            update = next(updates)
+        finally:
+            timer.join()
+        self.assertEqual(update.frames, [('step-1', 0)])
+        lock_file_name.unlink()
+        self.assertEqual([update.frames for update in updates], [[('step-1', 1)]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import pathlib
+import tempfile
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from fake_abaqus_case import fake_abq_command
+
+
+class TestParallelMap(unittest.TestCase):
+    def setUp(self):
+        from synthetic_odb import create_synthetic_odb
+        self.directory = tempfile.TemporaryDirectory()
+        self.odb_file_names = []
+        for i in range(4):
+            odb_file_name = pathlib.Path(self.directory.name) / ('synthetic_' + str(i) + '.odb')
+            create_synthetic_odb(odb_file_name, elements_per_side=(i + 1, 1, 1))
+            self.odb_file_names.append(odb_file_name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_map_read(self):
+        from abaqus_interface import ABQInterface
+        from abaqus_interface.abaqus_interface import ReadRequest
+        missing_odb = pathlib.Path(self.directory.name) / 'missing.odb'
+        request = ReadRequest('S', frame_number=1)
+        abq = ABQInterface(fake_abq_command)
+        results = {result.odb_file_name: result for result in
+                   abq.map_read(self.odb_file_names + [missing_odb], [request], max_processes=2)}
+        self.assertEqual(len(results), 5)
+        for i, odb_file_name in enumerate(self.odb_file_names):
+            self.assertIsNone(results[odb_file_name].error)
+            self.assertEqual(results[odb_file_name].result[request]['data'].shape, (8*(i + 1), 6))
+        self.assertIsNone(results[missing_odb].result)
+        self.assertIsNotNone(results[missing_odb].error)
+
+    def test_process_limit_and_license_retry(self):
+        from abaqus_interface import ABQInterface
+        from abaqus_interface.common import AbaqusLicenseError
+        lock = threading.Lock()
+        state = {'running': 0, 'max_running': 0, 'failed': set()}
+
+        def function(_, odb_file_name):
+            with lock:
+                state['running'] += 1
+                state['max_running'] = max(state['running'], state['max_running'])
+            time.sleep(0.05)
+            with lock:
+                state['running'] -= 1
+                if odb_file_name not in state['failed']:
+                    state['failed'].add(odb_file_name)
+                    raise AbaqusLicenseError('License server not available')
+            return odb_file_name.name
+
+        results = list(ABQInterface(fake_abq_command).map(function, self.odb_file_names, max_processes=2,
+                                                          retry_delay=0.01))
+        self.assertEqual(state['max_running'], 2)
+        self.assertEqual(sorted(result.result for result in results),
+                         sorted(odb_file_name.name for odb_file_name in self.odb_file_names))
+        results = list(ABQInterface(fake_abq_command).map(function, self.odb_file_names[:1] + ['new.odb'],
+                                                          max_retries=0, retry_delay=0.01))
+        errors = {str(result.odb_file_name): result.error for result in results}
+        self.assertIsNone(errors[str(self.odb_file_names[0])])
+        self.assertIsInstance(errors['new.odb'], AbaqusLicenseError)
+
+    def test_waiting_odb_does_not_block_process(self):
+        from abaqus_interface import ABQInterface
+        from abaqus_interface.common import AbaqusLicenseError
+        calls = []
+
+        def function(_, odb_file_name):
+            calls.append(odb_file_name)
+            if calls.count(odb_file_name) == 1 and odb_file_name == 'a.odb':
+                raise AbaqusLicenseError('License server not available')
+            return odb_file_name
+
+        results = list(ABQInterface(fake_abq_command).map(function, ['a.odb', 'b.odb', 'c.odb'], max_processes=1,
+                                                          retry_delay=0.5))
+        self.assertEqual(calls, ['a.odb', 'b.odb', 'c.odb', 'a.odb'])
+        self.assertEqual([result.result for result in results], ['b.odb', 'c.odb', 'a.odb'])
+
+    def test_license_error_from_abaqus(self):
+        from abaqus_interface import ABQInterface
+        from abaqus_interface.common import AbaqusLicenseError
+        abq = ABQInterface("sh -c 'echo License checkout failed: license server not available; exit 1' --")
+        with self.assertRaises(AbaqusLicenseError):
+            abq.get_steps(self.odb_file_names[0])
+        np.testing.assert_array_equal(ABQInterface(fake_abq_command).get_steps(self.odb_file_names[0]), ['step-1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+
+import numpy as np
+
+from fake_abaqus_case import fake_abq_command, SyntheticOdbTestCase
+
+
+class TestPathData(SyntheticOdbTestCase):
+    odb_arguments = {'step_names': ('load', 'unload'), 'frames_per_step': 4}
+
+    @classmethod
+    def setUpClass(cls):
+        from abaqus_interface import ABQInterface
+        super().setUpClass()
+        cls.abq = ABQInterface(fake_abq_command)
+        cls.paths = np.zeros((2, 5, 3))
+        cls.paths[0, :, 0] = np.linspace(0, 1, 5)
+        cls.paths[1, :, 1] = np.linspace(0, 0.5, 5)
+
+    def test_paths_components_and_frames(self):
+        frames = [('load', 0), ('load', -1), (None, 1)]
+        data = self.abq.get_data_from_paths(self.odb_file_name, self.paths, 'S', components=['S11', 'S22', 'S12'],
+                                            frames=frames, output_position='INTEGRATION_POINT')
+        self.assertEqual(data.shape, (3, 2, 5, 3))
+        distances = [np.linspace(0, 1, 5), np.linspace(0, 0.5, 5)]
+        for i, frame_value in enumerate([0, 1, 1/3]):
+            for j in range(2):
+                for k, component_index in enumerate([0, 1, 3]):
+                    np.testing.assert_allclose(data[i, j, :, k], 1000*component_index + frame_value + distances[j])
+
+    def test_tensor_from_path(self):
+        tensor = self.abq.get_tensor_from_path(self.odb_file_name, self.paths[0], 'S', step_name='load')
+        self.assertEqual(tensor.shape, (5, 6))
+        np.testing.assert_allclose(tensor[:, 4], 4001 + np.linspace(0, 1, 5))
+
+    def test_single_component(self):
+        data = self.abq.get_data_from_path(self.paths[1], self.odb_file_name, 'U', component='U2', step_name='unload',
+                                           frame_number=2)
+        np.testing.assert_allclose(data, 1000 + 2/3 + np.linspace(0, 0.5, 5))
+
+    def test_failed_viewer_run(self):
+        import asyncio
+        from abaqus_interface import AsyncABQInterface
+        from abaqus_interface.common import AbaqusError
+        with self.assertRaises(AbaqusError):
+            self.abq.get_data_from_path(self.paths[1], self.odb_file_name, 'U', component='U2', step_name='missing')
+        abq = AsyncABQInterface(fake_abq_command)
+        with self.assertRaises(AbaqusError):
+            asyncio.run(abq.get_data_from_path(self.paths[1], self.odb_file_name, 'U', component='U2',
+                                               step_name='missing'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import pathlib
+import tempfile
+import unittest
+
+import numpy as np
+
+from fake_abaqus_case import fake_abq_command
+
+
+def linear_field(points):
+    return np.column_stack([1 + 2*points[:, 0] - points[:, 1] + 3*points[:, 2], points[:, 0]])
+
+
+def quadratic_field(points):
+    return points[:, 0]**2 + points[:, 1]*points[:, 2] - points[:, 2]**2
+
+
+class TestPathProbe(unittest.TestCase):
+    def setUp(self):
+        self.points = np.random.default_rng(1).random((5000, 3))*[2, 1, 1]
+
+    def probe(self, element_type, distortion=0.):
+        from synthetic_odb import split_block_mesh
+        from abaqus_interface.path_probe import PathProbe
+        mesh = split_block_mesh(element_type, (4, 3, 3), (2., 1., 1.))
+        node_labels, node_coordinates, element_labels, connectivity = mesh
+        interior = np.all((node_coordinates > 0) & (node_coordinates < [2, 1, 1]), axis=1)
+        node_coordinates[interior] += distortion*np.random.default_rng(2).uniform(-1, 1, (interior.sum(), 3))
+        return PathProbe(node_labels, node_coordinates, {element_type: (element_labels, connectivity)})
+
+    def test_linear_fields(self):
+        for element_type in ['C3D4', 'C3D6', 'C3D8', 'C3D10', 'C3D20']:
+            probe = self.probe(element_type, distortion=0.05)
+            element_indices, _ = probe.locate(self.points)
+            self.assertTrue(np.all(element_indices >= 0), element_type)
+            np.testing.assert_allclose(probe.interpolate(self.points, linear_field(probe.node_coordinates)),
+                                       linear_field(self.points), atol=1e-8, err_msg=element_type)
+
+    def test_quadratic_fields(self):
+        for element_type in ['C3D10', 'C3D20']:
+            probe = self.probe(element_type)
+            np.testing.assert_allclose(probe.interpolate(self.points, quadratic_field(probe.node_coordinates)),
+                                       quadratic_field(self.points), atol=1e-8, err_msg=element_type)
+
+    def test_points_outside_and_labels(self):
+        probe = self.probe('C3D8')
+        element_indices, _ = probe.locate([[-0.1, 0.5, 0.5], [1., 0.5, 0.5], [2., 1., 1.]])
+        self.assertEqual(element_indices[0], -1)
+        self.assertTrue(np.all(element_indices[1:] >= 0))
+        order = np.random.default_rng(3).permutation(probe.node_labels.shape[0])
+        values = linear_field(probe.node_coordinates)[order]
+        values = np.vstack([values, values])
+        distances, data = probe.path_data([[0., 0.5, 0.5], [2., 0.5, 0.5], [2.5, 0.5, 0.5]], values,
+                                          node_labels=np.tile(probe.node_labels[order], 2))
+        np.testing.assert_allclose(distances, [0, 2, 2.5])
+        np.testing.assert_allclose(data[:2], linear_field(np.array([[0., 0.5, 0.5], [2., 0.5, 0.5]])))
+        self.assertTrue(np.all(np.isnan(data[2])))
+
+    def test_element_types(self):
+        from abaqus_interface.path_probe import element_family
+        for element_type, nodes in [('C3D8R', 8), ('C3D20RT', 20), ('DC3D10', 10), ('C3D4H', 4)]:
+            self.assertEqual(element_family(element_type), nodes)
+        for element_type in ['AC3D8', 'EC3D8R', 'COH3D8', 'C3D15V', 'C3D27', 'CPE4', 'C3D8R ']:
+            with self.assertRaises(ValueError):
+                element_family(element_type)
+
+    def test_mesh_from_odb(self):
+        from synthetic_odb import create_synthetic_odb
+        from abaqus_interface import ABQInterface
+        from abaqus_interface.path_probe import PathProbe
+        with tempfile.TemporaryDirectory() as directory:
+            odb_file_name = pathlib.Path(directory) / 'synthetic.odb'
+            create_synthetic_odb(odb_file_name, field_ids=('U', ))
+            abq = ABQInterface(fake_abq_command)
+            probe = PathProbe.from_instance(abq.get_mesh(odb_file_name))
+            displacements, node_labels, _ = abq.read_data_from_odb('U', odb_file_name, position='NODAL',
+                                                                   get_position_numbers=True)
+        data = probe.interpolate([[0.25, 0.25, 0.75]], displacements, node_labels)
+        # The nodal values are node label + 1000*component + frame value which is linear in the coordinates
+        np.testing.assert_allclose(data, [[9.5, 1009.5, 2009.5]])
+
+
+if __name__ == '__main__':
+    unittest.main()
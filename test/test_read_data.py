@@ -0,0 +1,308 @@
+import pathlib
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+from fake_abaqus_case import fake_abq_command, SyntheticOdbTestCase
+
+
+class TestReadData(SyntheticOdbTestCase):
+    odb_arguments = {'step_names': ('load', 'unload'), 'frames_per_step': 4, 'field_ids': ('S', 'PEEQ', 'U')}
+
+    @classmethod
+    def setUpClass(cls):
+        from abaqus_interface import ABQInterface
+        super().setUpClass()
+        cls.abq = ABQInterface(fake_abq_command, persistent=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.abq.close()
+        super().tearDownClass()
+
+    def test_read_batch(self):
+        from abaqus_interface.abaqus_interface import ReadRequest
+        from synthetic_odb import field_values
+        requests = [ReadRequest('S', 'load', frame) for frame in range(4)]
+        requests.append(ReadRequest('PEEQ', set_name='HALF_ELEMENTS'))
+        requests.append(ReadRequest('U', 'unload', 2, set_name='TOP_NODES', position='NODAL'))
+        results = self.abq.read_data_batch_from_odb(self.odb_file_name, requests)
+        self.assertEqual(list(results.keys()), requests)
+        for frame in range(4):
+            result = results[requests[frame]]
+            self.assertAlmostEqual(result['frame_value'], frame/3)
+            np.testing.assert_allclose(result['data'], field_values('S', np.arange(1, 9), 8, frame/3), rtol=1e-6)
+        self.assertEqual(results[requests[4]]['data'].shape, (32, ))
+        self.assertEqual(list(np.unique(results[requests[4]]['element_labels'])), [1, 2, 3, 4])
+        top_nodes = results[requests[5]]
+        self.assertEqual(top_nodes['data'].shape, (9, 3))
+        np.testing.assert_allclose(top_nodes['data'][:, 0], np.array(top_nodes['node_labels']) + 2/3, rtol=1e-6)
+
+    def test_stream_data(self):
+        from abaqus_interface import ABQInterface
+        from abaqus_interface.common import AbaqusError
+        abq = ABQInterface(fake_abq_command)
+        data, _, element_labels = abq.read_data_from_odb('S', self.odb_file_name, step_name='load',
+                                                         get_position_numbers=True)
+        chunks = list(abq.stream_data_from_odb('S', self.odb_file_name, step_name='load', chunk_size=10,
+                                               max_pending_chunks=1))
+        self.assertEqual([chunk.data.shape[0] for chunk in chunks], 6*[10] + [4])
+        np.testing.assert_array_equal(np.vstack([chunk.data for chunk in chunks]), data)
+        np.testing.assert_array_equal(np.concatenate([chunk.element_labels for chunk in chunks]), element_labels)
+
+        chunks = abq.stream_data_from_odb('U', self.odb_file_name, position='NODAL', chunk_size=4, dtype='float32')
+        chunk = next(chunks)
+        chunks.close()
+        self.assertEqual(chunk.data.shape, (4, 3))
+        self.assertEqual(chunk.data.dtype, np.float32)
+        np.testing.assert_allclose(chunk.data[:, 0], chunk.node_labels + 1, rtol=1e-6)
+        with self.assertRaises(AbaqusError):
+            list(abq.stream_data_from_odb('S', self.odb_file_name, set_name='MISSING_SET'))
+
+    def test_read_history(self):
+        from synthetic_odb import field_values
+        from abaqus_interface.common import AbaqusError
+        history = self.abq.read_history_from_odb('S', self.odb_file_name, step_names=['load', 'unload'])
+        self.assertEqual(history.data.shape, (8, 64, 6))
+        self.assertEqual(history.step_names, 4*['load'] + 4*['unload'])
+        np.testing.assert_array_equal(history.frame_numbers, 2*[0, 1, 2, 3])
+        np.testing.assert_allclose(history.frame_values, 2*[0, 1/3, 2/3, 1])
+        for i, frame_value in enumerate(history.frame_values):
+            np.testing.assert_allclose(history.data[i], field_values('S', np.arange(1, 9), 8, frame_value), rtol=1e-6)
+        reference = self.abq.read_data_from_odb('S', self.odb_file_name, step_name='load', frame_number=2,
+                                                get_position_numbers=True)
+        np.testing.assert_array_equal(history.element_labels, reference[2])
+
+        history_file = pathlib.Path(self.directory.name) / 'peeq_history.npy'
+        history = self.abq.read_history_from_odb('PEEQ', self.odb_file_name, frames=slice(None, None, 2),
+                                                 set_name='HALF_ELEMENTS', dtype='float32', history_file=history_file)
+        self.assertIsInstance(history.data, np.memmap)
+        self.assertEqual(history.data.shape, (2, 32, 1))
+        self.assertEqual(history.data.dtype, np.float32)
+        np.testing.assert_array_equal(history.frame_numbers, [0, 2])
+        np.testing.assert_array_equal(np.load(history_file), history.data)
+        history = self.abq.read_history_from_odb('U', self.odb_file_name, frames=[-1], set_name='TOP_NODES',
+                                                 position='NODAL')
+        self.assertEqual(history.data.shape, (1, 9, 3))
+        np.testing.assert_allclose(history.data[0, :, 0], history.node_labels + 1, rtol=1e-6)
+        history = self.abq.read_history_from_odb('PEEQ', self.odb_file_name, frames=[-4, 3])
+        np.testing.assert_array_equal(history.frame_numbers, [0, 3])
+        for frames in [[4], [-5], [10]]:
+            with self.assertRaises(AbaqusError):
+                self.abq.read_history_from_odb('PEEQ', self.odb_file_name, frames=frames)
+
+    def test_transport_options(self):
+        from abaqus_interface.scratch import array_directory
+        reference = self.abq.read_data_from_odb('S', self.odb_file_name, step_name='load')
+        data = self.abq.read_data_from_odb('S', self.odb_file_name, step_name='load', dtype='float32',
+                                           mmap_mode='r')
+        self.assertIsInstance(data, np.memmap)
+        self.assertEqual(data.dtype, np.float32)
+        np.testing.assert_allclose(data, reference, rtol=1e-6)
+        # The mapped file is moved out of the removed exchange directory and removed with the array
+        mapped_file_name = pathlib.Path(data.filename)
+        self.assertEqual(mapped_file_name.parent, array_directory(None))
+        del data
+        self.assertFalse(mapped_file_name.exists())
+        history = self.abq.read_history_from_odb('PEEQ', self.odb_file_name, mmap_mode='r')
+        self.assertTrue(pathlib.Path(history.data.filename).exists())
+        np.testing.assert_array_equal(history.data[-1, :, 0], self.abq.read_data_from_odb('PEEQ', self.odb_file_name))
+        buffer = np.zeros(reference.shape)
+        data = self.abq.read_data_from_odb('S', self.odb_file_name, step_name='load', out=buffer)
+        self.assertIs(data, buffer)
+        np.testing.assert_array_equal(buffer, reference)
+
+    def test_write_data(self):
+        from synthetic_odb import create_synthetic_odb
+        odb_file_name = pathlib.Path(self.directory.name) / 'write.odb'
+        create_synthetic_odb(odb_file_name)
+        data = self.abq.read_data_from_odb('S', odb_file_name)
+        self.abq.write_data_to_odb(2*data, 'S2', odb_file_name, step_name='written', frame_value=0.5,
+                                   invariants=['MISES'], dtype='float32')
+        written, frame_value = self.abq.read_data_from_odb('S2', odb_file_name, get_frame_value=True)
+        self.assertEqual(frame_value, 0.5)
+        np.testing.assert_allclose(written, 2*data, rtol=1e-6)
+
+    def test_write_data_batch(self):
+        from synthetic_odb import create_synthetic_odb
+        from abaqus_interface.abaqus_interface import WriteRequest
+        odb_file_name = pathlib.Path(self.directory.name) / 'write_batch.odb'
+        create_synthetic_odb(odb_file_name)
+        stresses = np.random.rand(5, 64, 6)
+        temperatures = np.random.rand(5, 27)
+        statistics = self.abq.write_time_series_to_odb(odb_file_name, {'S2': stresses, 'NT': temperatures}, 'series',
+                                                       frame_values=np.linspace(0, 1, 5),
+                                                       position={'S2': 'INTEGRATION_POINT', 'NT': 'NODAL'})
+        self.assertEqual(statistics.number_of_values, stresses.size + temperatures.size)
+        self.assertGreater(statistics.values_per_second, 0)
+        self.assertEqual(len(self.abq.get_frames(odb_file_name, 'series')), 5)
+        for frame in range(5):
+            np.testing.assert_allclose(self.abq.read_data_from_odb('S2', odb_file_name, 'series', frame), stresses[frame])
+            np.testing.assert_allclose(self.abq.read_data_from_odb('NT', odb_file_name, 'series', frame,
+                                                                   position='NODAL'), temperatures[frame])
+        self.abq.write_data_batch_to_odb(odb_file_name, [WriteRequest(np.ones(9), 'U3', 'series', set_name='TOP_NODES',
+                                                                      frame_number=2, position='NODAL')])
+        np.testing.assert_allclose(self.abq.read_data_from_odb('U3', odb_file_name, 'series', 2, set_name='TOP_NODES',
+                                                               position='NODAL'), np.ones(9))
+
+    def test_create_odb_from_arrays(self):
+        from synthetic_odb import block_mesh
+        from abaqus_interface.abaqus_interface import OdbInstance
+        odb_file_name = pathlib.Path(self.directory.name) / 'from_arrays.odb'
+        node_labels, node_coordinates, element_labels, connectivity = block_mesh((3, 2, 2))
+        instances = [OdbInstance.from_arrays(name, node_labels, node_coordinates, {'C3D8': (element_labels, connectivity)},
+                                             node_sets={'BOTTOM': node_labels[node_coordinates[:, 2] == 0]},
+                                             element_sets={'FIRST': element_labels[:4]})
+                     for name in ['BLOCK-1', 'BLOCK-2']]
+        self.abq.create_empty_odb_from_nodes_and_elements(odb_file_name, instances)
+        catalog = self.abq.get_odb_catalog(odb_file_name)
+        self.assertEqual(catalog.instance_names, ['BLOCK-1', 'BLOCK-2'])
+        instance = catalog.instance('BLOCK-2')
+        self.assertEqual((instance['number_of_nodes'], instance['number_of_elements']), (36, 12))
+        self.assertEqual(instance['node_sets'], {'BOTTOM': 12})
+        self.assertEqual(instance['element_sets'], {'FIRST': 4})
+
+    def test_create_empty_odb_from_odb(self):
+        from synthetic_odb import create_synthetic_odb
+        source_odb_file_name = pathlib.Path(self.directory.name) / 'source.odb'
+        create_synthetic_odb(source_odb_file_name, step_names=('load', 'unload'), frames_per_step=4)
+        odb_file_name = pathlib.Path(self.directory.name) / 'copy.odb'
+        self.abq.create_empty_odb_from_odb(odb_file_name, source_odb_file_name)
+        catalog = self.abq.get_odb_catalog(odb_file_name)
+        self.assertEqual(catalog.step_names, [])
+        self.assertEqual(catalog.data['instances'], self.abq.get_odb_catalog(source_odb_file_name).data['instances'])
+
+        self.abq.create_empty_odb_from_odb(odb_file_name, source_odb_file_name, step_names=['load'],
+                                           frame_numbers=[0, -1], field_ids=['S', 'U'])
+        catalog = self.abq.get_odb_catalog(odb_file_name)
+        self.assertEqual(catalog.step_names, ['load'])
+        np.testing.assert_allclose(catalog.frame_values('load'), [0, 1])
+        self.assertEqual(catalog.frame('load', 1)['field_ids'], ['S', 'U'])
+        for field_id, position in [('S', 'INTEGRATION_POINT'), ('U', 'NODAL')]:
+            copied, node_labels, element_labels = self.abq.read_data_from_odb(field_id, odb_file_name, 'load', 1,
+                                                                              position=position,
+                                                                              get_position_numbers=True)
+            original = self.abq.read_data_from_odb(field_id, source_odb_file_name, 'load', 3, position=position,
+                                                   get_position_numbers=True)
+            np.testing.assert_array_equal(copied, original[0])
+            np.testing.assert_array_equal(node_labels, original[1])
+            np.testing.assert_array_equal(element_labels, original[2])
+
+    def test_odb_catalog(self):
+        from abaqus_interface.abaqus_interface import ReadRequest
+        catalog = self.abq.get_odb_catalog(self.odb_file_name)
+        self.assertEqual(catalog.step_names, ['load', 'unload'])
+        np.testing.assert_allclose(catalog.frame_values('load'), [0, 1/3, 2/3, 1])
+        self.assertEqual(catalog.frame('unload', 2)['field_ids'], ['S', 'PEEQ', 'U'])
+        self.assertEqual(catalog.fields()['S']['components'], ['11', '22', '33', '12', '13', '23'])
+        self.assertEqual(catalog.fields()['U']['positions'], ['NODAL'])
+        self.assertEqual(catalog.instance()['number_of_elements'], 8)
+        self.assertEqual(catalog.node_sets(), {'TOP_NODES': 9})
+        self.assertEqual(catalog.element_sets('PART-1-1')['HALF_ELEMENTS'], 4)
+        catalog.validate_read_request(ReadRequest('S', 'load', 3, set_name='HALF_ELEMENTS', position='ELEMENT_NODAL'))
+        for request in [ReadRequest('S', 'load', 4), ReadRequest('SDV1'), ReadRequest('S', position='NODAL'),
+                        ReadRequest('U', set_name='HALF_ELEMENTS', position='NODAL'), ReadRequest('S', step_name='x'),
+                        ReadRequest('S', instance_name='PART-2-1')]:
+            with self.assertRaises(ValueError):
+                self.abq.read_data_batch_from_odb(self.odb_file_name, [request], catalog=catalog)
+
+    def test_get_frames(self):
+        self.assertEqual(self.abq.get_frames(self.odb_file_name), [0, 1, 2, 3])
+        with self.assertRaises(ValueError):
+            self.abq.get_frames(self.odb_file_name, 'not a step')
+
+
+class TestReadOnlyReads(unittest.TestCase):
+    def setUp(self):
+        from synthetic_odb import create_synthetic_odb
+        self.directory = tempfile.TemporaryDirectory()
+        self.odb_file_name = pathlib.Path(self.directory.name) / 'archived.odb'
+        create_synthetic_odb(self.odb_file_name, step_names=('load', 'unload'), frames_per_step=3)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_reads_do_not_change_odb(self):
+        from abaqus_interface import ABQInterface
+        from abaqus_interface.abaqus_interface import ReadRequest, cylindrical_system_z
+        from odbAccess import openOdb
+        odb_bytes = self.odb_file_name.read_bytes()
+        modification_time = self.odb_file_name.stat().st_mtime_ns
+        for abq in [ABQInterface(fake_abq_command), ABQInterface(fake_abq_command, persistent=True)]:
+            with abq:
+                abq.read_data_from_odb('S', self.odb_file_name)
+                abq.read_data_from_odb('U', self.odb_file_name, position='NODAL', coordinate_system=cylindrical_system_z)
+                abq.read_data_batch_from_odb(self.odb_file_name, [ReadRequest('PEEQ'), ReadRequest('S', 'load')])
+                abq.read_history_from_odb('S', self.odb_file_name, step_names=['load', 'unload'],
+                                          coordinate_system=cylindrical_system_z)
+                list(abq.stream_data_from_odb('U', self.odb_file_name, position='NODAL', chunk_size=10))
+                abq.export_odb(self.odb_file_name, pathlib.Path(self.directory.name) / 'store')
+        self.assertEqual(self.odb_file_name.stat().st_mtime_ns, modification_time)
+        self.assertEqual(self.odb_file_name.read_bytes(), odb_bytes)
+        odb = openOdb(str(self.odb_file_name), readOnly=True)
+        instance = odb.rootAssembly.instances['PART-1-1']
+        self.assertEqual(sorted(instance.elementSets.keys()), ['HALF_ELEMENTS'])
+        self.assertEqual(sorted(instance.nodeSets.keys()), ['TOP_NODES'])
+        self.assertEqual(len(odb.rootAssembly.datumCsyses), 0)
+
+    def test_read_labels(self):
+        from abaqus_interface import ABQInterface
+        from abaqus_interface.abaqus_interface import ReadRequest
+        abq = ABQInterface(fake_abq_command)
+        data, _, element_labels = abq.read_data_from_odb('S', self.odb_file_name, get_position_numbers=True)
+        labels = np.array([7, 2, 5])
+        subset, _, subset_labels = abq.read_data_from_odb('S', self.odb_file_name, get_position_numbers=True,
+                                                          labels=labels)
+        rows = np.isin(element_labels, labels)
+        np.testing.assert_array_equal(subset, data[rows])
+        np.testing.assert_array_equal(subset_labels, element_labels[rows])
+
+        nodal, node_labels, _ = abq.read_data_from_odb('U', self.odb_file_name, position='NODAL',
+                                                       get_position_numbers=True)
+        top_nodes = abq.read_data_from_odb('U', self.odb_file_name, set_name='TOP_NODES', position='NODAL',
+                                           labels=[1, 24, 27])
+        np.testing.assert_array_equal(top_nodes, nodal[np.isin(node_labels, [24, 27])])
+
+        request = ReadRequest('S', 'load', 1, labels=(2, 5, 7))
+        results = abq.read_data_batch_from_odb(self.odb_file_name, [request])
+        history = abq.read_history_from_odb('S', self.odb_file_name, step_names=['load'], labels=labels)
+        reference = abq.read_data_from_odb('S', self.odb_file_name, 'load', 1)
+        np.testing.assert_array_equal(results[request]['data'], reference[rows])
+        np.testing.assert_array_equal(history.data[1], reference[rows])
+        np.testing.assert_array_equal(history.element_labels, element_labels[rows])
+
+    def test_concurrent_readers(self):
+        from concurrent.futures import ThreadPoolExecutor
+        from abaqus_interface import ABQInterface
+        odb_bytes = self.odb_file_name.read_bytes()
+        abq = ABQInterface(fake_abq_command)
+        reference = abq.read_data_from_odb('S', self.odb_file_name)
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            results = list(executor.map(lambda _: abq.read_data_from_odb('S', self.odb_file_name), range(6)))
+        for data in results:
+            np.testing.assert_array_equal(data, reference)
+        self.assertEqual(self.odb_file_name.read_bytes(), odb_bytes)
+
+
+class TestBulkDataExtraction(unittest.TestCase):
+    def test_same_as_field_values(self):
+        sys.path.insert(0, str(pathlib.Path(__file__).parents[1] / 'abaqus_python_scripts'))
+        from abaqusConstants import INTEGRATION_POINT, NODAL
+        from odb_io_functions import get_field_data
+        from odbAccess import openOdb
+        from synthetic_odb import create_synthetic_odb
+        with tempfile.TemporaryDirectory() as directory:
+            odb_file_name = pathlib.Path(directory) / 'synthetic.odb'
+            create_synthetic_odb(odb_file_name, field_ids=('S', 'PEEQ', 'U'))
+            frame = openOdb(str(odb_file_name), readOnly=True).steps['step-1'].frames[-1]
+            for field_id, position in [('S', INTEGRATION_POINT), ('PEEQ', INTEGRATION_POINT), ('U', NODAL)]:
+                field = frame.fieldOutputs[field_id].getSubset(position=position)
+                data, node_labels, element_labels = get_field_data(field, position)
+                values = field.values
+                np.testing.assert_array_equal(data, np.array([value.data for value in values]))
+                labels = node_labels if position == NODAL else element_labels
+                self.assertEqual(labels.dtype.kind, 'i')
+                np.testing.assert_array_equal(labels, [value.nodeLabel if position == NODAL else value.elementLabel
+                                                       for value in values])
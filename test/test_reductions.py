@@ -0,0 +1,89 @@
+import pathlib
+import sys
+import unittest
+
+import numpy as np
+
+from fake_abaqus_case import fake_abq_command, SyntheticOdbTestCase
+
+
+class TestReductions(SyntheticOdbTestCase):
+    odb_arguments = {'field_ids': ('S', 'PEEQ', 'IVOL', 'U')}
+
+    def test_reductions(self):
+        from abaqus_interface import ABQInterface
+        from abaqus_interface.abaqus_interface import ReductionRequest
+        from abaqus_interface.common import AbaqusError
+        abq = ABQInterface(fake_abq_command)
+        requests = [ReductionRequest('PEEQ', ('min', 'max', 'mean', 'weighted_mean', 'percentiles', 'histogram',
+                                              'top_k'), percentiles=(10, 90), bins=4, top_k=3),
+                    ReductionRequest('S', ('max', ), invariant='MISES', set_name='HALF_ELEMENTS', frame_number=0),
+                    ReductionRequest('S', ('mean', ), invariant='PRESS'),
+                    ReductionRequest('S', ('max', ), invariant='MAX_PRINCIPAL'),
+                    ReductionRequest('S', ('min', ), component='S22'),
+                    ReductionRequest('U', ('max', ), invariant='MAGNITUDE', position='NODAL')]
+        results = abq.reduce_data_from_odb(self.odb_file_name, requests)
+        peeq = abq.read_data_from_odb('PEEQ', self.odb_file_name)
+        ivol = abq.read_data_from_odb('IVOL', self.odb_file_name)
+        result = results[requests[0]]
+        self.assertEqual(result['min'], {'value': peeq.min(), 'label': 1, 'point': 1})
+        self.assertEqual(result['max'], {'value': peeq.max(), 'label': 8, 'point': 8})
+        self.assertAlmostEqual(result['mean'], peeq.mean())
+        self.assertAlmostEqual(result['weighted_mean'], np.sum(peeq*ivol)/np.sum(ivol))
+        np.testing.assert_allclose(result['percentiles'], np.percentile(peeq, [10, 90]))
+        np.testing.assert_array_equal(result['histogram']['counts'], np.histogram(peeq, bins=4)[0])
+        np.testing.assert_array_equal(result['top_k']['labels'], [8, 8, 8])
+        np.testing.assert_array_equal(result['top_k']['points'], [8, 7, 6])
+
+        stress, _, element_labels = abq.read_data_from_odb('S', self.odb_file_name, set_name='HALF_ELEMENTS',
+                                                           frame_number=0, get_position_numbers=True)
+        s11, s22, s33, s12, s13, s23 = stress.T
+        mises = np.sqrt(((s11 - s22)**2 + (s22 - s33)**2 + (s33 - s11)**2)/2 + 3*(s12**2 + s13**2 + s23**2))
+        self.assertAlmostEqual(results[requests[1]]['max']['value'], mises.max(), places=3)
+        self.assertEqual(results[requests[1]]['max']['label'], element_labels[np.argmax(mises)])
+
+        stress = abq.read_data_from_odb('S', self.odb_file_name)
+        self.assertAlmostEqual(results[requests[2]]['mean'], -np.mean(np.sum(stress[:, :3], axis=1))/3, places=3)
+        tensors = stress[:, [0, 3, 4, 3, 1, 5, 4, 5, 2]].reshape(-1, 3, 3)
+        self.assertAlmostEqual(results[requests[3]]['max']['value'], np.linalg.eigvalsh(tensors).max(), places=3)
+        self.assertEqual(results[requests[4]]['min']['value'], stress[:, 1].min())
+        self.assertEqual(results[requests[5]]['max']['label'], 27)
+
+        with self.assertRaises(AbaqusError):
+            abq.reduce_data_from_odb(self.odb_file_name, [ReductionRequest('S', ('max', ))])
+
+
+class TestInvariants(unittest.TestCase):
+    def test_invariants(self):
+        sys.path.insert(0, str(pathlib.Path(__file__).parents[1] / 'abaqus_python_scripts'))
+        from reductions import scalar_values
+        stress = np.random.default_rng(0).normal(size=(100, 6))
+        stress[0] = [2., 2., 2., 0., 0., 0.]
+        tensors = stress[:, [0, 3, 4, 3, 1, 5, 4, 5, 2]].reshape(-1, 3, 3)
+        principal_values = np.linalg.eigvalsh(tensors)
+        for i, invariant in enumerate(['MIN_PRINCIPAL', 'MID_PRINCIPAL', 'MAX_PRINCIPAL']):
+            np.testing.assert_allclose(scalar_values(stress, [], invariant), principal_values[:, i], atol=1e-12)
+
+        # Plane strain and axisymmetric tensors have the components 11, 22, 33 and 12
+        plane_stress = stress[:, :4]
+        full_stress = np.hstack([plane_stress, np.zeros((100, 2))])
+        for invariant in ['MISES', 'PRESS', 'MAX_PRINCIPAL', 'MID_PRINCIPAL', 'MIN_PRINCIPAL']:
+            np.testing.assert_allclose(scalar_values(plane_stress, [], invariant),
+                                       scalar_values(full_stress, [], invariant))
+        with self.assertRaises(ValueError):
+            scalar_values(stress[:, :3], [], 'MISES')
+
+    def test_point_numbers(self):
+        sys.path.insert(0, str(pathlib.Path(__file__).parents[1] / 'abaqus_python_scripts'))
+        from reductions import reduce_values
+        labels = np.repeat([5, 3, 7], [2, 3, 1])
+        values = np.array([1., 6., 2., 3., 4., 5.])
+        results = reduce_values(values, labels, ['min', 'max', 'top_k'], top_k=3)
+        self.assertEqual(results['min'], {'value': 1., 'label': 5, 'point': 1})
+        self.assertEqual(results['max'], {'value': 6., 'label': 5, 'point': 2})
+        np.testing.assert_array_equal(results['top_k']['labels'], [5, 7, 3])
+        np.testing.assert_array_equal(results['top_k']['points'], [2, 1, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import pathlib
+import tempfile
+import unittest
+
+import numpy as np
+
+from fake_abaqus_case import fake_abq_command
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.odb_file_name = pathlib.Path(self.directory.name) / 'model.odb'
+        self.odb_file_name.write_bytes(b'odb')
+        self.calls = 0
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def compute(self):
+        self.calls += 1
+        return {'data': np.arange(1000.), 'frame_value': 1.}
+
+    def test_hit_and_miss(self):
+        from abaqus_interface.result_cache import ResultCache
+        cache = ResultCache(pathlib.Path(self.directory.name) / 'cache')
+        for _ in range(3):
+            result = cache.get_or_compute(self.odb_file_name, 'read', {'field_id': 'S'}, self.compute)
+            np.testing.assert_array_equal(result['data'], np.arange(1000.))
+        cache.get_or_compute(self.odb_file_name, 'read', {'field_id': 'E'}, self.compute)
+        self.assertEqual(self.calls, 2)
+        self.assertEqual((cache.stats.hits, cache.stats.misses), (2, 2))
+        result = ResultCache(cache.directory).get_or_compute(self.odb_file_name, 'read', {'field_id': 'S'},
+                                                             self.compute, mmap_mode='r')
+        self.assertIsInstance(result['data'], np.memmap)
+        self.assertEqual(self.calls, 2)
+
+    def test_invalidation(self):
+        from abaqus_interface.result_cache import ResultCache
+        cache = ResultCache(pathlib.Path(self.directory.name) / 'cache')
+        cache.get_or_compute(self.odb_file_name, 'read', {}, self.compute)
+        stat = self.odb_file_name.stat()
+        os.utime(self.odb_file_name, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        cache.get_or_compute(self.odb_file_name, 'read', {}, self.compute)
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(cache.stats.invalidations, 1)
+
+    def test_odb_modified_during_compute(self):
+        from abaqus_interface.result_cache import ResultCache
+        cache = ResultCache(pathlib.Path(self.directory.name) / 'cache')
+
+        def compute_while_written():
+            stat = self.odb_file_name.stat()
+            os.utime(self.odb_file_name, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            return self.compute()
+
+        result = cache.get_or_compute(self.odb_file_name, 'read', {}, compute_while_written)
+        np.testing.assert_array_equal(result['data'], np.arange(1000.))
+        self.assertEqual(cache.stats.stores, 0)
+        cache.get_or_compute(self.odb_file_name, 'read', {}, self.compute)
+        self.assertEqual(self.calls, 2)
+
+    def test_eviction(self):
+        from abaqus_interface.result_cache import ResultCache
+        cache = ResultCache(pathlib.Path(self.directory.name) / 'cache', max_size=20000)
+        for i in range(4):
+            cache.get_or_compute(self.odb_file_name, 'read', {'frame_number': i}, self.compute)
+        self.assertEqual(cache.stats.evictions, 2)
+        self.assertLessEqual(cache.size, 20000)
+        cache.get_or_compute(self.odb_file_name, 'read', {'frame_number': 3}, self.compute)
+        self.assertEqual(cache.stats.hits, 1)
+
+    def test_abaqus_interface(self):
+        from abaqus_interface import ABQInterface
+        from synthetic_odb import create_synthetic_odb
+        odb_file_name = pathlib.Path(self.directory.name) / 'synthetic.odb'
+        create_synthetic_odb(odb_file_name)
+        with ABQInterface(fake_abq_command, persistent=True,
+                          result_cache=pathlib.Path(self.directory.name) / 'cache') as abq:
+            data = abq.read_data_from_odb('S', odb_file_name)
+            np.testing.assert_array_equal(abq.read_data_from_odb('S', odb_file_name), data)
+            self.assertEqual(abq.get_frames(odb_file_name), abq.get_frames(odb_file_name))
+            self.assertEqual((abq.result_cache.stats.hits, abq.result_cache.stats.misses), (2, 2))
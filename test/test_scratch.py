@@ -0,0 +1,76 @@
+import pathlib
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+from fake_abaqus_case import fake_abq_command
+
+
+class TestScratch(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.directory.name) / 'scratch'
+        self.root.mkdir()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_reuse(self):
+        from abaqus_interface.scratch import ScratchManager
+        with ScratchManager(self.root) as scratch:
+            with scratch.work_directory() as first:
+                (first / 'results.pkl').write_bytes(b'data')
+                with scratch.work_directory() as second:
+                    self.assertNotEqual(first, second)
+            with scratch.work_directory() as third:
+                self.assertIn(third, [first, second])
+                self.assertEqual(list(third.iterdir()), [])
+            self.assertEqual(scratch.number_of_directories, 2)
+        self.assertEqual(list(self.root.iterdir()), [])
+
+    def test_stale_sessions(self):
+        from abaqus_interface.scratch import ScratchManager
+        # A process that exits without closing its manager leaves its session directory
+        subprocess.run([sys.executable, '-c', 'import os, sys; sys.path.insert(0, sys.argv[1]); '
+                        'from abaqus_interface.scratch import ScratchManager; scratch = ScratchManager(sys.argv[2]); '
+                        'os._exit(0)', str(pathlib.Path(__file__).parents[1]), str(self.root)], check=True)
+        self.assertEqual(len(list(self.root.iterdir())), 1)
+        with ScratchManager(self.root) as scratch:
+            self.assertEqual(list(self.root.iterdir()), [scratch.directory])
+            with ScratchManager(self.root):
+                self.assertTrue(scratch.directory.is_dir())
+
+    def test_session_being_created(self):
+        from abaqus_interface.scratch import remove_stale_sessions, ScratchManager, session_prefix
+        # A session is created under another name and only matches the session prefix when its lock is held
+        creating = self.root / ('.' + session_prefix + '1_creating')
+        creating.mkdir()
+        (creating / 'lock').touch()
+        self.assertEqual(remove_stale_sessions(self.root), 0)
+        self.assertTrue(creating.is_dir())
+        with ScratchManager(self.root) as scratch:
+            self.assertTrue(scratch.directory.name.startswith(session_prefix))
+            self.assertEqual(remove_stale_sessions(self.root), 0)
+            self.assertTrue(scratch.directory.is_dir())
+
+    def test_interface(self):
+        from synthetic_odb import create_synthetic_odb
+        from abaqus_interface import ABQInterface
+        odb_directory = pathlib.Path(self.directory.name) / 'odbs'
+        odb_directory.mkdir()
+        odb_file_name = odb_directory / 'synthetic.odb'
+        create_synthetic_odb(odb_file_name)
+        abq = ABQInterface(fake_abq_command, scratch=self.root)
+        reference = ABQInterface(fake_abq_command).read_data_from_odb('S', odb_file_name)
+        for _ in range(2):
+            np.testing.assert_array_equal(abq.read_data_from_odb('S', odb_file_name), reference)
+        self.assertEqual(abq.scratch.number_of_directories, 1)
+        self.assertEqual(list(odb_directory.iterdir()), [odb_file_name])
+        abq.scratch.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import pathlib
+import tempfile
+import unittest
+
+import numpy as np
+
+from fake_abaqus_case import fake_abq_command
+
+
+class TestPersistentWorker(unittest.TestCase):
+    def setUp(self):
+        from synthetic_odb import create_synthetic_odb
+        from abaqus_interface import ABQInterface
+        self.directory = tempfile.TemporaryDirectory()
+        self.odb_file_name = pathlib.Path(self.directory.name) / 'synthetic.odb'
+        create_synthetic_odb(self.odb_file_name, step_names=('load', 'unload'), frames_per_step=4)
+        self.abq = ABQInterface(fake_abq_command, persistent=True)
+
+    def tearDown(self):
+        self.abq.close()
+        self.directory.cleanup()
+
+    def test_requests_use_one_process(self):
+        self.assertEqual(self.abq.get_steps(self.odb_file_name), ['load', 'unload'])
+        pid = self.abq.worker.process.pid
+        self.assertEqual(list(self.abq.get_frames(self.odb_file_name, 'load')), [0, 1, 2, 3])
+        data = self.abq.read_data_from_odb('S', self.odb_file_name, step_name='load', frame_number=1)
+        self.assertEqual(data.shape, (64, 6))
+        self.assertAlmostEqual(data[9, 2], 2 + 0.2 + 2000 + 1/3, places=3)
+        self.assertEqual(self.abq.worker.process.pid, pid)
+
+    def test_restart_after_crash(self):
+        self.abq.get_steps(self.odb_file_name)
+        self.abq.worker.process.kill()
+        self.abq.worker.process.wait()
+        self.assertEqual(self.abq.get_steps(self.odb_file_name), ['load', 'unload'])
+
+    def test_crash_while_running_script(self):
+        from abaqus_interface.worker import AbaqusWorkerError
+        counter_file_name = pathlib.Path(self.directory.name) / 'runs.txt'
+        crash_script = pathlib.Path(self.directory.name) / 'crash.py'
+        crash_script.write_text('import os\n'
+                                'with open(' + repr(str(counter_file_name)) + ', "a") as counter_file:\n'
+                                '    counter_file.write("run\\n")\n'
+                                'os._exit(1)\n')
+        for idempotent, runs in [(False, 1), (True, 2)]:
+            counter_file_name.write_text('')
+            with self.assertRaises(AbaqusWorkerError):
+                self.abq.worker.run_script(str(crash_script), [], idempotent=idempotent)
+            self.assertEqual(counter_file_name.read_text().splitlines(), runs*['run'])
+        self.assertEqual(self.abq.get_steps(self.odb_file_name), ['load', 'unload'])
+
+    def test_script_error(self):
+        from abaqus_interface.worker import AbaqusWorkerError
+        with self.assertRaises(AbaqusWorkerError):
+            self.abq.read_data_from_odb('NOT_A_FIELD', self.odb_file_name)
+        self.assertEqual(self.abq.get_steps(self.odb_file_name), ['load', 'unload'])
+
+
+class TestSingleCommand(unittest.TestCase):
+    def test_read_data(self):
+        from synthetic_odb import create_synthetic_odb
+        from abaqus_interface import ABQInterface
+        with tempfile.TemporaryDirectory() as directory:
+            odb_file_name = pathlib.Path(directory) / 'synthetic.odb'
+            create_synthetic_odb(odb_file_name)
+            abq = ABQInterface(fake_abq_command)
+            data, frame_value = abq.read_data_from_odb('PEEQ', odb_file_name, get_frame_value=True)
+            self.assertEqual(frame_value, 1.)
+            np.testing.assert_allclose(data[:8], 2. + 0.1*np.arange(1, 9), rtol=1e-6)